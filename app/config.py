@@ -30,7 +30,80 @@ ALLOWED_ORIGINS = [
 # Model paths
 MODEL_PATH = os.environ.get("MODEL_PATH", "./model.keras")
 SCALER_PATH = os.environ.get("SCALER_PATH", "./scaler.save")
+MANIFEST_PATH = os.environ.get("MANIFEST_PATH", "./models/manifest.json")
+# Versioned model_<v>.keras / scaler_<v>.save pairs written by training
+MODEL_HISTORY_DIR = os.environ.get("MODEL_HISTORY_DIR", "./models/history")
+# Token for the /api/admin endpoints (X-Admin-Token); unset disables them
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+# Per-request budget in milliseconds (0 disables); clients may ask for less
+# with the X-Request-Timeout-Ms header
+REQUEST_TIMEOUT_MS = float(os.environ.get("REQUEST_TIMEOUT_MS", "15000"))
+
+# Admission control for /api/predict: requests run at once, requests queued
+# beyond that, and the CoDel target queueing delay / interval
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "32"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_TARGET_MS = float(os.environ.get("ADMISSION_TARGET_MS", "50"))
+ADMISSION_INTERVAL_MS = float(os.environ.get("ADMISSION_INTERVAL_MS", "500"))
+
+# Upstream request hedging: resend a GraphQL call still running after this
+# percentile of its recent latencies (0 disables), with at most HEDGE_BUDGET
+# extra calls per call
+HEDGE_PERCENTILE = float(os.environ.get("HEDGE_PERCENTILE", "0"))
+HEDGE_BUDGET = float(os.environ.get("HEDGE_BUDGET", "0.05"))
+
+# Background prediction jobs (/api/jobs): file store, worker tasks, jobs
+# waiting to run, users per job, upstream slots (separate from the
+# interactive ones), and whether unfinished jobs resume after a restart
+JOBS_DIR = os.environ.get("JOBS_DIR", "./data/jobs")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "1"))
+JOB_MAX_QUEUED = int(os.environ.get("JOB_MAX_QUEUED", "100"))
+JOB_MAX_USERS = int(os.environ.get("JOB_MAX_USERS", "10000"))
+JOB_UPSTREAM_CONCURRENCY = int(os.environ.get("JOB_UPSTREAM_CONCURRENCY", "2"))
+JOBS_RESUME = os.environ.get("JOBS_RESUME", "0") == "1"
 
 # Server
 API_HOST = os.environ.get("API_HOST", "0.0.0.0")
 API_PORT = int(os.environ.get("API_PORT", "8000"))
+
+# Profiling (opt-in): fraction of /api/predict requests to sample, 0 disables
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "./profiles")
+PROFILE_INTERVAL_MS = float(os.environ.get("PROFILE_INTERVAL_MS", "5"))
+
+# Contest standings for the exact Elo engine (one <contest>.json per contest)
+STANDINGS_DIR = os.environ.get("STANDINGS_DIR", "./data/standings")
+
+# Ingested contest rankings (scripts/ingest_standings.py), memory-mapped
+CONTEST_STORE_DIR = os.environ.get("CONTEST_STORE_DIR", "./data/contests")
+
+# Snapshot of known users' features (scripts/build_user_snapshot.py): served
+# instead of calling LeetCode while younger than USER_SNAPSHOT_MAX_AGE
+# seconds, and at any age when LeetCode fails
+USER_SNAPSHOT_DIR = os.environ.get("USER_SNAPSHOT_DIR", "./data/users")
+USER_SNAPSHOT_MAX_AGE = float(os.environ.get("USER_SNAPSHOT_MAX_AGE", "21600"))
+
+# Username autocomplete index (scripts/build_username_index.py); names seen in
+# successful predictions are buffered (up to USERNAME_MAX_PENDING) and merged
+# in every USERNAME_MERGE_INTERVAL seconds
+USERNAME_INDEX_DIR = os.environ.get("USERNAME_INDEX_DIR", "./data/username_index")
+USERNAME_MERGE_INTERVAL = float(os.environ.get("USERNAME_MERGE_INTERVAL", "300"))
+USERNAME_MAX_PENDING = int(os.environ.get("USERNAME_MAX_PENDING", "10000"))
+
+# Precomputed prediction tables (scripts/precompute_tables.py)
+LOOKUP_DIR = os.environ.get("LOOKUP_DIR", "./data/lookup")
+# Only serve tables whose p99 error against the model (rating points, measured
+# by the precompute script) is within this; the shipped model's tables
+# measure about 3.3
+LOOKUP_MAX_P99_ERROR = float(os.environ.get("LOOKUP_MAX_P99_ERROR", "5"))
+
+# Model runtime: "keras" (TensorFlow, model.predict), "compiled" (TensorFlow,
+# pinned-signature tf.function), an exported NumPy variant from
+# scripts/quantize.py ("float32", "float16", "int8") or "tree"
+# (scripts/train_tree.py)
+MODEL_RUNTIME = os.environ.get("MODEL_RUNTIME", "keras")
+# XLA-compile the "compiled" runtime (pads batches to fixed bucket sizes)
+TF_JIT_COMPILE = os.environ.get("TF_JIT_COMPILE", "0") == "1"
+MODEL_VARIANTS_DIR = os.environ.get("MODEL_VARIANTS_DIR", "./models/variants")
+TREE_MODEL_PATH = os.environ.get("TREE_MODEL_PATH", "./models/tree.npz")
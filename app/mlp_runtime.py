@@ -0,0 +1,180 @@
+"""Dependency-free runtime for the Dense model in reduced precision.
+
+The predictor is a small MLP (Dense/Dropout layers, ~12k parameters), so it
+can run on NumPy alone.  :func:`read_keras_weights` pulls the layer stack out
+of a ``.keras`` archive (or a legacy HDF5 file) with ``h5py``, and
+:func:`export_variant` stores it as one of
+
+* ``float32`` -- the weights as trained,
+* ``float16`` -- weights stored in half precision,
+* ``int8``    -- symmetric per-output-channel int8 weights plus float32 scales
+  for the hidden layers; the first and last layers stay float32 (the input
+  layer's weights have large outliers that int8 resolves poorly, and both
+  are tiny),
+
+as a directory of ``.npy`` files that :func:`load_variant` memory-maps.
+Activations are always computed in float32: NumPy has no fast half or int8
+matmul, so reduced-precision weights are widened per call and the savings
+are in artifact size and resident memory rather than arithmetic.
+
+:class:`MLPModel` mimics the part of the Keras API that
+``make_batch_prediction`` uses (``input_shape`` and ``predict``).
+"""
+
+import io
+import json
+import os
+import shutil
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+VARIANTS = ("float32", "float16", "int8")
+SUPPORTED_ACTIVATIONS = {"linear", "relu"}
+
+
+def _dense_layers_from_config(config):
+    """Yield ``(name, activation)`` for each Dense layer; Dropout is skipped."""
+    layers = config["config"]["layers"]
+    for layer in layers:
+        kind = layer["class_name"]
+        if kind in ("InputLayer", "Dropout"):
+            continue
+        if kind != "Dense":
+            raise ValueError(f"Unsupported layer type for the NumPy runtime: {kind}")
+        activation = layer["config"].get("activation", "linear")
+        if activation not in SUPPORTED_ACTIVATIONS:
+            raise ValueError(f"Unsupported activation: {activation}")
+        yield layer["config"]["name"], activation
+
+
+def read_keras_weights(model_path):
+    """Return ``[(kernel, bias, activation), ...]`` from a saved Keras model."""
+    import h5py
+
+    model_path = str(model_path)
+    if zipfile.is_zipfile(model_path):
+        with zipfile.ZipFile(model_path) as archive:
+            config = json.loads(archive.read("config.json"))
+            weights = io.BytesIO(archive.read("model.weights.h5"))
+        with h5py.File(weights, "r") as f:
+            return [
+                (
+                    f[f"layers/{name}/vars/0"][()],
+                    f[f"layers/{name}/vars/1"][()],
+                    activation,
+                )
+                for name, activation in _dense_layers_from_config(config)
+            ]
+
+    # Keras 2.x HDF5 (possibly with a .keras extension)
+    with h5py.File(model_path, "r") as f:
+        raw = f.attrs["model_config"]
+        config = json.loads(raw.decode("utf-8") if isinstance(raw, bytes) else raw)
+        weights = f["model_weights"]
+        return [
+            (
+                weights[f"{name}/{name}/kernel:0"][()],
+                weights[f"{name}/{name}/bias:0"][()],
+                activation,
+            )
+            for name, activation in _dense_layers_from_config(config)
+        ]
+
+
+def quantize_int8(kernel: np.ndarray):
+    """Symmetric per-output-channel quantization: ``kernel ~= q * scale``."""
+    scale = np.abs(kernel).max(axis=0) / 127.0
+    scale[scale == 0] = 1.0
+    q = np.clip(np.rint(kernel / scale), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def export_variant(layers, variant: str, out_dir) -> Path:
+    """Write ``layers`` in the given precision to ``out_dir`` (replaced)."""
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant '{variant}', expected one of {VARIANTS}")
+    out_dir = Path(out_dir)
+    tmp = out_dir.with_name(f".{out_dir.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    meta = {"variant": variant, "layers": []}
+    last = len(layers) - 1
+    for i, (kernel, bias, activation) in enumerate(layers):
+        if variant == "int8" and i in (0, last):
+            np.save(tmp / f"{i}.kernel.npy", np.asarray(kernel, dtype=np.float32))
+        elif variant == "int8":
+            q, scale = quantize_int8(np.asarray(kernel, dtype=np.float32))
+            np.save(tmp / f"{i}.kernel.npy", q)
+            np.save(tmp / f"{i}.scale.npy", scale)
+        else:
+            np.save(tmp / f"{i}.kernel.npy", np.asarray(kernel, dtype=variant))
+        np.save(tmp / f"{i}.bias.npy", np.asarray(bias, dtype=np.float32))
+        meta["layers"].append({"activation": activation})
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    os.replace(tmp, out_dir)
+    return out_dir
+
+
+class MLPModel:
+    """Forward pass of a Dense stack with float32 activations."""
+
+    def __init__(self, layers, variant: str = "float32"):
+        # layers: [(kernel, scale or None, bias, activation)]
+        self.layers = layers
+        self.variant = variant
+        self.input_shape = (None, layers[0][0].shape[0])
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 3:  # tolerate the legacy (n, 1, features) layout
+            x = x.reshape(x.shape[0], -1)
+        for kernel, scale, bias, activation in self.layers:
+            x = x @ kernel.astype(np.float32, copy=False)
+            if scale is not None:
+                x *= scale
+            x += bias
+            if activation == "relu":
+                np.maximum(x, 0, out=x)
+        return x
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of weight storage (what stays resident once paged in)."""
+        return sum(
+            k.nbytes + b.nbytes + (s.nbytes if s is not None else 0)
+            for k, s, b, _ in self.layers
+        )
+
+    @classmethod
+    def from_keras_weights(cls, layers):
+        return cls(
+            [
+                (np.asarray(k, np.float32), None, np.asarray(b, np.float32), a)
+                for k, b, a in layers
+            ]
+        )
+
+
+def load_variant(path, mmap: bool = True) -> MLPModel:
+    """Load an exported variant directory, memory-mapping the weights."""
+    path = Path(path)
+    meta = json.loads((path / "meta.json").read_text())
+    mode = "r" if mmap else None
+    layers = []
+    for i, layer in enumerate(meta["layers"]):
+        scale_path = path / f"{i}.scale.npy"
+        layers.append(
+            (
+                np.load(path / f"{i}.kernel.npy", mmap_mode=mode),
+                np.load(scale_path, mmap_mode=mode) if scale_path.exists() else None,
+                np.load(path / f"{i}.bias.npy", mmap_mode=mode),
+                layer["activation"],
+            )
+        )
+    return MLPModel(layers, meta["variant"])
@@ -1,9 +1,12 @@
 """Utilities for loading Keras models, including legacy HDF5 format migration."""
 
+import contextlib
+import hashlib
 import json
 import logging
 import os
 import shutil
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +14,29 @@ logger = logging.getLogger(__name__)
 _LEGACY_KERAS_KEYS = {"time_major", "implementation"}
 
 
+def _is_hdf5(path: str) -> bool:
+    with open(path, "rb") as fh:
+        return fh.read(4) == b"\x89HDF"
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def migrated_path(model_path: str) -> str:
+    """Where the native Keras 3 copy of a legacy model is cached.
+
+    Keyed by the source file's content hash, so replacing the source
+    invalidates the cache without any bookkeeping.
+    """
+    stem = os.path.splitext(model_path)[0]
+    return f"{stem}.migrated-{_file_sha256(model_path)[:16]}.keras"
+
+
 def load_keras_model(tf, model_path: str):
     """Load a Keras model, handling legacy HDF5 format from older TF versions.
 
@@ -19,32 +45,41 @@ def load_keras_model(tf, model_path: str):
     config keys (e.g. ``time_major``, ``implementation``) that Keras 3.x
     no longer recognises.  This helper detects that situation, patches the
     stored config, and loads via a temporary ``.h5`` copy.
+
+    The migrated model is saved once as a native archive next to the source
+    (see :func:`migrated_path`) and loaded directly on later starts.
     """
-    # Fast-path: try the normal loader first
-    try:
-        return tf.keras.models.load_model(model_path)
-    except Exception:
-        pass  # fall through to legacy handling
-
-    logger.info("Standard load failed — attempting legacy HDF5 migration")
-
-    # Determine if the file is HDF5
-    with open(model_path, "rb") as fh:
-        is_hdf5 = fh.read(4) == b"\x89HDF"
-    if not is_hdf5:
-        raise RuntimeError(
-            f"Cannot load {model_path}: not a valid .keras zip or HDF5 file"
-        )
-
-    # Create a temporary .h5 copy so Keras uses the HDF5 code path
-    h5_path = (
-        model_path.rsplit(".keras", 1)[0] + ".h5"
-        if model_path.endswith(".keras")
-        else model_path + ".tmp.h5"
-    )
-    shutil.copy2(model_path, h5_path)
+    if not _is_hdf5(model_path):
+        try:
+            return tf.keras.models.load_model(model_path)
+        except Exception as e:
+            raise RuntimeError(
+                f"Cannot load {model_path}: not a valid .keras zip or HDF5 file"
+            ) from e
 
+    cached = migrated_path(model_path)
+    if os.path.exists(cached):
+        try:
+            return tf.keras.models.load_model(cached, compile=False)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable migrated model {cached}: {e}")
+
+    logger.info("Legacy HDF5 model — migrating to the Keras 3 format")
+    model = _load_legacy_hdf5(tf, model_path)
+    _save_migrated(model, model_path, cached)
+    return model
+
+
+def _load_legacy_hdf5(tf, model_path: str):
+    # Keras picks the HDF5 code path by extension, so load a patched .h5
+    # copy.  The name is unique per call, so concurrent workers never share
+    # (or delete) each other's copy.
+    directory = os.path.dirname(os.path.abspath(model_path))
+    fd, h5_path = tempfile.mkstemp(suffix=".h5", dir=directory)
+    os.close(fd)
     try:
+        shutil.copy2(model_path, h5_path)
+
         # Patch out keys that Keras 3.x doesn't accept
         import h5py
 
@@ -63,6 +98,40 @@ def load_keras_model(tf, model_path: str):
             os.remove(h5_path)
 
 
+def _save_migrated(model, model_path: str, cached: str):
+    """Atomically write ``cached`` and drop copies of older source versions.
+
+    The copy only saves the next start a conversion, so any failure to
+    write it (including Keras refusing to serialise a layer) is logged and
+    the in-memory model is used as is.
+    """
+    directory = os.path.dirname(os.path.abspath(cached))
+    try:
+        fd, tmp = tempfile.mkstemp(suffix=".keras", dir=directory)
+        os.close(fd)
+        try:
+            model.save(tmp)
+            os.replace(tmp, cached)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    except Exception as e:
+        logger.warning(f"Could not cache migrated model at {cached}: {e}")
+        return
+    logger.info(f"Cached migrated model at {cached}")
+
+    stem = os.path.basename(os.path.splitext(model_path)[0])
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if (
+            name.startswith(f"{stem}.migrated-")
+            and name.endswith(".keras")
+            and path != os.path.abspath(cached)
+        ):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+
 def _strip_legacy_keys(obj):
     """Recursively remove keys that Keras 3.x doesn't recognise."""
     if isinstance(obj, dict):
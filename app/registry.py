@@ -0,0 +1,146 @@
+"""Model versions, background loading and canary/shadow routing.
+
+A version is a ``(model, scaler)`` pair: ``"current"`` is the deployed
+``MODEL_PATH``/``SCALER_PATH`` (labelled with its ``models/manifest.json``
+version) and any other name refers to the ``model_<version>.keras`` /
+``scaler_<version>.save`` pair that training writes to ``models/history/``.
+
+:func:`load_version` loads and warms a version off the event loop.  The API
+then either swaps it in (a plain reassignment on the event loop; requests
+and jobs capture the versions they use when they start, so ones already
+running finish on the previous model) or routes a share of the traffic to
+it through :class:`Canary`.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+from pathlib import Path
+
+import numpy as np
+
+from app.services.prediction import make_batch_prediction, make_prediction
+from app.utils.metrics import MODEL_PREDICTIONS
+
+logger = logging.getLogger(__name__)
+
+CURRENT = "current"
+_HISTORY_MODEL = re.compile(r"^model_(.+)\.keras$")
+# Batch sizes pushed through a freshly loaded model before it takes traffic
+WARM_BATCHES = (1, 64)
+
+
+class ModelVersion:
+    """A loaded model/scaler pair and the name it was loaded under."""
+
+    def __init__(self, version: str, model, scaler):
+        self.version = version
+        self.model = model
+        self.scaler = scaler
+
+
+def manifest_version(manifest_path) -> str:
+    try:
+        manifest = json.loads(Path(manifest_path).read_text())
+    except (OSError, ValueError):
+        return CURRENT
+    return manifest.get("model.keras", {}).get("version") or CURRENT
+
+
+def list_versions(history_dir):
+    """Versions in ``history_dir`` that have both a model and a scaler."""
+    history = Path(history_dir)
+    if not history.is_dir():
+        return []
+    versions = []
+    for path in history.iterdir():
+        match = _HISTORY_MODEL.match(path.name)
+        if match and (history / f"scaler_{match.group(1)}.save").exists():
+            versions.append(match.group(1))
+    return sorted(versions)
+
+
+def resolve_version(version, model_path, scaler_path, history_dir):
+    """Return ``(model_path, scaler_path)`` for a version name.
+
+    Raises ``FileNotFoundError`` for unknown versions.
+    """
+    if version in (None, CURRENT):
+        return model_path, scaler_path
+    if not re.match(r"^[\w.-]+$", version):
+        raise FileNotFoundError(f"Invalid model version '{version}'")
+    model = os.path.join(history_dir, f"model_{version}.keras")
+    scaler = os.path.join(history_dir, f"scaler_{version}.save")
+    if not (os.path.exists(model) and os.path.exists(scaler)):
+        raise FileNotFoundError(f"Model version '{version}' not found")
+    return model, scaler
+
+
+def warm_up(version: ModelVersion):
+    """Run the first predictions (tracing, allocation) before serving."""
+    n_features = version.model.input_shape[-1]
+    for size in WARM_BATCHES:
+        make_batch_prediction(
+            version.model, version.scaler, np.zeros((size, n_features))
+        )
+
+
+def load_version(name: str, model_path: str, scaler_path: str, load_model):
+    """Load and warm a version; ``load_model(path)`` builds the model."""
+    import joblib
+
+    version = ModelVersion(name, load_model(model_path), joblib.load(scaler_path))
+    warm_up(version)
+    return version
+
+
+class Canary:
+    """Route ``percent`` of predictions to a candidate, or shadow all of them.
+
+    In canary mode the chosen share is served by the candidate; in shadow
+    mode the active model always serves.  Either way, whenever the candidate
+    runs both predictions are logged so they can be compared; a failing
+    candidate falls back to the active model.
+    """
+
+    def __init__(self, candidate: ModelVersion, percent: float, shadow: bool):
+        self.candidate = candidate
+        self.percent = percent
+        self.shadow = shadow
+
+    def status(self):
+        return {
+            "version": self.candidate.version,
+            "percent": self.percent,
+            "shadow": self.shadow,
+        }
+
+    def predict(self, active: ModelVersion, features) -> float:
+        if not (self.shadow or random.random() * 100 < self.percent):  # noqa: S311
+            MODEL_PREDICTIONS.inc(active.version, "active")
+            return make_prediction(active.model, active.scaler, features)
+
+        served = make_prediction(active.model, active.scaler, features)
+        role = "shadow" if self.shadow else "canary"
+        candidate = self.candidate
+        try:
+            other = float(
+                make_batch_prediction(candidate.model, candidate.scaler, features)[0]
+            )
+        except Exception as e:
+            logger.warning(f"{role} {candidate.version} failed: {e}")
+            MODEL_PREDICTIONS.inc(active.version, "active")
+            return served
+
+        logger.info(
+            f"{role} {candidate.version}: {other:+.2f} "
+            f"vs {active.version}: {served:+.2f}"
+        )
+        if self.shadow:
+            MODEL_PREDICTIONS.inc(active.version, "active")
+            MODEL_PREDICTIONS.inc(candidate.version, "shadow")
+            return served
+        MODEL_PREDICTIONS.inc(candidate.version, "canary")
+        return other
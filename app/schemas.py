@@ -1,11 +1,30 @@
 """Pydantic request/response models."""
 
 import re
-from typing import List
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, field_validator
 
-from app.config import CONTEST_NAME_RE
+from app.config import CONTEST_NAME_RE, JOB_MAX_USERS
+
+
+def _check_contest_name(v: str) -> str:
+    if not CONTEST_NAME_RE.match(v):
+        raise ValueError(
+            "Contest name must match pattern: (weekly|biweekly)-contest-<number>"
+        )
+    return v
+
+
+def _check_username(v: str) -> str:
+    v = v.strip()
+    if not v:
+        raise ValueError("Username cannot be empty")
+    if len(v) > 50:
+        raise ValueError("Username too long")
+    if not re.match(r"^[a-zA-Z0-9_-]+$", v):
+        raise ValueError("Username contains invalid characters")
+    return v
 
 
 class Contest(BaseModel):
@@ -15,11 +34,7 @@ class Contest(BaseModel):
     @field_validator("name")
     @classmethod
     def validate_contest_name(cls, v: str) -> str:
-        if not CONTEST_NAME_RE.match(v):
-            raise ValueError(
-                "Contest name must match pattern: (weekly|biweekly)-contest-<number>"
-            )
-        return v
+        return _check_contest_name(v)
 
     @field_validator("rank")
     @classmethod
@@ -34,18 +49,16 @@ class Contest(BaseModel):
 class PredictionInput(BaseModel):
     username: str
     contests: List[Contest]
+    # "model": Keras model; "elo": exact Elo engine over local standings
+    # (error if missing); "auto": Elo when standings exist, else the model
+    engine: Literal["model", "elo", "auto"] = "model"
+    # Return the predictions completed before the deadline instead of a 504
+    partial: bool = False
 
     @field_validator("username")
     @classmethod
     def validate_username(cls, v: str) -> str:
-        v = v.strip()
-        if not v:
-            raise ValueError("Username cannot be empty")
-        if len(v) > 50:
-            raise ValueError("Username too long")
-        if not re.match(r"^[a-zA-Z0-9_-]+$", v):
-            raise ValueError("Username contains invalid characters")
-        return v
+        return _check_username(v)
 
 
 class PredictionOutput(BaseModel):
@@ -56,3 +69,160 @@ class PredictionOutput(BaseModel):
     total_participants: int
     rating_after_contest: float
     attended_contests_count: int
+    engine: str = "model"
+
+
+class RankDistribution(BaseModel):
+    """Log-normal rank distribution: ``log(rank) ~ N(log(median), spread)``."""
+
+    median: float
+    spread: float = 0.5
+
+    @field_validator("median")
+    @classmethod
+    def validate_median(cls, v: float) -> float:
+        if not 1 <= v <= 1_000_000:
+            raise ValueError("Median rank must be between 1 and 1,000,000")
+        return v
+
+    @field_validator("spread")
+    @classmethod
+    def validate_spread(cls, v: float) -> float:
+        if not 0 <= v <= 3:
+            raise ValueError("Spread must be between 0 and 3")
+        return v
+
+
+class SimulatedContest(BaseModel):
+    name: str
+    # Omitted: fitted to the user's recent contest ranks
+    rank: Optional[RankDistribution] = None
+    # Omitted: ingested standings if any, else a typical contest size
+    total_participants: Optional[int] = None
+
+    @field_validator("name")
+    @classmethod
+    def validate_contest_name(cls, v: str) -> str:
+        return _check_contest_name(v)
+
+    @field_validator("total_participants")
+    @classmethod
+    def validate_total_participants(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and not 1 <= v <= 1_000_000:
+            raise ValueError("Participant count must be between 1 and 1,000,000")
+        return v
+
+
+class SimulationInput(BaseModel):
+    username: str
+    contests: List[SimulatedContest]
+    paths: int = 10_000
+    percentiles: List[float] = [5, 25, 50, 75, 95]
+    seed: Optional[int] = None
+
+    @field_validator("username")
+    @classmethod
+    def validate_username(cls, v: str) -> str:
+        return _check_username(v)
+
+    @field_validator("contests")
+    @classmethod
+    def validate_contests(cls, v: List[SimulatedContest]) -> List[SimulatedContest]:
+        if not 1 <= len(v) <= 20:
+            raise ValueError("Simulate between 1 and 20 contests")
+        return v
+
+    @field_validator("paths")
+    @classmethod
+    def validate_paths(cls, v: int) -> int:
+        if not 1 <= v <= 50_000:
+            raise ValueError("Paths must be between 1 and 50,000")
+        return v
+
+    @field_validator("percentiles")
+    @classmethod
+    def validate_percentiles(cls, v: List[float]) -> List[float]:
+        if not v or len(v) > 20 or any(not 0 <= p <= 100 for p in v):
+            raise ValueError("Give 1-20 percentiles between 0 and 100")
+        return v
+
+
+class SimulationStep(BaseModel):
+    contest_name: str
+    rank_median: float
+    rank_spread: float
+    total_participants: int
+    mean: float
+    percentiles: Dict[str, float]
+
+
+class SimulationOutput(BaseModel):
+    username: str
+    paths: int
+    rating_before_contest: float
+    attended_contests_count: int
+    steps: List[SimulationStep]
+    final: Dict[str, float]
+
+
+class ModelReloadInput(BaseModel):
+    # None/"current": MODEL_PATH and SCALER_PATH; otherwise a models/history/
+    # version
+    version: Optional[str] = None
+    # 0 swaps the new version in; otherwise this share of predictions is
+    # served by it (canary) while the rest stay on the active version
+    canary_percent: float = 0
+    # Evaluate the new version on every prediction but keep serving the
+    # active one
+    shadow: bool = False
+
+    @field_validator("canary_percent")
+    @classmethod
+    def validate_canary_percent(cls, v: float) -> float:
+        if not 0 <= v <= 100:
+            raise ValueError("Canary percent must be between 0 and 100")
+        return v
+
+
+class JobInput(BaseModel):
+    usernames: List[str]
+    # Predicted in order for every user, as in PredictionInput (model engine)
+    contests: List[Contest]
+
+    @field_validator("usernames")
+    @classmethod
+    def validate_usernames(cls, v: List[str]) -> List[str]:
+        if not v:
+            raise ValueError("At least one username is required")
+        if len(v) > JOB_MAX_USERS:
+            raise ValueError(f"At most {JOB_MAX_USERS} usernames per job")
+        return [_check_username(u) for u in v]
+
+    @field_validator("contests")
+    @classmethod
+    def validate_contests(cls, v: List[Contest]) -> List[Contest]:
+        if not v:
+            raise ValueError("At least one contest is required")
+        return v
+
+
+class JobProgress(BaseModel):
+    done: int
+    total: int
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    # queued, running, done or failed
+    status: str
+    progress: JobProgress
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    results_url: str
+
+
+class UsernameMatches(BaseModel):
+    prefix: str
+    usernames: List[str]
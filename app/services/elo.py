@@ -0,0 +1,169 @@
+"""Exact LeetCode (Elo-style) rating engine.
+
+LeetCode updates ratings from the full contest standings:
+
+* expected rank ``E_i = 1 + sum_j P(j beats i)`` with
+  ``P(j beats i) = 1 / (1 + 10 ** ((R_i - R_j) / 400))``;
+* target rank ``m_i = sqrt(E_i * rank_i)``;
+* performance rating ``p_i``: the rating whose expected rank equals ``m_i``;
+* ``delta_i = (p_i - R_i) * f(k_i)`` with ``f(k) = 1 / (1 + sum_{t<=k} (5/7)^t)``
+  where ``k_i`` is the number of contests attended before this one.
+
+Summing ``P`` over all ``n`` participants for each of ``n`` participants is
+O(n^2).  Instead the ratings are binned on a fine grid and the expected-win
+curve is computed once as the convolution of the rating histogram with the
+win-probability kernel (via FFT), then read off by interpolation.  The
+performance ratings come from a vectorized bisection over that curve.
+"""
+
+import json
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+
+from app.config import STANDINGS_DIR
+
+GRID_STEP = 1.0  # rating points per histogram bin
+GRID_MARGIN = 4000.0  # grid padding beyond the observed rating range
+BISECT_ITERATIONS = 32
+
+
+def win_probability(diff):
+    """Probability that a player rated ``diff`` points below wins."""
+    return 1.0 / (1.0 + np.power(10.0, np.asarray(diff, dtype=np.float64) / 400.0))
+
+
+def rating_weight(attended) -> np.ndarray:
+    """``f(k)``: how strongly the performance moves the rating after k contests."""
+    k = np.asarray(attended, dtype=np.float64)
+    # sum_{t=0}^{k} (5/7)^t in closed form
+    series = (1.0 - (5.0 / 7.0) ** (k + 1)) / (1.0 - 5.0 / 7.0)
+    return 1.0 / (1.0 + series)
+
+
+def expected_wins_curve(ratings, step=GRID_STEP, margin=GRID_MARGIN):
+    """Return ``(grid, wins)`` with ``wins[g] = sum_j P(j beats grid[g])``.
+
+    Ratings are spread linearly over their two neighbouring bins, so the curve
+    is exact up to the kernel's curvature over one ``step``.
+    """
+    ratings = np.asarray(ratings, dtype=np.float64)
+    lo = np.floor(ratings.min() - margin)
+    size = int(np.ceil((ratings.max() + margin - lo) / step)) + 1
+    grid = lo + step * np.arange(size)
+
+    pos = (ratings - lo) / step
+    left = np.floor(pos).astype(np.int64)
+    frac = pos - left
+    hist = np.bincount(left, weights=1.0 - frac, minlength=size + 1)
+    hist += np.bincount(left + 1, weights=frac, minlength=size + 1)
+    hist = hist[:size]
+
+    # kernel[o] for offsets o = -(size-1) .. size-1 (grid minus opponent)
+    offsets = step * np.arange(-(size - 1), size)
+    kernel = win_probability(offsets)
+    n_fft = 1 << int(np.ceil(np.log2(3 * size - 2)))
+    full = np.fft.irfft(np.fft.rfft(hist, n_fft) * np.fft.rfft(kernel, n_fft), n_fft)
+    wins = full[size - 1 : 2 * size - 1]
+    return grid, np.clip(wins, 0.0, None)
+
+
+class EloContest:
+    """Expected-rank machinery for one contest's field of pre-contest ratings."""
+
+    def __init__(self, ratings):
+        self.ratings = np.asarray(ratings, dtype=np.float64)
+        if self.ratings.size == 0:
+            raise ValueError("Contest has no participants")
+        self.grid, self.wins = expected_wins_curve(self.ratings)
+
+    @property
+    def participants(self) -> int:
+        return int(self.ratings.size)
+
+    def expected_rank(self, rating, exclude=None):
+        """``1 + sum_j P(j beats rating)``, optionally excluding ratings ``exclude``.
+
+        ``exclude`` removes a participant's own term when they are part of
+        the field.
+        """
+        expected = 1.0 + np.interp(rating, self.grid, self.wins)
+        if exclude is not None:
+            expected -= win_probability(rating - np.asarray(exclude))
+        return expected
+
+    def performance(self, target_rank, exclude=None):
+        """Vectorized bisection for the rating whose expected rank is the target."""
+        target = np.asarray(target_rank, dtype=np.float64)
+        lo = np.full(target.shape, self.grid[0])
+        hi = np.full(target.shape, self.grid[-1])
+        for _ in range(BISECT_ITERATIONS):
+            mid = 0.5 * (lo + hi)
+            too_low = self.expected_rank(mid, exclude) > target
+            lo = np.where(too_low, mid, lo)
+            hi = np.where(too_low, hi, mid)
+        return 0.5 * (lo + hi)
+
+    def deltas(self, ranks, attended) -> np.ndarray:
+        """Rating change for every participant, in the order of ``ratings``."""
+        ranks = np.asarray(ranks, dtype=np.float64)
+        seed = self.expected_rank(self.ratings, exclude=self.ratings)
+        perf = self.performance(np.sqrt(seed * ranks), exclude=self.ratings)
+        return (perf - self.ratings) * rating_weight(attended)
+
+    def predict(self, rating, rank, attended) -> np.ndarray:
+        """Rating change for a (hypothetical) extra participant at ``rank``."""
+        rating = np.asarray(rating, dtype=np.float64)
+        seed = self.expected_rank(rating)
+        perf = self.performance(np.sqrt(seed * np.asarray(rank, dtype=np.float64)))
+        return (perf - rating) * rating_weight(attended)
+
+
+def rating_deltas(ratings, ranks, attended) -> np.ndarray:
+    """Rating change of every participant of a contest in one pass."""
+    return EloContest(ratings).deltas(ranks, attended)
+
+
+# ---------------------------------------------------------------------------
+# Standings files
+# ---------------------------------------------------------------------------
+
+
+def standings_path(contest_name: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or STANDINGS_DIR, f"{contest_name}.json")
+
+
+def load_standings(path: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Read ``(ratings, ranks, attended)`` from a standings JSON file.
+
+    The file holds either a list of participants or ``{"participants": [...]}``;
+    each participant has ``rank``, ``rating`` (pre-contest) and
+    ``attendedContestsCount`` (contests before this one).
+    """
+    with open(path, "r") as f:
+        data = json.load(f)
+    rows = data["participants"] if isinstance(data, dict) else data
+    ratings = np.array([r.get("rating", 1500.0) for r in rows], dtype=np.float64)
+    ranks = np.array([r["rank"] for r in rows], dtype=np.float64)
+    attended = np.array(
+        [r.get("attendedContestsCount", 0) for r in rows], dtype=np.float64
+    )
+    return ratings, ranks, attended
+
+
+@lru_cache(maxsize=16)
+def _cached_contest(path: str, mtime: float) -> EloContest:
+    ratings, _, _ = load_standings(path)
+    return EloContest(ratings)
+
+
+def get_contest_engine(contest_name: str) -> Optional[EloContest]:
+    """Return the Elo engine for a contest if its standings file exists."""
+    path = standings_path(contest_name)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    return _cached_contest(path, mtime)
@@ -0,0 +1,317 @@
+"""Background prediction jobs for cohorts too large for one request.
+
+A job is a list of usernames and the contests to predict for each of them.
+Submitting one returns an id right away; a small pool of worker tasks then
+fetches the users through the usual cache and upstream path (with their own
+upstream slots, so interactive requests keep theirs) and predicts
+``CHUNK_USERS`` users at a time, one batched model call per contest.
+
+Everything lives in a local file store::
+
+    <JOBS_DIR>/<job id>/job.json       spec, status and progress
+    <JOBS_DIR>/<job id>/results.jsonl  one line per user, appended per chunk
+
+A process holds an exclusive ``flock`` on ``<job id>/claim.lock`` from
+submitting or recovering a job until it finishes (the kernel drops it if the
+process dies), and records its pid as ``owner``.  On startup, unfinished
+jobs that no live worker process has claimed are either resumed after the
+users already in ``results.jsonl`` or, without persistence, marked as
+failed; jobs still claimed by a sibling worker are left alone.
+"""
+
+import asyncio
+import contextvars
+import fcntl
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from fastapi import HTTPException
+
+from app.schemas import Contest, PredictionOutput
+from app.services.prediction import build_features
+
+logger = logging.getLogger(__name__)
+
+JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+# Users fetched and predicted together
+CHUNK_USERS = 64
+UNFINISHED = ("queued", "running")
+
+
+class QueueFullError(Exception):
+    """Too many jobs are waiting to run."""
+
+
+class JobStore:
+    """Job metadata and results under ``root``, one directory per job."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        # job id -> open claim.lock holding this process's flock
+        self.claims = {}
+
+    def path(self, job_id: str) -> Path:
+        if not JOB_ID_RE.match(job_id):
+            raise FileNotFoundError(job_id)
+        return self.root / job_id
+
+    def results_path(self, job_id: str) -> Path:
+        return self.path(job_id) / "results.jsonl"
+
+    def create(self, usernames, contests) -> dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": "queued",
+            "usernames": list(usernames),
+            "contests": list(contests),
+            "progress": {"done": 0, "total": len(usernames)},
+            "error": None,
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "owner": os.getpid(),
+        }
+        self.path(job["job_id"]).mkdir(parents=True)
+        # Claimed before job.json exists, so recovery never sees it unclaimed
+        self.claim(job["job_id"])
+        self.save(job)
+        return job
+
+    def claim(self, job_id: str) -> bool:
+        """Take this process's exclusive claim on a job; False if another has it."""
+        if job_id in self.claims:
+            return True
+        f = open(self.path(job_id) / "claim.lock", "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return False
+        self.claims[job_id] = f
+        return True
+
+    def release(self, job_id: str):
+        f = self.claims.pop(job_id, None)
+        if f is not None:
+            f.close()
+
+    def save(self, job: dict):
+        path = self.path(job["job_id"]) / "job.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(job))
+        os.replace(tmp, path)
+
+    def load(self, job_id: str) -> Optional[dict]:
+        try:
+            return json.loads((self.path(job_id) / "job.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def append_results(self, job_id: str, rows):
+        with open(self.results_path(job_id), "a") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def completed_users(self, job_id: str) -> int:
+        """Result lines written so far (a torn last line is dropped)."""
+        path = self.results_path(job_id)
+        if not path.exists():
+            return 0
+        data = path.read_bytes()
+        complete = data[: data.rfind(b"\n") + 1]
+        if len(complete) != len(data):
+            with open(path, "r+b") as f:
+                f.truncate(len(complete))
+        return complete.count(b"\n")
+
+    def unfinished(self):
+        if not self.root.is_dir():
+            return []
+        jobs = (self.load(p.name) for p in self.root.iterdir() if p.is_dir())
+        return sorted(
+            (j for j in jobs if j and j["status"] in UNFINISHED),
+            key=lambda j: j["created_at"],
+        )
+
+
+class JobRunner:
+    """Bounded worker pool running jobs from a FIFO queue.
+
+    ``fetch_user(username)`` and ``participants(contest)`` are the
+    interactive path's coroutines.  ``predictor()`` is called once per job
+    run and returns ``predict_batch(features)``, which runs the model on an
+    ``(n, 15)`` array from a thread; a job thus uses one model throughout.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        fetch_user,
+        participants,
+        predictor,
+        workers: int,
+        max_queued: int,
+    ):
+        self.store = store
+        self.fetch_user = fetch_user
+        self.participants = participants
+        self.predictor = predictor
+        self.workers = workers
+        self.max_queued = max_queued
+        self.queue = None
+        self.tasks = []
+        self._loop = None
+
+    def _start(self):
+        """Start the workers (and queue) on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        self._loop = loop
+        self.queue = asyncio.Queue(self.max_queued)
+        # Workers must not inherit the submitting request's deadline
+        context = contextvars.Context()
+        self.tasks = [
+            asyncio.create_task(self._worker(), context=context)
+            for _ in range(self.workers)
+        ]
+
+    def submit(self, usernames, contests) -> dict:
+        self._start()
+        if self.queue.full():
+            raise QueueFullError("Too many queued jobs")
+        job = self.store.create(usernames, contests)
+        self.queue.put_nowait(job["job_id"])
+        return job
+
+    def recover(self, resume: bool):
+        """Requeue (or fail) unfinished jobs no live process has claimed."""
+        self._start()
+        for job in self.store.unfinished():
+            if not self.store.claim(job["job_id"]):
+                continue  # a sibling worker is queueing or running it
+            if resume and not self.queue.full():
+                job.update(status="queued", owner=os.getpid())
+                self.store.save(job)
+                self.queue.put_nowait(job["job_id"])
+                logger.info(f"Resuming job {job['job_id']}")
+            else:
+                self._finish(job, "failed", "Interrupted by a server restart")
+                self.store.release(job["job_id"])
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        self._loop = None
+        for job_id in list(self.store.claims):
+            self.store.release(job_id)
+
+    def _finish(self, job, status, error=None):
+        job.update(status=status, error=error, finished_at=time.time())
+        self.store.save(job)
+
+    async def _worker(self):
+        while True:
+            job_id = await self.queue.get()
+            job = self.store.load(job_id)
+            try:
+                if job is not None:
+                    await self.run(job)
+            except asyncio.CancelledError:
+                raise  # shutdown: the job stays "running" for recovery
+            except Exception as e:
+                logger.exception(f"Job {job_id} failed")
+                self._finish(job, "failed", str(e))
+            finally:
+                self.store.release(job_id)
+                self.queue.task_done()
+
+    async def run(self, job: dict):
+        job_id = job["job_id"]
+        job.update(status="running", started_at=job["started_at"] or time.time())
+        contests = [Contest(**c) for c in job["contests"]]
+        predict_batch = self.predictor()
+        totals = [await self.participants(c) for c in contests]
+
+        done = self.store.completed_users(job_id)
+        job["progress"]["done"] = done
+        self.store.save(job)
+        usernames = job["usernames"]
+        for start in range(done, len(usernames), CHUNK_USERS):
+            chunk = usernames[start : start + CHUNK_USERS]
+            users = await asyncio.gather(*(self._fetch(u) for u in chunk))
+            rows = await self._predict_chunk(users, contests, totals, predict_batch)
+            self.store.append_results(job_id, rows)
+            job["progress"]["done"] = start + len(chunk)
+            self.store.save(job)
+        self._finish(job, "done")
+        logger.info(f"Job {job_id} finished: {len(usernames)} users")
+
+    async def _fetch(self, username: str):
+        """``(username, user_data, error)`` for one user of the cohort."""
+        try:
+            data = await self.fetch_user(username)
+        except HTTPException as e:
+            return username, None, e.detail
+        if data.get("rating") is None or data.get("attendedContestsCount") is None:
+            return username, None, "Incomplete user data from LeetCode"
+        return username, data, None
+
+    async def _predict_chunk(self, users, contests, totals, predict_batch):
+        """Predict every contest for a chunk of users, one batch per contest.
+
+        Rows come back in the order of ``users`` so the line count of
+        ``results.jsonl`` is always the number of users done.
+        """
+        rows = [
+            {"username": name, "error": error} if error else None
+            for name, _, error in users
+        ]
+        ok = [i for i, row in enumerate(rows) if row is None]
+        if not ok:
+            return rows
+
+        ratings = np.array([users[i][1]["rating"] for i in ok], dtype=np.float64)
+        attended = np.array(
+            [users[i][1]["attendedContestsCount"] for i in ok], dtype=np.float64
+        )
+        predictions = [[] for _ in ok]
+        for contest, total in zip(contests, totals, strict=True):
+            features = np.vstack(
+                [
+                    build_features(users[i][1], r, a, contest.rank, total)
+                    for i, r, a in zip(ok, ratings, attended, strict=True)
+                ]
+            )
+            deltas = await asyncio.to_thread(predict_batch, features)
+            for preds, rating, count, delta in zip(
+                predictions, ratings, attended, deltas, strict=True
+            ):
+                preds.append(
+                    PredictionOutput(
+                        contest_name=contest.name,
+                        prediction=float(delta),
+                        rating_before_contest=float(rating),
+                        rank=contest.rank,
+                        total_participants=total,
+                        rating_after_contest=float(rating + delta),
+                        attended_contests_count=int(count),
+                    ).model_dump()
+                )
+            ratings += deltas
+            attended += 1
+
+        for i, preds in zip(ok, predictions, strict=True):
+            rows[i] = {"username": users[i][0], "predictions": preds}
+        return rows
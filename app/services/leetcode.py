@@ -1,6 +1,8 @@
 """LeetCode GraphQL API client."""
 
 import logging
+import time
+from contextlib import asynccontextmanager
 from typing import Any, Dict, List
 
 import httpx
@@ -9,11 +11,35 @@ from fastapi import HTTPException
 from app.config import (
     CONTEST_NAME_RE,
     GRAPHQL_HEADERS,
+    HEDGE_BUDGET,
+    HEDGE_PERCENTILE,
     LEETCODE_GRAPHQL_URL,
+    USER_SNAPSHOT_MAX_AGE,
 )
+from app.services.user_snapshot import get_user_snapshot
+from app.utils.deadline import DeadlineExceededError, bounded, deadline, remaining
+from app.utils.hedging import Hedger
+from app.utils.metrics import (
+    SEMAPHORE_IN_USE,
+    SEMAPHORE_WAITING,
+    UPSTREAM_RESPONSES,
+    UPSTREAM_SECONDS,
+    USER_DATA_SOURCES,
+)
+from app.utils.timing import observe, record
 
 logger = logging.getLogger(__name__)
 
+# Past ranks kept with the user data (rank distributions for /api/simulate)
+RECENT_RANKS = 10
+
+# Recent latencies per operation and the shared hedge budget
+hedger = Hedger(HEDGE_PERCENTILE, HEDGE_BUDGET)
+
+# Share of the remaining request budget LeetCode gets when a stale snapshot
+# entry can answer instead; the rest is left to predict from the snapshot
+STALE_UPSTREAM_SHARE = 0.5
+
 # ---------------------------------------------------------------------------
 # GraphQL queries
 # ---------------------------------------------------------------------------
@@ -26,6 +52,7 @@ query userContestRankingInfo($username: String!) {
     }
     userContestRankingHistory(username: $username) {
         attended
+        ranking
         problemsSolved
         totalProblems
         finishTimeInSeconds
@@ -64,70 +91,136 @@ query {
 """
 
 
+# ---------------------------------------------------------------------------
+# Feature helpers
+# ---------------------------------------------------------------------------
+
+
+def _avg(vals, default):
+    return sum(vals) / len(vals) if vals else default
+
+
+def compute_history_features(history: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compute the history-based prediction features from a contest history."""
+    attended = [h for h in history if h.get("attended")]
+    solve_rates, finish_times, ratings, ranks = [], [], [], []
+    for h in attended:
+        total_p = h.get("totalProblems", 4) or 4
+        solved = h.get("problemsSolved", 0) or 0
+        solve_rates.append(solved / total_p)
+        ft = h.get("finishTimeInSeconds", 0) or 0
+        if ft > 0:
+            finish_times.append(ft)
+        ratings.append(h.get("rating", 1500))
+        if h.get("ranking"):
+            ranks.append(h["ranking"])
+
+    recent_ft = [t for t in finish_times[-5:] if t > 0]
+    changes = [ratings[i] - ratings[i - 1] for i in range(1, len(ratings))]
+    return {
+        "avgSolveRate": _avg(solve_rates, 0.5),
+        "avgFinishTime": _avg(finish_times, 3000),
+        "recentSolveRate": _avg(solve_rates[-5:], 0.5),
+        "recentFinishTime": _avg(recent_ft, 3000),
+        "ratingTrend": _avg(changes[-5:], 0),
+        "maxRating": max(ratings) if ratings else 1500,
+        "recentRanks": ranks[-RECENT_RANKS:],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Upstream helpers
+# ---------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def _upstream_slot(semaphore):
+    """Hold one upstream concurrency slot, recording wait time and occupancy.
+
+    The wait is bounded by the request's deadline.
+    """
+    start = time.perf_counter()
+    SEMAPHORE_WAITING.inc()
+    try:
+        await bounded(semaphore.acquire(), "semaphore_wait")
+    finally:
+        SEMAPHORE_WAITING.dec()
+    observe("semaphore_wait", time.perf_counter() - start)
+    SEMAPHORE_IN_USE.inc()
+    try:
+        yield
+    finally:
+        SEMAPHORE_IN_USE.dec()
+        semaphore.release()
+
+
+async def _post(client: httpx.AsyncClient, operation: str, payload: dict):
+    """POST a GraphQL query, recording latency and response status.
+
+    Slow calls are hedged (see :mod:`app.utils.hedging`) and the call is
+    cancelled when the request's deadline runs out.
+    """
+
+    def send():
+        return client.post(LEETCODE_GRAPHQL_URL, headers=GRAPHQL_HEADERS, json=payload)
+
+    start = time.perf_counter()
+    try:
+        response = await bounded(
+            hedger.call(operation, send, ok=lambda r: r.is_success), "upstream"
+        )
+    except DeadlineExceededError:
+        UPSTREAM_RESPONSES.inc(operation, "cancelled")
+        raise
+    except httpx.HTTPError:
+        UPSTREAM_RESPONSES.inc(operation, "error")
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_SECONDS.observe(elapsed, operation)
+        record("upstream", elapsed)
+    UPSTREAM_RESPONSES.inc(operation, str(response.status_code))
+    return response
+
+
 # ---------------------------------------------------------------------------
 # Public API (called from routes)
 # ---------------------------------------------------------------------------
 
 
-async def fetch_user_data(
-    client: httpx.AsyncClient,
-    semaphore,
-    cache,
-    username: str,
-) -> Dict[str, Any]:
-    """Fetch user contest data from LeetCode GraphQL API."""
-    cached = cache.get(f"user:{username}")
-    if cached:
-        return cached
+def parse_user_response(data: Dict[str, Any]) -> Dict[str, Any]:
+    """User data with history features from a ``USER_RANKING_QUERY`` response.
+
+    Raises a 400 ``HTTPException`` for users without contest data.
+    """
+    user_data = data.get("data", {}).get("userContestRanking")
+    if not user_data:
+        raise HTTPException(
+            status_code=400,
+            detail="No contest data found for this username",
+        )
+
+    history = data.get("data", {}).get("userContestRankingHistory") or []
+    user_data.update(compute_history_features(history))
+    return user_data
+
 
-    async with semaphore:
+async def _fetch_user_upstream(
+    client: httpx.AsyncClient, semaphore, username: str
+) -> Dict[str, Any]:
+    async with _upstream_slot(semaphore):
         try:
-            response = await client.post(
-                LEETCODE_GRAPHQL_URL,
-                headers=GRAPHQL_HEADERS,
-                json={
+            response = await _post(
+                client,
+                "userContestRanking",
+                {
                     "query": USER_RANKING_QUERY,
                     "variables": {"username": username},
                 },
             )
             response.raise_for_status()
-            data = response.json()
-
-            user_data = data.get("data", {}).get("userContestRanking")
-            if not user_data:
-                raise HTTPException(
-                    status_code=400,
-                    detail="No contest data found for this username",
-                )
-
-            # Compute history-based features for prediction
-            history = data.get("data", {}).get("userContestRankingHistory") or []
-            attended = [h for h in history if h.get("attended")]
-            solve_rates, finish_times, ratings = [], [], []
-            for h in attended:
-                total_p = h.get("totalProblems", 4) or 4
-                solved = h.get("problemsSolved", 0) or 0
-                solve_rates.append(solved / total_p)
-                ft = h.get("finishTimeInSeconds", 0) or 0
-                if ft > 0:
-                    finish_times.append(ft)
-                ratings.append(h.get("rating", 1500))
-
-            def _avg(vals, default):
-                return sum(vals) / len(vals) if vals else default
-
-            user_data["avgSolveRate"] = _avg(solve_rates, 0.5)
-            user_data["avgFinishTime"] = _avg(finish_times, 3000)
-            user_data["recentSolveRate"] = _avg(solve_rates[-5:], 0.5)
-            recent_ft = [t for t in finish_times[-5:] if t > 0]
-            user_data["recentFinishTime"] = _avg(recent_ft, 3000)
-            changes = [ratings[i] - ratings[i - 1] for i in range(1, len(ratings))]
-            user_data["ratingTrend"] = _avg(changes[-5:], 0)
-            user_data["maxRating"] = max(ratings) if ratings else 1500
-
-            cache.set(f"user:{username}", user_data)
-            return user_data
-        except HTTPException:
+            return parse_user_response(response.json())
+        except (HTTPException, DeadlineExceededError):
             raise
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching user data: {e}")
@@ -143,6 +236,50 @@ async def fetch_user_data(
             ) from e
 
 
+async def fetch_user_data(
+    client: httpx.AsyncClient,
+    semaphore,
+    cache,
+    username: str,
+) -> Dict[str, Any]:
+    """Fetch user contest data: cache, then snapshot, then LeetCode.
+
+    Snapshot entries older than ``USER_SNAPSHOT_MAX_AGE`` are only served
+    when LeetCode is unavailable or does not answer within
+    ``STALE_UPSTREAM_SHARE`` of the request's remaining budget.
+    """
+    cached = cache.get(f"user:{username}")
+    if cached:
+        USER_DATA_SOURCES.inc("cache")
+        return cached
+
+    snapshot = get_user_snapshot()
+    known = snapshot.lookup(username) if snapshot is not None else None
+    if known is not None and known["snapshotAge"] <= USER_SNAPSHOT_MAX_AGE:
+        USER_DATA_SOURCES.inc("snapshot")
+        return known
+
+    left = remaining()
+    budget = None if known is None or left is None else left * STALE_UPSTREAM_SHARE
+    try:
+        with deadline(budget):
+            user_data = await _fetch_user_upstream(client, semaphore, username)
+    except (HTTPException, DeadlineExceededError) as e:
+        if known is None or getattr(e, "status_code", 503) != 503:
+            raise
+        if remaining() is not None and remaining() <= 0:
+            raise  # the request's own budget is spent, not just LeetCode's share
+        logger.warning(
+            f"Serving {username} from a {known['snapshotAge']}s old snapshot: {e}"
+        )
+        USER_DATA_SOURCES.inc("snapshot_stale")
+        return known
+
+    cache.set(f"user:{username}", user_data)
+    USER_DATA_SOURCES.inc("upstream")
+    return user_data
+
+
 async def fetch_contest_data(
     client: httpx.AsyncClient,
     semaphore,
@@ -157,12 +294,12 @@ async def fetch_contest_data(
     if cached:
         return cached
 
-    async with semaphore:
+    async with _upstream_slot(semaphore):
         try:
-            response = await client.post(
-                LEETCODE_GRAPHQL_URL,
-                headers=GRAPHQL_HEADERS,
-                json={
+            response = await _post(
+                client,
+                "contestDetailPage",
+                {
                     "query": CONTEST_DETAIL_QUERY,
                     "variables": {"contestSlug": contest_name},
                 },
@@ -185,7 +322,7 @@ async def fetch_contest_data(
 
             cache.set(f"contest:{contest_name}", contest_data)
             return contest_data
-        except HTTPException:
+        except (HTTPException, DeadlineExceededError):
             raise
         except httpx.HTTPError as e:
             logger.error(f"HTTP error fetching contest data: {e}")
@@ -211,21 +348,15 @@ async def find_latest_contests(
         return cached
 
     try:
-        response = await client.post(
-            LEETCODE_GRAPHQL_URL,
-            headers=GRAPHQL_HEADERS,
-            json={"query": TOP_CONTESTS_QUERY},
-        )
+        response = await _post(client, "topTwoContests", {"query": TOP_CONTESTS_QUERY})
         response.raise_for_status()
         data = response.json()
         top = data.get("data", {}).get("topTwoContests") or []
         slugs = [c["titleSlug"] for c in top if c.get("titleSlug")]
 
         if not slugs:
-            response = await client.post(
-                LEETCODE_GRAPHQL_URL,
-                headers=GRAPHQL_HEADERS,
-                json={"query": PAST_CONTESTS_QUERY},
+            response = await _post(
+                client, "pastContests", {"query": PAST_CONTESTS_QUERY}
             )
             response.raise_for_status()
             data = response.json()
@@ -235,6 +366,8 @@ async def find_latest_contests(
         if slugs:
             cache.set("latest_contests", slugs)
         return slugs
+    except DeadlineExceededError:
+        raise
     except Exception as e:
         logger.error(f"Error finding latest contests: {e}")
         raise HTTPException(
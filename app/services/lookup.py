@@ -0,0 +1,305 @@
+"""Precomputed per-contest prediction tables.
+
+Once a contest's participant count is fixed, the model's output is a smooth
+function of a handful of inputs.  :func:`build_lookup_table` evaluates the
+model once over a dense grid of
+
+* rating,
+* rank (log-spaced, since the features use ``log1p(rank)`` and percentiles),
+* average solve rate,
+* contests attended,
+
+in large batches, and :class:`LookupTable` answers predictions by multilinear
+interpolation over that grid, without touching the scaler or the model.
+
+The remaining history features (finish times, rating trend, recent solve
+rate, max rating) are not grid axes; the grid holds them at typical values
+(see :func:`grid_features`).  The table's error therefore has two parts,
+interpolation and that projection, and both are measured together by
+:func:`measure_error` against the real model on realistic users.  The
+result is stored with the table as ``max_abs_error``/``p99_abs_error`` and
+the API only serves tables whose p99 is within ``LOOKUP_MAX_P99_ERROR``.
+The max is kept for inspection but not gated on: it comes from a handful of
+users far from the grid's typical history.
+
+A table answers for the model it was built from; ``model_version`` and
+``runtime`` (see :func:`model_runtime`) are stored with it and tables of any
+other version or runtime are ignored, so a reload or promote never serves
+the previous model's predictions, and an int8 or tree deployment never
+serves a table measured against the Keras model.
+"""
+
+import json
+import math
+import os
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from app.config import LOOKUP_DIR
+from app.mlp_runtime import MLPModel
+from app.services.prediction import build_features, make_batch_prediction
+from app.tree_runtime import TreeModel
+
+RATING_AXIS = np.linspace(800, 3600, 29)
+SOLVE_RATE_AXIS = np.linspace(0.0, 1.0, 11)
+# the model bends sharply over the first contests; every count up to 20
+ATTENDED_AXIS = np.unique(
+    np.concatenate([np.arange(21), np.geomspace(20, 400, 12)]).round()
+)
+RANK_POINTS = 32
+DEFAULT_FINISH_TIME = 3000.0
+
+
+def model_runtime(model) -> str:
+    """The runtime a loaded model evaluates with, as recorded in tables.
+
+    A NumPy variant's weight format, ``"tree"``, or ``"keras"`` for the
+    Keras graph, plain or compiled.
+    """
+    if isinstance(model, MLPModel):
+        return model.variant
+    if isinstance(model, TreeModel):
+        return "tree"
+    return "keras"
+
+
+def rank_axis(total_participants: int, points: int = RANK_POINTS) -> np.ndarray:
+    """Log-spaced ranks from 1 to ``total_participants``."""
+    return np.unique(np.geomspace(1, total_participants, points).round())
+
+
+# Feature columns held at typical values on the grid, each with the step of
+# the secant used for its first-order correction.  Steps span a typical
+# user's deviation rather than an infinitesimal one: the MLP is piecewise
+# linear, and wide secants extrapolate across its kinks far better.  Column
+# 6 (avgFinishTime) also drives column 14.
+OFF_GRID = (
+    ("avgFinishTime", 6, 1000.0),
+    ("recentSolveRate", 7, 0.25),
+    ("recentFinishTime", 8, 1000.0),
+    ("ratingTrend", 9, 25.0),
+    ("maxRating", 10, 300.0),
+)
+_OFF_GRID_COLUMNS = [column for _, column, _ in OFF_GRID]
+
+
+def projected_values(rating, solve_rate):
+    """Grid values of the off-grid columns, in ``OFF_GRID`` order."""
+    return np.array(
+        [DEFAULT_FINISH_TIME, solve_rate, DEFAULT_FINISH_TIME, 0.0, rating],
+        dtype=np.float64,
+    )
+
+
+class LookupTable:
+    """Multilinear interpolation over ``(rating, rank, solve_rate, attended)``.
+
+    ``values[..., 0]`` is the model output at each grid point and
+    ``values[..., 1:]`` its slope along each ``OFF_GRID`` feature, so a
+    user's real history features are applied as a first-order correction.
+    """
+
+    def __init__(self, axes, values, meta):
+        self.axes = [np.asarray(a, dtype=np.float64) for a in axes]
+        self.values = np.asarray(values, dtype=np.float32)
+        self.meta = meta
+        # interpolate rank in log space, matching how the features use it
+        self._coords = [self.axes[0], np.log(self.axes[1])] + self.axes[2:]
+        self._coord_lists = [c.tolist() for c in self._coords]
+
+    @property
+    def total_participants(self) -> int:
+        return int(self.meta["total_participants"])
+
+    def interpolate(self, rating, rank, solve_rate, attended) -> np.ndarray:
+        """Interpolated ``values`` channels; inputs are clamped to the grid."""
+        inputs = (rating, rank, solve_rate, attended)
+        if not any(isinstance(v, (np.ndarray, list, tuple)) for v in inputs):
+            return self._interpolate_one(*inputs)
+
+        points = np.broadcast_arrays(
+            np.asarray(rating, dtype=np.float64),
+            np.log(np.maximum(np.asarray(rank, dtype=np.float64), 1.0)),
+            np.asarray(solve_rate, dtype=np.float64),
+            np.asarray(attended, dtype=np.float64),
+        )
+        lower, weights = [], []
+        for axis, x in zip(self._coords, points, strict=True):
+            x = np.clip(x, axis[0], axis[-1])
+            i = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+            lower.append(i)
+            weights.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+
+        result = np.zeros(points[0].shape + self.values.shape[-1:])
+        for corner in range(1 << len(lower)):
+            index, weight = [], 1.0
+            for d, (i, w) in enumerate(zip(lower, weights, strict=True)):
+                upper = (corner >> d) & 1
+                index.append(i + upper)
+                weight = weight * (w if upper else 1.0 - w)
+            result += weight[..., None] * self.values[tuple(index)]
+        return result
+
+    def _interpolate_one(self, rating, rank, solve_rate, attended):
+        # Single-point fast path (the request path): plain-float bisection,
+        # then contract the surrounding 2^4 block one axis at a time.
+        point = (rating, math.log(max(rank, 1)), solve_rate, attended)
+        block, weights = [], []
+        for axis, x in zip(self._coord_lists, point, strict=True):
+            x = min(max(float(x), axis[0]), axis[-1])
+            i = min(max(bisect_right(axis, x) - 1, 0), len(axis) - 2)
+            block.append(slice(i, i + 2))
+            weights.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+        block = self.values[tuple(block)]
+        for w in weights:
+            block = (1.0 - w) * block[0] + w * block[1]
+        return block
+
+    def predict(self, rating, rank, solve_rate, attended) -> np.ndarray:
+        """Rating change with the off-grid features at their grid values."""
+        return self.interpolate(rating, rank, solve_rate, attended)[..., 0]
+
+    def predict_user(self, user_data, rating, attended, rank) -> float:
+        """Rating change for one user, corrected for their history features."""
+        row = build_features(
+            user_data, rating, attended, rank, self.total_participants
+        )[0]
+        solve_rate = row[5]
+        channels = self.interpolate(rating, rank, solve_rate, attended)
+        offsets = row[_OFF_GRID_COLUMNS] - projected_values(rating, solve_rate)
+        return float(channels[0] + channels[1:] @ offsets)
+
+    def save(self, path):
+        meta = json.dumps(self.meta)
+        np.savez(path, *self.axes, values=self.values, meta=np.array(meta))
+
+    @classmethod
+    def load(cls, path) -> "LookupTable":
+        with np.load(path) as data:
+            axes = [data[f"arr_{i}"] for i in range(4)]
+            return cls(axes, data["values"], json.loads(str(data["meta"])))
+
+
+def grid_features(ratings, ranks, solve_rate, attended, total_participants):
+    """Feature rows for grid points sharing one solve rate.
+
+    Off-grid history features take their ``projected_values``: default
+    finish times, recent solve rate equal to the average, no trend, max
+    rating equal to the current rating.
+    """
+    user = {"avgSolveRate": solve_rate}
+    for (name, _, _), value in zip(
+        OFF_GRID, projected_values(0.0, solve_rate), strict=True
+    ):
+        user[name] = value
+    features = build_features(user, ratings, attended, ranks, total_participants)
+    features[:, 10] = ratings  # maxRating
+    return features
+
+
+def build_lookup_table(
+    model, scaler, total_participants: int, contest_name: str = ""
+) -> LookupTable:
+    """Evaluate the model over the whole grid, one solve rate per batch.
+
+    Each batch also evaluates one forward-difference step per ``OFF_GRID``
+    feature to fill the slope channels.
+    """
+    ranks = rank_axis(total_participants)
+    axes = [RATING_AXIS, ranks, SOLVE_RATE_AXIS, ATTENDED_AXIS]
+    r, k, a = np.meshgrid(RATING_AXIS, ranks, ATTENDED_AXIS, indexing="ij")
+    values = np.empty(
+        [len(axis) for axis in axes] + [1 + len(OFF_GRID)], dtype=np.float32
+    )
+    for s, solve_rate in enumerate(SOLVE_RATE_AXIS):
+        base = grid_features(
+            r.ravel(), k.ravel(), solve_rate, a.ravel(), total_participants
+        )
+        batches = [base]
+        for _, column, step in OFF_GRID:
+            shifted = base.copy()
+            shifted[:, column] += step
+            if column == 6:
+                shifted[:, 14] += step / 5400
+            batches.append(shifted)
+        outputs = make_batch_prediction(model, scaler, np.concatenate(batches))
+        outputs = outputs.reshape(len(batches), -1)
+        steps = np.array([step for _, _, step in OFF_GRID])[:, None]
+        slopes = (outputs[1:] - outputs[0]) / steps
+        channels = np.concatenate([outputs[:1], slopes]).T
+        values[:, :, s, :, :] = channels.reshape(r.shape + (len(batches),))
+    meta = {
+        "contest": contest_name,
+        "total_participants": int(total_participants),
+        "runtime": model_runtime(model),
+    }
+    return LookupTable(axes, values, meta)
+
+
+def measure_error(table: LookupTable, model, scaler, users, ranks) -> dict:
+    """Compare table and model on real feature rows.
+
+    ``users`` are ``fetch_user_data``-shaped dicts and ``ranks`` the ranks
+    to evaluate each at; the model sees the users' full features, exactly as
+    the API would build them.
+    """
+    total = table.total_participants
+    rows, approx = [], []
+    for user, rank in zip(users, ranks, strict=True):
+        rating, attended = user["rating"], user["attendedContestsCount"]
+        rows.append(build_features(user, rating, attended, rank, total)[0])
+        approx.append(table.predict_user(user, rating, attended, rank))
+    exact = make_batch_prediction(model, scaler, np.array(rows))
+    errors = np.abs(np.array(approx) - exact)
+    return {
+        "samples": int(errors.size),
+        "max_abs_error": float(errors.max()),
+        "p99_abs_error": float(np.percentile(errors, 99)),
+        "mean_abs_error": float(errors.mean()),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Serving
+# ---------------------------------------------------------------------------
+
+
+def table_path(contest_name: str, directory: Optional[str] = None) -> str:
+    return os.path.join(directory or LOOKUP_DIR, f"{contest_name}.npz")
+
+
+@lru_cache(maxsize=16)
+def _cached_table(path: str, mtime: float) -> LookupTable:
+    return LookupTable.load(path)
+
+
+def get_lookup_table(
+    contest_name: str,
+    total_participants: int,
+    max_p99_error: float,
+    model_version: str,
+    runtime: str,
+) -> Optional[LookupTable]:
+    """Return the contest's table if it exists, matches and is accurate enough.
+
+    Tables built from another model version or runtime (or before those
+    were recorded) are not served.
+    """
+    path = table_path(contest_name)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    table = _cached_table(path, mtime)
+    if table.meta.get("model_version") != model_version:
+        return None
+    if table.meta.get("runtime") != runtime:
+        return None
+    if table.total_participants != total_participants:
+        return None
+    if table.meta.get("p99_abs_error", float("inf")) > max_p99_error:
+        return None
+    return table
@@ -0,0 +1,101 @@
+"""Monte Carlo simulation of rating trajectories over future contests.
+
+Every path starts at the user's current rating.  At each contest a rank is
+drawn per path from that contest's rank distribution, the ``(paths, 15)``
+feature matrix is built in one call and the model is evaluated on it as a
+single batch, so the cost per step is one ``scaler.transform`` and one
+``model.predict`` regardless of the number of paths.
+
+History features (solve rates, finish times, trend, max rating) are held at
+their current values along every path; only rating, rank and the attended
+count evolve.
+
+A simulation given an ``expires`` time stops between contests once it has
+passed, so a request that timed out does not keep its thread busy.
+"""
+
+import math
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.prediction import build_features, make_batch_prediction
+
+# Participant count for contests without ingested standings (recent weekly
+# contests draw 25-35k)
+DEFAULT_PARTICIPANTS = 30000
+MIN_SPREAD = 0.1
+MIN_HISTORY_RANKS = 3
+
+
+class SimulationExpiredError(Exception):
+    """The simulation's ``expires`` time passed before it finished."""
+
+
+def rank_distribution_from_history(ranks: Sequence[int]):
+    """Log-normal ``(median, spread)`` fitted to past contest ranks, or None.
+
+    ``spread`` is the standard deviation of ``log(rank)``; it is floored so a
+    user with very consistent ranks still gets some variation.
+    """
+    ranks = [r for r in ranks if r and r > 0]
+    if len(ranks) < MIN_HISTORY_RANKS:
+        return None
+    logs = np.log(np.asarray(ranks, dtype=np.float64))
+    return float(np.exp(logs.mean())), max(float(logs.std()), MIN_SPREAD)
+
+
+def sample_ranks(median, spread, total_participants, size, rng) -> np.ndarray:
+    """Draw ``size`` log-normal ranks clipped to ``[1, total_participants]``."""
+    ranks = rng.lognormal(math.log(median), spread, size)
+    return np.clip(np.rint(ranks), 1, total_participants)
+
+
+def percentile_bands(values: np.ndarray, percentiles: Sequence[float]) -> Dict:
+    points = np.percentile(values, percentiles)
+    return {
+        f"p{p:g}": round(float(v), 2) for p, v in zip(percentiles, points, strict=True)
+    }
+
+
+def simulate(
+    model,
+    scaler,
+    user_data,
+    rating: float,
+    attended: int,
+    steps: List[dict],
+    paths: int,
+    percentiles: Sequence[float],
+    seed: Optional[int] = None,
+    expires: Optional[float] = None,
+):
+    """Simulate ``paths`` trajectories through ``steps``.
+
+    Each step is ``{"name", "median", "spread", "total_participants"}``.
+    Returns ``(step_summaries, final_ratings)``.  Raises
+    :class:`SimulationExpiredError` before a step if ``time.monotonic()``
+    has reached ``expires``.
+    """
+    rng = np.random.default_rng(seed)
+    ratings = np.full(paths, float(rating))
+    summaries = []
+    for i, step in enumerate(steps):
+        if expires is not None and time.monotonic() >= expires:
+            raise SimulationExpiredError(f"Expired after {i} of {len(steps)} steps")
+        total = step["total_participants"]
+        ranks = sample_ranks(step["median"], step["spread"], total, paths, rng)
+        features = build_features(user_data, ratings, attended + i, ranks, total)
+        ratings = ratings + make_batch_prediction(model, scaler, features)
+        summaries.append(
+            {
+                "contest_name": step["name"],
+                "rank_median": round(step["median"], 1),
+                "rank_spread": round(step["spread"], 3),
+                "total_participants": total,
+                "mean": round(float(ratings.mean()), 2),
+                "percentiles": percentile_bands(ratings, percentiles),
+            }
+        )
+    return summaries, ratings
@@ -0,0 +1,154 @@
+"""Columnar, memory-mapped contest standings.
+
+Each ingested contest is a directory under ``CONTEST_STORE_DIR``::
+
+    <root>/weekly-contest-490/
+        meta.json          contest name, participant count, ingest time
+        rank.npy           int32, ascending
+        score.npy          int16, non-increasing
+        finish_time.npy    uint32 epoch seconds, ascending within a score
+        user_idx.npy       int32 line number in <root>/usernames.txt
+    <root>/usernames.txt   username pool shared by all contests
+
+Rows are stored in standings order, so every lookup is a binary search over
+a memory-mapped column: nothing is read into memory beyond the pages the
+search touches, and a 30k-participant contest takes ~420KB on disk.
+"""
+
+import json
+import os
+import shutil
+import time
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import CONTEST_STORE_DIR
+
+COLUMNS = {
+    "rank": np.int32,
+    "score": np.int16,
+    "finish_time": np.uint32,
+    "user_idx": np.int32,
+}
+USERNAMES_FILE = "usernames.txt"
+
+
+class ContestStandings:
+    """Read-only view of one contest's stored standings."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path / "meta.json", "r") as f:
+            self.meta = json.load(f)
+        for name in COLUMNS:
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+    @property
+    def participants(self) -> int:
+        return int(self.meta["participants"])
+
+    def percentile(self, rank: int) -> float:
+        """Percentage of participants ranked at or above ``rank`` (0-100]."""
+        position = int(np.searchsorted(self.rank, rank, side="right"))
+        return 100.0 * max(position, 1) / self.participants
+
+    def rank_for_score(self, score: int, finish_time: Optional[int] = None) -> int:
+        """Rank a submission with ``score`` (finished at ``finish_time``) gets.
+
+        Without a finish time the best rank among equal scores is returned.
+        """
+        # score is non-increasing, so search on its negation via key=
+        first = bisect_left(self.score, -score, key=lambda s: -int(s))
+        if finish_time is None:
+            position = first
+        else:
+            last = bisect_right(self.score, -score, lo=first, key=lambda s: -int(s))
+            position = first + int(
+                np.searchsorted(self.finish_time[first:last], finish_time)
+            )
+        if position < len(self.rank):
+            return int(self.rank[position])
+        return self.participants + 1
+
+
+def write_standings(root, contest_name: str, rows) -> ContestStandings:
+    """Store ranking rows (``username``, ``rank``, ``score``, ``finish_time``).
+
+    New usernames are added to the end of the shared pool, so existing
+    contests' ``user_idx`` stay valid.  The pool and the contest directory
+    are written to a temporary path and swapped in, pool first, so readers
+    never see a partial contest or a torn name, and every stored index
+    points at a complete line.
+    """
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    rows = sorted(rows, key=lambda r: (r["rank"], r.get("finish_time", 0)))
+
+    pool_path = root / USERNAMES_FILE
+    pool = pool_path.read_text().splitlines() if pool_path.exists() else []
+    index = {name: i for i, name in enumerate(pool)}
+    new_names = []
+    for row in rows:
+        if row["username"] not in index:
+            index[row["username"]] = len(pool) + len(new_names)
+            new_names.append(row["username"])
+
+    tmp = root / f".{contest_name}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    if new_names:
+        names = "".join(f"{name}\n" for name in pool + new_names)
+        (tmp / USERNAMES_FILE).write_text(names)
+    values = {
+        "rank": [r["rank"] for r in rows],
+        "score": [r.get("score", 0) for r in rows],
+        "finish_time": [r.get("finish_time", 0) for r in rows],
+        "user_idx": [index[r["username"]] for r in rows],
+    }
+    for name, dtype in COLUMNS.items():
+        np.save(tmp / f"{name}.npy", np.asarray(values[name], dtype=dtype))
+    meta = {
+        "contest": contest_name,
+        "participants": len(rows),
+        "ingested_at": int(time.time()),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    if new_names:
+        os.replace(tmp / USERNAMES_FILE, pool_path)
+    dest = root / contest_name
+    if dest.exists():
+        old = root / f".{contest_name}.old"
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(dest, old)
+        os.replace(tmp, dest)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, dest)
+    return ContestStandings(dest)
+
+
+def load_usernames(root) -> list:
+    path = Path(root) / USERNAMES_FILE
+    return path.read_text().splitlines() if path.exists() else []
+
+
+@lru_cache(maxsize=64)
+def _open(path: str, mtime: float) -> ContestStandings:
+    return ContestStandings(path)
+
+
+def get_contest_standings(
+    contest_name: str, root: Optional[str] = None
+) -> Optional[ContestStandings]:
+    """Return the stored standings for a contest, or None if not ingested."""
+    path = os.path.join(root or CONTEST_STORE_DIR, contest_name)
+    try:
+        mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+    except OSError:
+        return None
+    return _open(path, mtime)
@@ -0,0 +1,161 @@
+"""Memory-mapped snapshot of known users' prediction features.
+
+``scripts/build_user_snapshot.py`` fetches users the way the API does and
+stores what ``fetch_user_data`` would return for each of them::
+
+    <USER_SNAPSHOT_DIR>/
+        meta.json          format, user count, build time
+        keys.npy           uint64 username hashes, ascending
+        features.npy       float32 (users, len(FEATURES))
+        recent_ranks.npy   int32 (users, RECENT_RANKS), 0-padded
+        fetched_at.npy     uint32 epoch seconds each user was fetched
+
+A lookup is one binary search over the memory-mapped keys.  The API serves
+entries younger than ``USER_SNAPSHOT_MAX_AGE`` without calling LeetCode, and
+older ones when LeetCode fails; ``snapshotAge`` tells callers how old the
+data is.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from app.config import USER_SNAPSHOT_DIR
+
+FORMAT_VERSION = 1
+# As many as fetch_user_data keeps (app.services.leetcode.RECENT_RANKS)
+RECENT_RANKS = 10
+FEATURES = (
+    "rating",
+    "attendedContestsCount",
+    "avgSolveRate",
+    "avgFinishTime",
+    "recentSolveRate",
+    "recentFinishTime",
+    "ratingTrend",
+    "maxRating",
+)
+
+
+def username_key(username: str) -> int:
+    """64-bit key of a (case-insensitive) username."""
+    digest = hashlib.blake2b(username.lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class UserSnapshot:
+    """Read-only view of a built snapshot."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        if self.meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported user snapshot format in {self.path}")
+        for name in ("keys", "features", "recent_ranks", "fetched_at"):
+            setattr(self, name, np.load(self.path / f"{name}.npy", mmap_mode="r"))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _row(self, username: str) -> Optional[int]:
+        key = np.uint64(username_key(username))
+        row = int(np.searchsorted(self.keys, key))
+        if row < len(self.keys) and self.keys[row] == key:
+            return row
+        return None
+
+    def lookup(self, username: str, now: Optional[float] = None) -> Optional[dict]:
+        """The user's data as ``fetch_user_data`` returns it, or None."""
+        row = self._row(username)
+        if row is None:
+            return None
+        values = self.features[row].tolist()
+        user_data = dict(zip(FEATURES, values, strict=True))
+        user_data["attendedContestsCount"] = int(user_data["attendedContestsCount"])
+        user_data["recentRanks"] = [int(r) for r in self.recent_ranks[row] if r > 0]
+        fetched_at = int(self.fetched_at[row])
+        user_data["snapshotFetchedAt"] = fetched_at
+        user_data["snapshotAge"] = int((now or time.time()) - fetched_at)
+        return user_data
+
+    def entries(self):
+        """``key -> (features, recent_ranks, fetched_at)`` for rebuilding."""
+        return {
+            int(key): (self.features[i], self.recent_ranks[i], int(self.fetched_at[i]))
+            for i, key in enumerate(self.keys)
+        }
+
+
+def _row_values(user_data: dict):
+    features = [float(user_data[name]) for name in FEATURES]
+    ranks = list(user_data.get("recentRanks") or [])[-RECENT_RANKS:]
+    return features, ranks + [0] * (RECENT_RANKS - len(ranks))
+
+
+def write_snapshot(root, users, fetched_at=None, previous=None) -> UserSnapshot:
+    """Write ``{username: user_data}`` as a snapshot under ``root``.
+
+    Entries of ``previous`` (a :class:`UserSnapshot`) that are not in
+    ``users`` are kept.  The new snapshot is written next to ``root`` and
+    swapped in, so readers never see a partial one.
+    """
+    root = Path(root)
+    fetched_at = int(fetched_at or time.time())
+    rows = previous.entries() if previous is not None else {}
+    for username, user_data in users.items():
+        features, ranks = _row_values(user_data)
+        rows[username_key(username)] = (features, ranks, fetched_at)
+
+    keys = np.array(sorted(rows), dtype=np.uint64)
+    ordered = [rows[int(key)] for key in keys]
+    columns = {
+        "keys": keys,
+        "features": np.array([r[0] for r in ordered], dtype=np.float32).reshape(
+            -1, len(FEATURES)
+        ),
+        "recent_ranks": np.array([r[1] for r in ordered], dtype=np.int32).reshape(
+            -1, RECENT_RANKS
+        ),
+        "fetched_at": np.array([r[2] for r in ordered], dtype=np.uint32),
+    }
+
+    root.parent.mkdir(parents=True, exist_ok=True)
+    tmp = root.with_name(f".{root.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    for name, values in columns.items():
+        np.save(tmp / f"{name}.npy", values)
+    meta = {"format": FORMAT_VERSION, "users": len(keys), "built_at": fetched_at}
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    if root.exists():
+        old = root.with_name(f".{root.name}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(root, old)
+        os.replace(tmp, root)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, root)
+    return UserSnapshot(root)
+
+
+@lru_cache(maxsize=2)
+def _open(path: str, mtime: float) -> UserSnapshot:
+    return UserSnapshot(path)
+
+
+def get_user_snapshot(root: Optional[str] = None) -> Optional[UserSnapshot]:
+    """The current snapshot, or None if none has been built."""
+    path = root or USER_SNAPSHOT_DIR
+    try:
+        mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+    except OSError:
+        return None
+    return _open(path, mtime)
@@ -0,0 +1,249 @@
+"""Compact, immutable prefix index of known usernames for autocomplete.
+
+``scripts/build_username_index.py`` builds it from ``data/usernames.json``::
+
+    <USERNAME_INDEX_DIR>/
+        meta.json      format, name count, build time
+        names.bin      UTF-8 names, sorted case-insensitively, concatenated
+        offsets.npy    int64 (names + 1,): where each name starts in names.bin
+
+Both files are memory-mapped, so opening the index costs the same for ten
+names or ten million.  A prefix query is two binary searches (lowercasing
+the probed names as it goes); the matches are the contiguous range between
+them, already in order.
+
+Names seen in successful predictions are kept in a small sorted buffer,
+searchable straight away, and merged into the index every
+``USERNAME_MERGE_INTERVAL`` seconds.  A merge streams the existing index and
+the buffer, both sorted, into a new one in a single pass and swaps it in;
+nothing is re-sorted or re-read from ``usernames.json``.
+"""
+
+import asyncio
+import bisect
+import fcntl
+import heapq
+import json
+import logging
+import mmap
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from app.config import USERNAME_INDEX_DIR
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+# Sorts after every UTF-8 byte, so ``prefix + END`` bounds the prefix's range
+END = b"\xff"
+
+
+def _key(name: str) -> bytes:
+    return name.lower().encode()
+
+
+class _Keys:
+    """Sequence view of the lowercased names, for :mod:`bisect`."""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].lower()
+
+
+class UsernameIndex:
+    """Read-only view of a built index."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.meta = json.loads((self.path / "meta.json").read_text())
+        if self.meta.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported username index format in {self.path}")
+        # A memoryview hands out plain ints, several times faster than
+        # indexing the memmap itself
+        self.offsets = memoryview(np.load(self.path / "offsets.npy", mmap_mode="r"))
+        with open(self.path / "names.bin", "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap() rejects empty files
+            self.blob = (
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+            )
+        self.keys = _Keys(self.blob, self.offsets)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __iter__(self):
+        for start in range(0, len(self), 65536):
+            bounds = self.offsets[start : start + 65537].tolist()
+            for begin, end in zip(bounds, bounds[1:], strict=False):
+                yield self.blob[begin:end].decode()
+
+    def name(self, i: int) -> str:
+        return self.blob[self.offsets[i] : self.offsets[i + 1]].decode()
+
+    def range(self, prefix: str):
+        """``(lo, hi)``: the rows whose names start with ``prefix``."""
+        key = _key(prefix)
+        lo = bisect.bisect_left(self.keys, key)
+        return lo, bisect.bisect_left(self.keys, key + END, lo)
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        lo, hi = self.range(prefix)
+        return [self.name(i) for i in range(lo, min(hi, lo + limit))]
+
+    def __contains__(self, username: str) -> bool:
+        key = _key(username)
+        row = bisect.bisect_left(self.keys, key)
+        return row < len(self) and self.keys[row] == key
+
+
+def _unique(names: Iterable[str]):
+    """Drop case-insensitive repeats from names sorted by key, keeping the first."""
+    last = None
+    for name in names:
+        key = _key(name)
+        if key != last:
+            last = key
+            yield name
+
+
+def _write(root: Path, names: Iterable[str]) -> "UsernameIndex":
+    """Write already sorted, unique ``names`` as the index at ``root``."""
+    root.parent.mkdir(parents=True, exist_ok=True)
+    tmp = root.with_name(f".{root.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir()
+    offsets = [0]
+    with open(tmp / "names.bin", "wb") as f:
+        for name in names:
+            data = name.encode()
+            f.write(data)
+            offsets.append(offsets[-1] + len(data))
+    np.save(tmp / "offsets.npy", np.array(offsets, dtype=np.int64))
+    meta = {
+        "format": FORMAT_VERSION,
+        "names": len(offsets) - 1,
+        "built_at": time.time(),
+    }
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+
+    if root.exists():
+        old = root.with_name(f".{root.name}.old")
+        shutil.rmtree(old, ignore_errors=True)
+        os.replace(root, old)
+        os.replace(tmp, root)
+        shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, root)
+    return UsernameIndex(root)
+
+
+@contextmanager
+def _locked(root: Path):
+    """Hold the lock file that serialises writers of the index at ``root``."""
+    root.parent.mkdir(parents=True, exist_ok=True)
+    with open(root.with_name(f".{root.name}.lock"), "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+
+def write_index(root, names: Iterable[str]) -> UsernameIndex:
+    """Build an index of ``names`` (any order, repeats allowed) at ``root``."""
+    root = Path(root)
+    names = sorted((n.strip() for n in names if n.strip()), key=_key)
+    with _locked(root):
+        return _write(root, _unique(names))
+
+
+def merge_index(root, names: Iterable[str]) -> UsernameIndex:
+    """Merge ``names`` into the index at ``root`` (creating it if needed).
+
+    The existing index is streamed, not loaded.  Merges and rebuilds take
+    the same lock file, so writers from several worker processes and the
+    build script never interleave.
+    """
+    root = Path(root)
+    new = sorted((n.strip() for n in names if n.strip()), key=_key)
+    with _locked(root):
+        existing = UsernameIndex(root) if (root / "meta.json").exists() else []
+        # heapq.merge is stable: an existing name keeps its spelling
+        return _write(root, _unique(heapq.merge(existing, new, key=_key)))
+
+
+@lru_cache(maxsize=2)
+def _open(path: str, mtime: float) -> UsernameIndex:
+    return UsernameIndex(path)
+
+
+def get_username_index(root: Optional[str] = None) -> Optional[UsernameIndex]:
+    """The current index, or None if none has been built."""
+    path = root or USERNAME_INDEX_DIR
+    try:
+        mtime = os.path.getmtime(os.path.join(path, "meta.json"))
+    except OSError:
+        return None
+    return _open(path, mtime)
+
+
+class UsernameCatalog:
+    """The on-disk index plus names seen since the last merge.
+
+    ``add`` and ``search`` run on the event loop; ``flush`` merges the
+    buffered names in a thread.  At most ``max_pending`` names are buffered
+    between merges; later ones wait to be seen again.
+    """
+
+    def __init__(self, root, max_pending: int):
+        self.root = str(root)
+        self.max_pending = max_pending
+        self.pending = {}  # key -> name
+        self.pending_keys = []  # sorted
+
+    def index(self) -> Optional[UsernameIndex]:
+        return get_username_index(self.root)
+
+    def add(self, username: str):
+        key = _key(username)
+        if key in self.pending or len(self.pending) >= self.max_pending:
+            return
+        index = self.index()
+        if index is not None and username in index:
+            return
+        self.pending[key] = username
+        bisect.insort(self.pending_keys, key)
+
+    def search(self, prefix: str, limit: int) -> List[str]:
+        """Up to ``limit`` known names starting with ``prefix``, in order."""
+        index = self.index()
+        indexed = index.search(prefix, limit) if index is not None else []
+        key = _key(prefix)
+        lo = bisect.bisect_left(self.pending_keys, key)
+        hi = bisect.bisect_left(self.pending_keys, key + END, lo)
+        pending = [self.pending[k] for k in self.pending_keys[lo : min(hi, lo + limit)]]
+        merged = _unique(heapq.merge(indexed, pending, key=_key))
+        return list(islice(merged, limit))
+
+    async def flush(self):
+        """Merge the buffered names into the on-disk index."""
+        batch = dict(self.pending)
+        if not batch:
+            return
+        index = await asyncio.to_thread(merge_index, self.root, batch.values())
+        for key in batch:
+            del self.pending[key]
+        self.pending_keys = sorted(self.pending)
+        logger.info(f"Merged {len(batch)} usernames; index now holds {len(index)}")
@@ -0,0 +1,96 @@
+"""Compiled TensorFlow inference with a pinned input signature.
+
+``model.predict`` builds a data adapter and iterates a one-batch dataset on
+every call, which dominates the cost of predicting a single row.
+:func:`compile_keras_model` instead wraps the model once, at load time, in a
+``tf.function`` whose input signature is fixed to ``(None, n_features)``
+float32, so it is traced exactly once.  The legacy LSTM layout (one timestep)
+is resolved at the same time and folded into the graph.
+
+With XLA (``jit_compile=True``) every distinct batch size would trigger a
+recompile, so batches are padded up to a fixed set of bucket sizes using
+preallocated buffers, and every bucket is compiled during warm-up.
+"""
+
+import threading
+from bisect import bisect_left
+
+import numpy as np
+
+DEFAULT_BUCKETS = (1, 4, 16, 64, 256, 1024, 4096)
+
+
+class CompiledModel:
+    """Keras-compatible ``predict`` over a compiled forward function.
+
+    ``forward`` maps a float32 ``(batch, n_features)`` array to
+    ``(batch, outputs)``.  With ``pad_to_buckets`` every call is padded to
+    the next bucket size (larger batches run in chunks of the largest one).
+    """
+
+    def __init__(
+        self, forward, n_features, buckets=DEFAULT_BUCKETS, pad_to_buckets=False
+    ):
+        self._forward = forward
+        self.input_shape = (None, n_features)
+        self.buckets = tuple(sorted(buckets))
+        self.pad_to_buckets = pad_to_buckets
+        self._buffers = {}
+        self._lock = threading.Lock()
+
+    def _run(self, x):
+        return np.asarray(self._forward(x))
+
+    def _run_padded(self, x):
+        size = len(x)
+        bucket = self.buckets[bisect_left(self.buckets, size)]
+        with self._lock:
+            buffer = self._buffers.get(bucket)
+            if buffer is None:
+                buffer = np.zeros((bucket, self.input_shape[1]), dtype=np.float32)
+                self._buffers[bucket] = buffer
+            buffer[:size] = x
+            buffer[size:] = 0.0
+            return self._run(buffer)[:size]
+
+    def predict(self, x, verbose=0):
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 3:  # callers using the legacy (n, 1, features) layout
+            x = x.reshape(x.shape[0], -1)
+        if not self.pad_to_buckets:
+            return self._run(x)
+        largest = self.buckets[-1]
+        if len(x) <= largest:
+            return self._run_padded(x)
+        return np.concatenate(
+            [self._run_padded(x[i : i + largest]) for i in range(0, len(x), largest)]
+        )
+
+    def warm_up(self):
+        """Trace (and with XLA, compile) ahead of the first request."""
+        sizes = self.buckets if self.pad_to_buckets else self.buckets[:1]
+        for size in sizes:
+            self.predict(np.zeros((size, self.input_shape[1]), dtype=np.float32))
+        return self
+
+
+def compile_keras_model(tf, model, jit_compile: bool = False, buckets=DEFAULT_BUCKETS):
+    """Wrap a loaded Keras model in a warmed-up :class:`CompiledModel`."""
+    expected = model.input_shape
+    lstm = len(expected) == 3
+    n_features = expected[-1]
+
+    @tf.function(
+        input_signature=[tf.TensorSpec([None, n_features], tf.float32)],
+        jit_compile=jit_compile,
+    )
+    def forward(x):
+        if lstm:
+            x = tf.expand_dims(x, 1)
+        return model(x, training=False)
+
+    def run(x):
+        return forward(tf.convert_to_tensor(x)).numpy()
+
+    compiled = CompiledModel(run, n_features, buckets, pad_to_buckets=jit_compile)
+    return compiled.warm_up()
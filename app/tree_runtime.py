@@ -0,0 +1,136 @@
+"""Gradient-boosted-tree model evaluated with NumPy.
+
+:func:`export_gbr` flattens a fitted scikit-learn
+``GradientBoostingRegressor`` into one ``.npz`` of node arrays (feature,
+threshold, children, leaf value) and :class:`TreeModel` evaluates it.  All
+trees advance one level per step over the whole batch, so a prediction costs
+``max_depth`` vectorised gathers of shape ``(trees, rows)`` and needs neither
+TensorFlow nor scikit-learn at runtime.
+
+Leaves point at themselves with an infinite threshold, which lets every tree
+take exactly ``max_depth`` steps without a per-node leaf check.
+
+Like the Keras model, :class:`TreeModel` consumes scaled features (the
+regressor is trained on ``scaler.transform`` output), so it drops into
+``make_batch_prediction`` unchanged.
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+FORMAT_VERSION = 1
+# Rows evaluated per pass; keeps the (trees, rows) work arrays cache-sized
+CHUNK_ROWS = 512
+
+
+def export_gbr(estimator, path) -> Path:
+    """Write a fitted ``GradientBoostingRegressor`` as flat node arrays."""
+    features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in estimator.estimators_[:, 0]:
+        t = tree.tree_
+        n = t.node_count
+        leaf = t.children_left == -1
+        own = np.arange(offset, offset + n)
+        features.append(np.where(leaf, 0, t.feature))
+        thresholds.append(np.where(leaf, np.inf, t.threshold))
+        lefts.append(np.where(leaf, own, t.children_left + offset))
+        rights.append(np.where(leaf, own, t.children_right + offset))
+        values.append(t.value[:, 0, 0] * estimator.learning_rate)
+        roots.append(offset)
+        offset += n
+
+    init = estimator.init_
+    base = float(np.ravel(init.constant_)[0]) if hasattr(init, "constant_") else 0.0
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp.npz")
+    np.savez(
+        tmp,
+        feature=np.concatenate(features).astype(np.int16),
+        threshold=np.concatenate(thresholds).astype(np.float64),
+        left=np.concatenate(lefts).astype(np.int32),
+        right=np.concatenate(rights).astype(np.int32),
+        value=np.concatenate(values).astype(np.float64),
+        roots=np.asarray(roots, dtype=np.int32),
+        meta=np.array(
+            [FORMAT_VERSION, base, estimator.max_depth, estimator.n_features_in_]
+        ),
+    )
+    tmp.replace(path)
+    return path
+
+
+class TreeModel:
+    """Batch evaluation of flattened regression trees."""
+
+    def __init__(
+        self, feature, threshold, left, right, value, roots, base, depth, n_features
+    ):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = threshold
+        # children[2 * node] is the left child, children[2 * node + 1] the right
+        self.children = np.stack([left, right], axis=1).ravel().astype(np.intp)
+        self.value = value
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.base = base
+        self.depth = depth
+        self.input_shape = (None, n_features)
+
+    def _predict_chunk(self, x):
+        rows = len(x)
+        columns = np.ascontiguousarray(x.T).ravel()
+        offsets = np.arange(rows)
+        nodes = np.repeat(self.roots[:, None], rows, axis=1)
+        for _ in range(self.depth):
+            values = columns.take(self.feature.take(nodes) * rows + offsets)
+            right = values > self.threshold.take(nodes)
+            nodes = self.children.take(nodes * 2 + right)
+        return self.base + self.value.take(nodes).sum(axis=0)
+
+    def predict(self, x, verbose=0):
+        # scikit-learn compares float32 features against its thresholds
+        x = np.asarray(x, dtype=np.float32)
+        if x.ndim == 3:  # tolerate the legacy (n, 1, features) layout
+            x = x.reshape(x.shape[0], -1)
+        if x.ndim == 1:
+            x = x[None, :]
+        if len(x) <= CHUNK_ROWS:
+            return self._predict_chunk(x)[:, None]
+        return np.concatenate(
+            [
+                self._predict_chunk(x[i : i + CHUNK_ROWS])
+                for i in range(0, len(x), CHUNK_ROWS)
+            ]
+        )[:, None]
+
+    @property
+    def trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(
+            a.nbytes for a in (self.feature, self.threshold, self.children, self.value)
+        )
+
+
+def load_tree_model(path) -> TreeModel:
+    """Load a model written by :func:`export_gbr`."""
+    with np.load(path) as data:
+        version, base, depth, n_features = data["meta"]
+        if int(version) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported tree model format {int(version)}")
+        model = TreeModel(
+            data["feature"],
+            data["threshold"],
+            data["left"],
+            data["right"],
+            data["value"],
+            data["roots"],
+            float(base),
+            int(depth),
+            int(n_features),
+        )
+    return model
@@ -0,0 +1,135 @@
+"""Admission control: bounded in-flight work with CoDel-style shedding.
+
+Up to ``max_in_flight`` requests run at once.  Further cold requests wait
+in a FIFO queue of at most ``max_queue``.  As in CoDel, the time each one
+spent queued is compared with ``target``: a queue that has stayed above the
+target for a whole ``interval`` is a standing queue, not a burst.  While
+that lasts, new cold requests are rejected straight away and queued ones
+that waited too long are rejected as they reach the front, so the requests
+that are admitted still get answered at normal latency.
+
+Cheap requests (answerable from the cache) skip the queue and are admitted
+up to ``max_in_flight * CHEAP_HEADROOM``; they cost milliseconds and
+shedding them would not free any capacity.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.utils.deadline import bounded
+from app.utils.metrics import ADMISSION_DECISIONS, ADMISSION_IN_FLIGHT
+from app.utils.timing import observe
+
+CHEAP_HEADROOM = 2
+
+
+class OverloadedError(Exception):
+    """Rejected by admission control; retry after ``retry_after`` seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server overloaded")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue: int,
+        target: float,
+        interval: float,
+    ):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.target = target
+        self.interval = interval
+        self.in_flight = 0
+        self.queue = deque()
+        # CoDel state: when the queueing delay may next be declared standing
+        self.first_above = None
+        self.dropping = False
+
+    def retry_after(self) -> int:
+        """Seconds until the queue has probably drained."""
+        per_request = max(self.target, self.interval / max(self.max_in_flight, 1))
+        return max(1, math.ceil(len(self.queue) * per_request))
+
+    def _reject(self, cost: str):
+        ADMISSION_DECISIONS.inc(cost, "rejected")
+        raise OverloadedError(self.retry_after())
+
+    def _note_delay(self, delay: float, now: float):
+        if delay < self.target:
+            self.first_above = None
+            self.dropping = False
+        elif self.first_above is None:
+            self.first_above = now + self.interval
+        elif now >= self.first_above:
+            self.dropping = True
+
+    def _release(self):
+        """Hand the freed slot to the next queued request, if any."""
+        self.in_flight -= 1
+        now = time.monotonic()
+        while self.queue and self.in_flight < self.max_in_flight:
+            waiter, enqueued = self.queue.popleft()
+            if waiter.done():
+                continue
+            delay = now - enqueued
+            self._note_delay(delay, now)
+            if self.dropping and delay >= self.target:
+                waiter.set_exception(OverloadedError(self.retry_after()))
+                ADMISSION_DECISIONS.inc("cold", "rejected")
+                continue
+            self.in_flight += 1
+            waiter.set_result(delay)
+        if not self.queue:
+            self.first_above = None
+            self.dropping = False
+
+    async def _wait(self):
+        if self.queue:
+            # The head's wait so far: a stuck queue is noticed without
+            # waiting for a slot to free up
+            now = time.monotonic()
+            self._note_delay(now - self.queue[0][1], now)
+        if self.dropping or len(self.queue) >= self.max_queue:
+            self._reject("cold")
+        waiter = asyncio.get_running_loop().create_future()
+        self.queue.append((waiter, time.monotonic()))
+        ADMISSION_DECISIONS.inc("cold", "queued")
+        try:
+            delay = await bounded(waiter, "admission_wait")
+        except BaseException:
+            if waiter.done() and not waiter.cancelled() and not waiter.exception():
+                self._release()  # admitted just as the caller gave up
+            raise
+        observe("admission_wait", delay)
+
+    @asynccontextmanager
+    async def slot(self, is_cheap=None):
+        """Hold one in-flight slot for the ``async with`` block.
+
+        ``is_cheap()`` is only consulted when the service is at capacity.
+        Raises :class:`OverloadedError` when the request is shed.
+        """
+        if self.in_flight < self.max_in_flight and not self.queue:
+            self.in_flight += 1
+            ADMISSION_DECISIONS.inc("any", "admitted")
+        elif is_cheap is not None and is_cheap():
+            if self.in_flight >= self.max_in_flight * CHEAP_HEADROOM:
+                self._reject("cheap")
+            self.in_flight += 1
+            ADMISSION_DECISIONS.inc("cheap", "admitted")
+        else:
+            await self._wait()
+            ADMISSION_DECISIONS.inc("cold", "admitted")
+        ADMISSION_IN_FLIGHT.set(value=self.in_flight)
+        try:
+            yield
+        finally:
+            self._release()
+            ADMISSION_IN_FLIGHT.set(value=self.in_flight)
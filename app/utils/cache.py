@@ -5,6 +5,9 @@ import os
 import time
 from typing import Any, Optional
 
+from app.utils.metrics import CACHE_REQUESTS, CACHE_SECONDS
+from app.utils.timing import record
+
 try:
     import redis
 except Exception:
@@ -28,6 +31,11 @@ class TTLCache:
         self._store.pop(key, None)
         return None
 
+    def contains(self, *keys: str) -> bool:
+        """Whether every key holds an unexpired entry."""
+        now = time.time()
+        return all(self._store.get(k, (None, 0))[1] > now for k in keys)
+
     def set(self, key: str, value: Any):
         self._store[key] = (value, time.time() + self.ttl)
 
@@ -57,12 +65,45 @@ class RedisCache:
         except (json.JSONDecodeError, TypeError):
             return None
 
+    def contains(self, *keys: str) -> bool:
+        """Whether every key exists, in one round-trip and without the values."""
+        keys = set(keys)
+        return not keys or self.client.exists(*keys) == len(keys)
+
     def set(self, key: str, value: Any):
         self.client.setex(key, self.ttl, json.dumps(value))
 
 
+class InstrumentedCache:
+    """Wraps a cache backend with latency and hit/miss metrics."""
+
+    def __init__(self, backend, name: str):
+        self.backend = backend
+        self.name = name
+
+    def get(self, key: str) -> Optional[Any]:
+        start = time.perf_counter()
+        value = self.backend.get(key)
+        elapsed = time.perf_counter() - start
+        CACHE_SECONDS.observe(elapsed, self.name, "get")
+        record("cache", elapsed)
+        CACHE_REQUESTS.inc(self.name, "miss" if value is None else "hit")
+        return value
+
+    def contains(self, *keys: str) -> bool:
+        """Presence probe; not a read, so it is left out of the metrics."""
+        return self.backend.contains(*keys)
+
+    def set(self, key: str, value: Any):
+        start = time.perf_counter()
+        self.backend.set(key, value)
+        elapsed = time.perf_counter() - start
+        CACHE_SECONDS.observe(elapsed, self.name, "set")
+        record("cache", elapsed)
+
+
 def get_cache(ttl_seconds: int = 300):
     redis_url = os.environ.get("REDIS_URL")
     if redis_url:
-        return RedisCache(redis_url, ttl_seconds=ttl_seconds)
-    return TTLCache(ttl_seconds=ttl_seconds)
+        return InstrumentedCache(RedisCache(redis_url, ttl_seconds), "redis")
+    return InstrumentedCache(TTLCache(ttl_seconds=ttl_seconds), "memory")
@@ -0,0 +1,119 @@
+"""Per-request deadlines propagated to upstream calls and offloaded work.
+
+:class:`DeadlineMiddleware` gives every request a budget (the
+``X-Request-Timeout-Ms`` header, capped by ``REQUEST_TIMEOUT_MS``) and keeps
+its expiry in a context variable, so the LeetCode client and the routes can
+bound each await by what is left without passing it through every call.
+Once the budget is spent the awaited work is cancelled (closing its
+upstream connection) and :class:`DeadlineExceededError` is raised.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+from app.utils.metrics import DEADLINE_EXCEEDED
+
+TIMEOUT_HEADER = b"x-request-timeout-ms"
+
+# time.monotonic() at which the current request's budget runs out
+_request_deadline: ContextVar[Optional[float]] = ContextVar(
+    "request_deadline", default=None
+)
+
+
+class DeadlineExceededError(Exception):
+    """The request's budget ran out while waiting in ``stage``."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded during {stage}")
+        self.stage = stage
+
+
+def budget_seconds(header_ms, default_ms) -> Optional[float]:
+    """The smaller of the requested and configured budgets; None if neither."""
+    limits = [ms for ms in (header_ms, default_ms) if ms and ms > 0]
+    return min(limits) / 1000 if limits else None
+
+
+def remaining() -> Optional[float]:
+    """Seconds left for the current request, or None without a deadline."""
+    expires = _request_deadline.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def expires_at() -> Optional[float]:
+    """``time.monotonic()`` at which the current request's budget runs out.
+
+    For work that outlives :func:`bounded` in a thread and should notice
+    that nobody is waiting for it any more.
+    """
+    return _request_deadline.get()
+
+
+@contextmanager
+def deadline(seconds: Optional[float]):
+    """Limit the ``with`` block to ``seconds``; nested deadlines only shorten."""
+    if seconds is None:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    outer = _request_deadline.get()
+    token = _request_deadline.set(expires if outer is None else min(expires, outer))
+    try:
+        yield
+    finally:
+        _request_deadline.reset(token)
+
+
+def check(stage: str):
+    """Raise :class:`DeadlineExceededError` if the budget is already spent."""
+    left = remaining()
+    if left is not None and left <= 0:
+        DEADLINE_EXCEEDED.inc(stage)
+        raise DeadlineExceededError(stage)
+
+
+async def bounded(awaitable, stage: str):
+    """Await ``awaitable`` within the remaining budget, cancelling it after."""
+    left = remaining()
+    if left is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(left, 0))
+    except asyncio.TimeoutError as e:
+        if remaining() > 0:
+            raise  # raised by the awaited work itself
+        DEADLINE_EXCEEDED.inc(stage)
+        raise DeadlineExceededError(stage) from e
+
+
+class DeadlineMiddleware:
+    """ASGI middleware setting each HTTP request's deadline.
+
+    The budget is the ``X-Request-Timeout-Ms`` header, capped by
+    ``default_ms`` when that is positive.  Malformed headers are ignored.
+    """
+
+    def __init__(self, app, default_ms: float = 0):
+        self.app = app
+        self.default_ms = default_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_ms = None
+        for key, value in scope.get("headers", ()):
+            if key == TIMEOUT_HEADER:
+                try:
+                    header_ms = float(value)
+                except ValueError:
+                    pass
+                break
+
+        with deadline(budget_seconds(header_ms, self.default_ms)):
+            await self.app(scope, receive, send)
@@ -0,0 +1,136 @@
+"""Request hedging: a second identical call once the first looks slow.
+
+A call that has not returned after the ``percentile``-th percentile of the
+recent latencies of its operation gets a duplicate; the first successful
+response wins and the other call is cancelled.  Every call's latency is
+recorded, including a cancelled loser's time so far, so the slow tail that
+hedging cuts short stays in the window.  A :class:`HedgeBudget`
+shared by all operations caps duplicates at a fraction of calls, so hedging
+cannot multiply load when the upstream is slow for everyone.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from app.utils.metrics import UPSTREAM_HEDGES
+
+# Latencies kept per operation, and needed before hedging starts
+WINDOW = 200
+MIN_SAMPLES = 20
+
+
+class LatencyWindow:
+    """The most recent call latencies of one operation."""
+
+    def __init__(self, size: int = WINDOW):
+        self.samples = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if len(self.samples) < MIN_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+class HedgeBudget:
+    """Earn ``ratio`` of a hedge per call; a hedge spends a whole one.
+
+    ``burst`` caps the saved-up credit, so a quiet period cannot fund a
+    flood of hedges later.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credit = 0.0
+
+    def earn(self):
+        self.credit = min(self.burst, self.credit + self.ratio)
+
+    def spend(self) -> bool:
+        if self.credit < 1:
+            return False
+        self.credit -= 1
+        return True
+
+
+class Hedger:
+    """Hedge calls past ``percentile`` of their operation's recent latency."""
+
+    def __init__(self, percentile: float, budget_ratio: float):
+        self.percentile = percentile
+        self.budget = HedgeBudget(budget_ratio)
+        self.latencies: Dict[str, LatencyWindow] = {}
+
+    def delay(self, operation: str) -> Optional[float]:
+        """Seconds to wait before hedging ``operation``, or None to not hedge."""
+        if self.percentile <= 0:
+            return None
+        window = self.latencies.get(operation)
+        return window.percentile(self.percentile) if window else None
+
+    def observe(self, operation: str, seconds: float):
+        self.latencies.setdefault(operation, LatencyWindow()).add(seconds)
+
+    def _start(self, operation: str, send) -> asyncio.Future:
+        """Run ``send()`` as a task that records its latency however it ends."""
+
+        async def timed():
+            start = time.perf_counter()
+            try:
+                return await send()
+            finally:
+                self.observe(operation, time.perf_counter() - start)
+
+        return asyncio.ensure_future(timed())
+
+    async def call(self, operation: str, send, ok=None):
+        """Await ``send()``, hedging it with a second ``send()`` if slow.
+
+        A result failing ``ok`` (say, a non-2xx response) counts as a loss
+        while the other call is outstanding, and is returned only if that
+        call fails too.
+        """
+        self.budget.earn()
+        delay = self.delay(operation)
+        primary = self._start(operation, send)
+        pending = {primary}
+        try:
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.budget.spend():
+                UPSTREAM_HEDGES.inc(operation, "skipped")
+                return await primary
+
+            UPSTREAM_HEDGES.inc(operation, "sent")
+            hedge = self._start(operation, send)
+            pending.add(hedge)
+            error = failed = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif ok is None or ok(task.result()):
+                        winner = "hedge" if task is hedge else "primary"
+                        UPSTREAM_HEDGES.inc(operation, f"{winner}_won")
+                        return task.result()
+                    else:
+                        failed = failed or task
+            UPSTREAM_HEDGES.inc(operation, "both_failed")
+            if failed is not None:
+                return failed.result()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,268 @@
+"""Minimal Prometheus-style metrics (counters, gauges, histograms).
+
+A dependency-free subset of the Prometheus client: metrics are plain Python
+objects keyed by label tuples, updates take a short lock, and the text
+exposition format is rendered on scrape.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra="") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _check(self, labels: Tuple[str, ...]):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {labels}"
+            )
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, value in sorted(self._values.items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} "
+                f"{_format_value(value)}"
+            )
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels: str, value: float):
+        self._check(labels)
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        self._check(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, *labels: str):
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(
+                self.buckets + (float("inf"),), counts, strict=True
+            ):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labelnames, labels, le)} {cumulative}"
+                )
+            label_str = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_str} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_str} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(
+    Histogram(
+        "predictor_stage_duration_seconds",
+        "Time spent in each stage of a prediction request.",
+        ["stage"],
+    )
+)
+CACHE_SECONDS = REGISTRY.register(
+    Histogram(
+        "predictor_cache_duration_seconds",
+        "Cache operation latency per backend.",
+        ["backend", "op"],
+    )
+)
+CACHE_REQUESTS = REGISTRY.register(
+    Counter(
+        "predictor_cache_requests_total",
+        "Cache lookups by backend and result (hit/miss).",
+        ["backend", "result"],
+    )
+)
+UPSTREAM_SECONDS = REGISTRY.register(
+    Histogram(
+        "predictor_upstream_duration_seconds",
+        "LeetCode GraphQL call latency per operation.",
+        ["operation"],
+    )
+)
+UPSTREAM_RESPONSES = REGISTRY.register(
+    Counter(
+        "predictor_upstream_responses_total",
+        "LeetCode GraphQL responses by operation and HTTP status.",
+        ["operation", "status"],
+    )
+)
+SEMAPHORE_IN_USE = REGISTRY.register(
+    Gauge(
+        "predictor_upstream_slots_in_use",
+        "Upstream concurrency slots currently held.",
+    )
+)
+SEMAPHORE_WAITING = REGISTRY.register(
+    Gauge(
+        "predictor_upstream_slots_waiting",
+        "Requests waiting for an upstream concurrency slot.",
+    )
+)
+USER_DATA_SOURCES = REGISTRY.register(
+    Counter(
+        "predictor_user_data_total",
+        "User data lookups by source (cache/snapshot/snapshot_stale/upstream).",
+        ["source"],
+    )
+)
+UPSTREAM_HEDGES = REGISTRY.register(
+    Counter(
+        "predictor_upstream_hedges_total",
+        "Hedged LeetCode calls by operation and outcome "
+        "(sent/primary_won/hedge_won/both_failed/skipped).",
+        ["operation", "outcome"],
+    )
+)
+ADMISSION_DECISIONS = REGISTRY.register(
+    Counter(
+        "predictor_admission_total",
+        "Admission decisions by request cost (cheap/cold/any) and result.",
+        ["cost", "result"],
+    )
+)
+ADMISSION_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "predictor_admission_in_flight",
+        "Requests currently admitted past admission control.",
+    )
+)
+DEADLINE_EXCEEDED = REGISTRY.register(
+    Counter(
+        "predictor_deadline_exceeded_total",
+        "Requests whose deadline ran out, by the stage that was cut short.",
+        ["stage"],
+    )
+)
+MODEL_PREDICTIONS = REGISTRY.register(
+    Counter(
+        "predictor_model_predictions_total",
+        "Model predictions by version and role (active/canary/shadow).",
+        ["version", "role"],
+    )
+)
@@ -0,0 +1,135 @@
+"""Opt-in sampling profiler for individual requests.
+
+When ``PROFILE_SAMPLE_RATE`` is above zero, that fraction of matching requests
+is profiled by a background thread that periodically snapshots the event-loop
+thread's stack via ``sys._current_frames()``.  Each profiled request is written
+to ``PROFILE_DIR`` as collapsed stacks (``frame;frame;frame count`` per line),
+the input format of ``flamegraph.pl``, speedscope and inferno.
+
+Because the event loop interleaves requests, samples taken while a profiled
+request is in flight can include work done for concurrent requests.  Only one
+request is profiled at a time.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+def collapse_stack(frame) -> str:
+    """Render a frame chain root-first, ``;``-separated."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """Samples one thread's stack at a fixed interval until stopped."""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="stack-sampler", daemon=True
+        )
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.samples[collapse_stack(frame)] += 1
+
+
+def write_collapsed(samples: Counter, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for stack, count in samples.most_common():
+            f.write(f"{stack} {count}\n")
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a random fraction of matching requests.
+
+    Profiled responses carry an ``X-Profile-Id`` header naming the output
+    file (``<PROFILE_DIR>/<id>.collapsed``).
+    """
+
+    def __init__(
+        self,
+        app,
+        sample_rate: float,
+        output_dir: str,
+        interval_ms: float = 5.0,
+        paths=("/api/predict",),
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+        self.interval = interval_ms / 1000
+        self.paths = set(paths)
+        self._active: Optional[StackSampler] = None
+        self._rng = random.Random()  # noqa: S311 - sampling decision only
+
+    def _should_profile(self, scope) -> bool:
+        return (
+            scope["type"] == "http"
+            and scope["path"] in self.paths
+            and self._active is None
+            and self._rng.random() < self.sample_rate
+        )
+
+    async def __call__(self, scope, receive, send):
+        if not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        sampler = StackSampler(threading.get_ident(), self.interval)
+        self._active = sampler
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile_id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            samples = sampler.stop()
+            self._active = None
+            path = self.output_dir / f"{profile_id}.collapsed"
+            try:
+                write_collapsed(samples, path)
+                logger.info(f"Wrote profile {path} ({sum(samples.values())} samples)")
+            except OSError as e:
+                logger.error(f"Failed to write profile {path}: {e}")
@@ -0,0 +1,86 @@
+"""Per-request stage timing and the ``Server-Timing`` response header."""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from app.utils.metrics import STAGE_SECONDS
+
+# Stage name -> accumulated seconds for the request being handled
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def record(stage: str, seconds: float):
+    """Add ``seconds`` to ``stage`` for the current request, if one is active."""
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+def observe(stage: str, seconds: float):
+    """Record a stage duration in both the metrics and the current request."""
+    STAGE_SECONDS.observe(seconds, stage)
+    record(stage, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    """Time the ``with`` block as stage ``name``."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def format_server_timing(timings: Dict[str, float], total: float) -> str:
+    """Render timings as a ``Server-Timing`` header value (durations in ms)."""
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding ``Server-Timing`` to every HTTP response.
+
+    Stages recorded with :func:`stage`/:func:`record` while the request is
+    handled are listed individually, plus a ``total`` entry.  For origins in
+    ``allowed_origins`` a ``Timing-Allow-Origin`` header is added so browser
+    devtools can show the breakdown for cross-origin calls.
+    """
+
+    def __init__(self, app, allowed_origins=()):
+        self.app = app
+        self.allowed_origins = set(allowed_origins)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _request_timings.set(timings)
+        start = time.perf_counter()
+        origin = None
+        for key, value in scope.get("headers", ()):
+            if key == b"origin":
+                origin = value.decode("latin-1")
+                break
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                header = format_server_timing(timings, time.perf_counter() - start)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", header.encode("latin-1")))
+                if origin in self.allowed_origins:
+                    headers.append((b"timing-allow-origin", origin.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
@@ -1,5 +1,5 @@
 import React from "react";
-import { render, screen, fireEvent } from "@testing-library/react";
+import { render, screen, fireEvent, waitFor } from "@testing-library/react";
 import userEvent from "@testing-library/user-event";
 import PredictionComponent from "../components/PredictionComponent";
 
@@ -146,3 +146,17 @@ test("warning has alert role for accessibility", async () => {
   const warning = await screen.findByRole("alert");
   expect(warning).toBeInTheDocument();
 });
+
+test("suggests known usernames while typing", async () => {
+  const { container } = render(<PredictionComponent />);
+
+  const input = screen.getByLabelText(/Enter Your Username/i);
+  await userEvent.type(input, "tes");
+
+  await waitFor(() =>
+    expect(
+      container.querySelector('#username-suggestions option[value="testuser"]'),
+    ).toBeInTheDocument(),
+  );
+  expect(input).toHaveAttribute("list", "username-suggestions");
+});
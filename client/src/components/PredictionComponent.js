@@ -18,6 +18,7 @@ const PredictionComponent = () => {
   const [isLoading, setIsLoading] = useState(false);
   const [warning, setWarning] = useState("");
   const [contests, setContests] = useState([]);
+  const [suggestions, setSuggestions] = useState([]);
   const apiBaseUrl = useRef(getApiBaseUrl());
 
   useEffect(() => {
@@ -36,6 +37,30 @@ const PredictionComponent = () => {
     fetchContests();
   }, []);
 
+  useEffect(() => {
+    const prefix = username.trim();
+    if (prefix.length < 2 || !/^[a-zA-Z0-9_-]+$/.test(prefix)) {
+      setSuggestions([]);
+      return undefined;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(
+          `${apiBaseUrl.current}/api/usernames?prefix=${encodeURIComponent(prefix)}&limit=8`,
+          { signal: controller.signal },
+        );
+        if (res.ok) setSuggestions((await res.json()).usernames);
+      } catch {
+        // Suggestions are best-effort; typing still works without them
+      }
+    }, 200);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [username]);
+
   const toggle = (i, checked) =>
     setContests((p) => p.map((c, j) => (j === i ? { ...c, include: checked, rank: 0 } : c)));
 
@@ -90,7 +115,14 @@ const PredictionComponent = () => {
             value={username}
             onChange={(e) => setUsername(e.target.value)}
             aria-required="true"
+            list="username-suggestions"
+            autoComplete="off"
           />
+          <datalist id="username-suggestions">
+            {suggestions.map((name) => (
+              <option key={name} value={name} />
+            ))}
+          </datalist>
         </div>
 
         {contests.map((contest, i) => (
@@ -6,6 +6,11 @@ const handlers = [
     return res(ctx.json({ contests: ["weekly-contest-377"] }));
   }),
 
+  rest.get("http://localhost:8000/api/usernames", (req, res, ctx) => {
+    const prefix = req.url.searchParams.get("prefix");
+    return res(ctx.json({ prefix, usernames: ["testuser", "tester"] }));
+  }),
+
   rest.post("http://localhost:8000/api/predict", (req, res, ctx) => {
     return res(
       ctx.json([
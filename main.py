@@ -3,32 +3,106 @@
 import asyncio
 import logging
 import os
+import secrets
 from contextlib import asynccontextmanager
-from typing import List
+from typing import List, Optional
 
 import httpx
-import numpy as np
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 
 from app.config import (
+    ADMIN_TOKEN,
+    ADMISSION_INTERVAL_MS,
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_TARGET_MS,
     ALLOWED_ORIGINS,
     API_HOST,
     API_PORT,
     CACHE_TTL,
+    JOB_MAX_QUEUED,
+    JOB_UPSTREAM_CONCURRENCY,
+    JOB_WORKERS,
+    JOBS_DIR,
+    JOBS_RESUME,
+    LOOKUP_MAX_P99_ERROR,
+    MANIFEST_PATH,
+    MODEL_HISTORY_DIR,
     MODEL_PATH,
+    MODEL_RUNTIME,
+    MODEL_VARIANTS_DIR,
+    PROFILE_DIR,
+    PROFILE_INTERVAL_MS,
+    PROFILE_SAMPLE_RATE,
+    REQUEST_TIMEOUT_MS,
     SCALER_PATH,
+    TF_JIT_COMPILE,
+    TREE_MODEL_PATH,
+    USER_SNAPSHOT_MAX_AGE,
+    USERNAME_INDEX_DIR,
+    USERNAME_MAX_PENDING,
+    USERNAME_MERGE_INTERVAL,
 )
+from app.mlp_runtime import MLPModel, load_variant, read_keras_weights
 from app.model_loader import load_keras_model
-from app.schemas import PredictionInput, PredictionOutput
+from app.registry import (
+    CURRENT,
+    Canary,
+    ModelVersion,
+    list_versions,
+    load_version,
+    manifest_version,
+    resolve_version,
+)
+from app.schemas import (
+    JobInput,
+    JobStatus,
+    ModelReloadInput,
+    PredictionInput,
+    PredictionOutput,
+    SimulationInput,
+    SimulationOutput,
+    UsernameMatches,
+)
+from app.services.elo import get_contest_engine
+from app.services.jobs import JobRunner, JobStore, QueueFullError
 from app.services.leetcode import (
     fetch_contest_data,
     fetch_user_data,
     find_latest_contests,
 )
-from app.services.prediction import make_prediction
+from app.services.lookup import get_lookup_table, model_runtime
+from app.services.prediction import (
+    build_features,
+    make_batch_prediction,
+    make_prediction,
+)
+from app.services.simulation import (
+    DEFAULT_PARTICIPANTS,
+    percentile_bands,
+    rank_distribution_from_history,
+    simulate,
+)
+from app.services.standings import get_contest_standings
+from app.services.user_snapshot import get_user_snapshot
+from app.services.usernames import UsernameCatalog
+from app.tf_runtime import compile_keras_model
+from app.tree_runtime import load_tree_model
+from app.utils.admission import AdmissionController, OverloadedError
 from app.utils.cache import get_cache
+from app.utils.deadline import (
+    DeadlineExceededError,
+    DeadlineMiddleware,
+    bounded,
+    check,
+    expires_at,
+)
+from app.utils.metrics import MODEL_PREDICTIONS, REGISTRY
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.timing import ServerTimingMiddleware, stage
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -40,39 +114,112 @@ logger = logging.getLogger(__name__)
 # ---------------------------------------------------------------------------
 model = None
 scaler = None
+model_version = CURRENT
+# Candidate version taking a share of the traffic (see app/registry.py)
+canary = None
 async_client = None
 cache = get_cache(ttl_seconds=CACHE_TTL)
 semaphore = asyncio.Semaphore(5)
+reload_lock = asyncio.Lock()
+admission = AdmissionController(
+    ADMISSION_MAX_IN_FLIGHT,
+    ADMISSION_MAX_QUEUE,
+    ADMISSION_TARGET_MS / 1000,
+    ADMISSION_INTERVAL_MS / 1000,
+)
+# Set on /api/predict responses cut short by the deadline (``partial: true``)
+PARTIAL_HEADER = "X-Partial-Results"
+# Seconds since the user was fetched, when served from the user snapshot
+USER_AGE_HEADER = "X-User-Data-Age"
 
 
 # ---------------------------------------------------------------------------
 # Lifespan
 # ---------------------------------------------------------------------------
+def _load_model(model_path=None):
+    """Load the model for the configured ``MODEL_RUNTIME``.
+
+    ``model_path`` selects a Keras archive other than ``MODEL_PATH`` (a
+    ``models/history/`` version); NumPy runtimes then use its float32
+    weights, since variants and tree models only exist for ``MODEL_PATH``.
+    """
+    if model_path is not None and model_path != MODEL_PATH:
+        return _load_keras_archive(model_path)
+    if MODEL_RUNTIME == "tree":
+        if not os.path.exists(TREE_MODEL_PATH):
+            raise FileNotFoundError(
+                f"Tree model '{TREE_MODEL_PATH}' not found (run scripts/train_tree.py)"
+            )
+        logger.info("Using NumPy gradient-boosted-tree runtime")
+        return load_tree_model(TREE_MODEL_PATH)
+    if MODEL_RUNTIME not in ("keras", "compiled"):
+        path = os.path.join(MODEL_VARIANTS_DIR, MODEL_RUNTIME)
+        if not os.path.exists(os.path.join(path, "meta.json")):
+            raise FileNotFoundError(
+                f"Model variant '{path}' not found (run scripts/quantize.py)"
+            )
+        logger.info(f"Using NumPy {MODEL_RUNTIME} model runtime")
+        return load_variant(path)
+
+    if not os.path.exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model file '{MODEL_PATH}' not found")
+    return _load_keras_archive(MODEL_PATH)
+
+
+def _load_keras_archive(model_path: str):
+    if MODEL_RUNTIME not in ("keras", "compiled"):
+        return MLPModel.from_keras_weights(read_keras_weights(model_path))
+
+    import tensorflow as tf
+
+    keras_model = load_keras_model(tf, model_path)
+    if MODEL_RUNTIME == "compiled":
+        logger.info(f"Compiling model (XLA: {TF_JIT_COMPILE})")
+        return compile_keras_model(tf, keras_model, jit_compile=TF_JIT_COMPILE)
+    return keras_model
+
+
+def load_artifacts():
+    """Load the model and scaler into the module globals.
+
+    Called by ``lifespan``, or once in the parent by ``scripts/serve.py`` so
+    forked workers share the loaded pages.
+    """
+    global model, scaler, model_version
+    import joblib
+
+    if not os.path.exists(SCALER_PATH):
+        raise FileNotFoundError(f"Scaler file '{SCALER_PATH}' not found")
+
+    model = _load_model()
+    scaler = joblib.load(SCALER_PATH)
+    model_version = manifest_version(MANIFEST_PATH)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Load ML model and scaler on startup, close HTTP client on shutdown."""
-    global model, scaler, async_client
+    global async_client
 
     try:
-        logger.info("Loading ML model and scaler...")
-        import joblib
-        import tensorflow as tf
-
-        if not os.path.exists(MODEL_PATH):
-            raise FileNotFoundError(f"Model file '{MODEL_PATH}' not found")
-        if not os.path.exists(SCALER_PATH):
-            raise FileNotFoundError(f"Scaler file '{SCALER_PATH}' not found")
-
-        model = load_keras_model(tf, MODEL_PATH)
-        scaler = joblib.load(SCALER_PATH)
+        if model is None or scaler is None:
+            logger.info("Loading ML model and scaler...")
+            load_artifacts()
+        else:
+            logger.info("Using preloaded model and scaler")
         async_client = httpx.AsyncClient(timeout=30.0)
         logger.info("Successfully loaded model, scaler, and HTTP client")
     except Exception as e:
         logger.error(f"Failed to load model or scaler: {e}")
         raise
+    jobs.recover(resume=JOBS_RESUME)
+    merge_task = asyncio.create_task(_merge_usernames())
 
     yield
 
+    merge_task.cancel()
+    await _flush_usernames()
+    await jobs.stop()
     if async_client:
         await async_client.aclose()
         logger.info("HTTP client closed")
@@ -88,15 +235,40 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+if PROFILE_SAMPLE_RATE > 0:
+    app.add_middleware(
+        ProfilingMiddleware,
+        sample_rate=PROFILE_SAMPLE_RATE,
+        output_dir=PROFILE_DIR,
+        interval_ms=PROFILE_INTERVAL_MS,
+    )
+app.add_middleware(DeadlineMiddleware, default_ms=REQUEST_TIMEOUT_MS)
+app.add_middleware(ServerTimingMiddleware, allowed_origins=ALLOWED_ORIGINS)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["GET", "POST"],
-    allow_headers=["Content-Type", "Authorization"],
+    allow_headers=["Content-Type", "Authorization", "X-Request-Timeout-Ms"],
+    expose_headers=[PARTIAL_HEADER, USER_AGE_HEADER, "Retry-After"],
 )
 
 
+@app.exception_handler(DeadlineExceededError)
+async def deadline_exceeded(request: Request, exc: DeadlineExceededError):
+    logger.warning(f"{request.url.path}: {exc}")
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+@app.exception_handler(OverloadedError)
+async def overloaded(request: Request, exc: OverloadedError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
 # ---------------------------------------------------------------------------
 # Routes
 # ---------------------------------------------------------------------------
@@ -113,34 +285,172 @@ async def health_check():
         "status": "healthy",
         "model_loaded": model is not None,
         "scaler_loaded": scaler is not None,
+        "model_version": model_version,
+        "canary": canary.status() if canary else None,
         "client_ready": async_client is not None,
     }
 
 
+async def _elo_engine(contest_name: str, choice: str):
+    """Return the Elo engine to use for a contest, or None for the ML model."""
+    if choice == "model":
+        return None
+    # The first load parses the standings and builds the curve; keep it off
+    # the event loop.
+    engine = await bounded(
+        asyncio.to_thread(get_contest_engine, contest_name), "elo_load"
+    )
+    if engine is None and choice == "elo":
+        raise HTTPException(
+            status_code=400, detail=f"No standings available for {contest_name}"
+        )
+    return engine
+
+
+async def _total_participants(contest, slots=None) -> int:
+    """Participants of ``contest``; ``slots`` overrides the upstream semaphore."""
+    standings = get_contest_standings(contest.name)
+    if standings is not None:
+        return max(standings.participants, contest.rank)
+
+    with stage("contest_fetch"):
+        contest_data = await fetch_contest_data(
+            async_client, slots or semaphore, cache, contest.name
+        )
+    total_participants = contest_data.get("user_num", 0)
+
+    # registerUserNum from GraphQL is pre-registration count, not
+    # actual participants — use a sensible fallback when it's zero or
+    # smaller than the user's rank.
+    if total_participants == 0:
+        total_participants = max(contest.rank * 2, 10000)
+
+    if contest.rank > total_participants:
+        total_participants = contest.rank * 2
+    return total_participants
+
+
+def _serving():
+    """``(active ModelVersion, canary)``, captured once per request or job.
+
+    Admin endpoints reassign the globals between awaits; predictions made
+    from one capture all come from the same versions.
+    """
+    return ModelVersion(model_version, model, scaler), canary
+
+
+def _model_prediction(
+    contest, user_data, rating, attended, total_participants, serving
+):
+    """Return ``(engine, rating_change)`` from the contest's table or the model.
+
+    Tables are skipped while a canary runs, so the candidate sees every
+    contest.
+    """
+    active, candidate = serving
+    check("inference")
+    table = None
+    if candidate is None:
+        table = get_lookup_table(
+            contest.name,
+            total_participants,
+            LOOKUP_MAX_P99_ERROR,
+            active.version,
+            model_runtime(active.model),
+        )
+    if table is not None:
+        with stage("lookup"):
+            return "lookup", table.predict_user(
+                user_data, rating, attended, contest.rank
+            )
+
+    with stage("feature_build"):
+        features = build_features(
+            user_data, rating, attended, contest.rank, total_participants
+        )
+    if candidate is not None:
+        return "model", candidate.predict(active, features)
+    MODEL_PREDICTIONS.inc(active.version, "active")
+    return "model", make_prediction(active.model, active.scaler, features)
+
+
+async def _predict_contest(contest, user_data, rating, attended, choice, serving):
+    elo = await _elo_engine(contest.name, choice)
+    if elo is not None:
+        engine = "elo"
+        total_participants = elo.participants
+        with stage("elo"):
+            rating_change = float(elo.predict(rating, contest.rank, attended))
+    else:
+        total_participants = await _total_participants(contest)
+        engine, rating_change = _model_prediction(
+            contest, user_data, rating, attended, total_participants, serving
+        )
+
+    return PredictionOutput(
+        contest_name=contest.name,
+        prediction=rating_change,
+        rating_before_contest=rating,
+        rank=contest.rank,
+        total_participants=total_participants,
+        rating_after_contest=rating + rating_change,
+        attended_contests_count=attended,
+        engine=engine,
+    )
+
+
 @app.post(
     "/api/predict",
     response_model=List[PredictionOutput],
     responses={
         400: {"description": "Invalid input or no contest data"},
         500: {"description": "Prediction or internal error"},
-        503: {"description": "LeetCode API unavailable"},
+        503: {"description": "LeetCode API unavailable or server overloaded"},
+        504: {"description": "Request deadline exceeded"},
     },
 )
-async def predict(input_data: PredictionInput):
-    """Predict rating changes for given contests."""
+async def predict(input_data: PredictionInput, response: Response):
+    """Predict rating changes for given contests.
+
+    With ``partial`` set, a request whose deadline runs out after at least
+    one contest returns the completed predictions with ``X-Partial-Results``.
+    Past capacity, requests are shed with 503 and ``Retry-After``.
+    """
+    async with admission.slot(lambda: _is_cheap(input_data)):
+        return await _predict(input_data, response)
+
+
+def _is_cheap(input_data: PredictionInput) -> bool:
+    """Whether a prediction needs no LeetCode calls (all inputs local).
+
+    Local sources are checked first, and whatever is left is probed in the
+    cache with one ``contains`` call: no values are fetched and the probe
+    doesn't count towards the cache's hit/miss metrics.
+    """
+    keys = [
+        f"contest:{contest.name}"
+        for contest in input_data.contests
+        if get_contest_standings(contest.name) is None
+    ]
+    snapshot = get_user_snapshot()
+    known = snapshot.lookup(input_data.username) if snapshot else None
+    if known is None or known["snapshotAge"] > USER_SNAPSHOT_MAX_AGE:
+        keys.append(f"user:{input_data.username}")
+    return cache.contains(*keys)
+
+
+async def _predict(input_data: PredictionInput, response: Response):
+    serving = _serving()
     try:
-        user_data = await fetch_user_data(
-            async_client, semaphore, cache, input_data.username
-        )
+        with stage("user_fetch"):
+            user_data = await fetch_user_data(
+                async_client, semaphore, cache, input_data.username
+            )
+        if "snapshotAge" in user_data:
+            response.headers[USER_AGE_HEADER] = str(user_data["snapshotAge"])
 
         current_rating = user_data.get("rating")
         attended_contests = user_data.get("attendedContestsCount")
-        avg_solve_rate = user_data.get("avgSolveRate", 0.5)
-        avg_finish_time = user_data.get("avgFinishTime", 3000)
-        recent_solve_rate = user_data.get("recentSolveRate", 0.5)
-        recent_finish_time = user_data.get("recentFinishTime", 3000)
-        rating_trend = user_data.get("ratingTrend", 0)
-        max_rating = user_data.get("maxRating", current_rating or 1500)
 
         if current_rating is None or attended_contests is None:
             raise HTTPException(
@@ -148,87 +458,366 @@ async def predict(input_data: PredictionInput):
             )
 
         results = []
-
         for contest in input_data.contests:
-            contest_data = await fetch_contest_data(
-                async_client, semaphore, cache, contest.name
+            try:
+                result = await _predict_contest(
+                    contest,
+                    user_data,
+                    current_rating,
+                    attended_contests,
+                    input_data.engine,
+                    serving,
+                )
+            except DeadlineExceededError as e:
+                if not (input_data.partial and results):
+                    raise
+                logger.info(
+                    f"Returning {len(results)}/{len(input_data.contests)} "
+                    f"predictions: {e}"
+                )
+                response.headers[PARTIAL_HEADER] = "true"
+                break
+            results.append(result)
+            current_rating = result.rating_after_contest
+            attended_contests += 1
+
+        if results:
+            username_catalog.add(input_data.username)
+        return results
+
+    except (HTTPException, DeadlineExceededError):
+        raise
+    except Exception as e:
+        logger.error(f"Unexpected error in predict endpoint: {e}")
+        raise HTTPException(status_code=500, detail="Internal server error") from e
+
+
+def _simulation_steps(input_data: SimulationInput, user_data) -> list:
+    history = rank_distribution_from_history(user_data.get("recentRanks") or [])
+    steps = []
+    for contest in input_data.contests:
+        if contest.rank is not None:
+            median, spread = contest.rank.median, contest.rank.spread
+        elif history is not None:
+            median, spread = history
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Not enough contest history to derive a rank "
+                f"distribution for {contest.name}; pass one explicitly",
             )
-            total_participants = contest_data.get("user_num", 0)
-
-            # registerUserNum from GraphQL is pre-registration count, not
-            # actual participants — use a sensible fallback when it's zero or
-            # smaller than the user's rank.
-            if total_participants == 0:
-                total_participants = max(contest.rank * 2, 10000)
-
-            if contest.rank > total_participants:
-                total_participants = contest.rank * 2
-
-            rank_percentage = (contest.rank * 100) / total_participants
-            log_rank = float(np.log1p(contest.rank))
-            rating_x_pct = current_rating * (contest.rank / total_participants)
-            features = np.array(
-                [
-                    [
-                        current_rating,
-                        contest.rank,
-                        total_participants,  # f1-f3
-                        rank_percentage,
-                        attended_contests,  # f4-f5
-                        avg_solve_rate,
-                        avg_finish_time,  # f6-f7
-                        recent_solve_rate,
-                        recent_finish_time,  # f8-f9
-                        rating_trend,
-                        max_rating,  # f10-f11
-                        log_rank,
-                        rating_x_pct,  # f12-f13
-                        avg_solve_rate * current_rating,  # f14
-                        avg_finish_time / 5400,  # f15
-                    ]
-                ]
+        total = contest.total_participants
+        if total is None:
+            standings = get_contest_standings(contest.name)
+            total = standings.participants if standings else DEFAULT_PARTICIPANTS
+        steps.append(
+            {
+                "name": contest.name,
+                "median": median,
+                "spread": spread,
+                "total_participants": total,
+            }
+        )
+    return steps
+
+
+@app.post(
+    "/api/simulate",
+    response_model=SimulationOutput,
+    responses={
+        400: {"description": "Invalid input or no rank distribution"},
+        500: {"description": "Simulation or internal error"},
+        503: {"description": "LeetCode API unavailable"},
+        504: {"description": "Request deadline exceeded"},
+    },
+)
+async def simulate_ratings(input_data: SimulationInput):
+    """Monte Carlo distribution of ratings over a series of future contests.
+
+    Runs on the active version captured at the start; canaries only see
+    ``/api/predict`` traffic.
+    """
+    serving = _serving()
+    try:
+        with stage("user_fetch"):
+            user_data = await fetch_user_data(
+                async_client, semaphore, cache, input_data.username
             )
 
-            rating_change = make_prediction(model, scaler, features)
-            new_rating = current_rating + rating_change
-
-            results.append(
-                PredictionOutput(
-                    contest_name=contest.name,
-                    prediction=rating_change,
-                    rating_before_contest=current_rating,
-                    rank=contest.rank,
-                    total_participants=total_participants,
-                    rating_after_contest=new_rating,
-                    attended_contests_count=attended_contests,
-                )
+        current_rating = user_data.get("rating")
+        attended_contests = user_data.get("attendedContestsCount")
+        if current_rating is None or attended_contests is None:
+            raise HTTPException(
+                status_code=400, detail="Incomplete user data from LeetCode"
             )
 
-            current_rating = new_rating
-            attended_contests += 1
+        steps = _simulation_steps(input_data, user_data)
+        active, _ = serving
+        MODEL_PREDICTIONS.inc(active.version, "active")
+        with stage("simulate"):
+            summaries, final = await bounded(
+                asyncio.to_thread(
+                    simulate,
+                    active.model,
+                    active.scaler,
+                    user_data,
+                    current_rating,
+                    attended_contests,
+                    steps,
+                    input_data.paths,
+                    input_data.percentiles,
+                    input_data.seed,
+                    # Stops the thread once the 504 below has gone out
+                    expires_at(),
+                ),
+                "simulate",
+            )
 
-        return results
+        return SimulationOutput(
+            username=input_data.username,
+            paths=input_data.paths,
+            rating_before_contest=current_rating,
+            attended_contests_count=attended_contests,
+            steps=summaries,
+            final=percentile_bands(final, input_data.percentiles),
+        )
 
-    except HTTPException:
+    except (HTTPException, DeadlineExceededError):
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in predict endpoint: {e}")
+        logger.error(f"Unexpected error in simulate endpoint: {e}")
         raise HTTPException(status_code=500, detail="Internal server error") from e
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics in text exposition format."""
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/api/contestData")
 async def get_contest_data():
     """Get latest contest information."""
     try:
         contest_slugs = await find_latest_contests(async_client, cache)
         return {"contests": contest_slugs}
-    except HTTPException:
+    except (HTTPException, DeadlineExceededError):
         raise
     except Exception as e:
         logger.error(f"Error in contestData endpoint: {e}")
         raise HTTPException(status_code=500, detail="Failed to get contest data") from e
 
 
+# ---------------------------------------------------------------------------
+# Username autocomplete
+# ---------------------------------------------------------------------------
+username_catalog = UsernameCatalog(USERNAME_INDEX_DIR, USERNAME_MAX_PENDING)
+
+
+async def _flush_usernames():
+    try:
+        await username_catalog.flush()
+    except Exception as e:
+        logger.error(f"Failed to merge usernames: {e}")
+
+
+async def _merge_usernames():
+    """Merge names seen in predictions into the on-disk index periodically."""
+    while True:
+        await asyncio.sleep(USERNAME_MERGE_INTERVAL)
+        await _flush_usernames()
+
+
+@app.get("/api/usernames", response_model=UsernameMatches)
+async def search_usernames(
+    prefix: str = Query(..., min_length=1, max_length=50, pattern=r"^[a-zA-Z0-9_-]+$"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Known usernames starting with ``prefix`` (case-insensitive)."""
+    return UsernameMatches(
+        prefix=prefix, usernames=username_catalog.search(prefix, limit)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Prediction jobs
+# ---------------------------------------------------------------------------
+# Jobs get their own upstream slots so a cohort never holds the interactive
+# requests' ones
+job_semaphore = asyncio.Semaphore(JOB_UPSTREAM_CONCURRENCY)
+
+
+async def _job_user(username: str):
+    return await fetch_user_data(async_client, job_semaphore, cache, username)
+
+
+async def _job_participants(contest) -> int:
+    return await _total_participants(contest, job_semaphore)
+
+
+def _job_predictor():
+    """Batch predictor for one job, pinned to the version active at its start."""
+    active, _ = _serving()
+
+    def predict_batch(features):
+        MODEL_PREDICTIONS.inc(active.version, "job", amount=len(features))
+        return make_batch_prediction(active.model, active.scaler, features)
+
+    return predict_batch
+
+
+jobs = JobRunner(
+    JobStore(JOBS_DIR),
+    _job_user,
+    _job_participants,
+    _job_predictor,
+    workers=JOB_WORKERS,
+    max_queued=JOB_MAX_QUEUED,
+)
+
+
+def _job_status(job_id: str) -> JobStatus:
+    job = jobs.store.load(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job, results_url=f"/api/jobs/{job_id}/results")
+
+
+@app.post(
+    "/api/jobs",
+    status_code=202,
+    response_model=JobStatus,
+    responses={503: {"description": "Too many queued jobs"}},
+)
+async def submit_job(input_data: JobInput):
+    """Queue predictions for a cohort; poll ``GET /api/jobs/{job_id}``."""
+    try:
+        job = jobs.submit(
+            input_data.usernames, [c.model_dump() for c in input_data.contests]
+        )
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "60"}
+        ) from e
+    logger.info(f"Queued job {job['job_id']}: {len(input_data.usernames)} users")
+    return _job_status(job["job_id"])
+
+
+@app.get("/api/jobs/{job_id}", response_model=JobStatus)
+async def job_status(job_id: str):
+    """Status and progress of a job."""
+    return _job_status(job_id)
+
+
+@app.get(
+    "/api/jobs/{job_id}/results",
+    responses={409: {"description": "Job not finished"}},
+)
+async def job_results(job_id: str):
+    """The finished job's results as JSON lines, one per user."""
+    status = _job_status(job_id)
+    if status.status != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {status.status}, not done")
+    return FileResponse(
+        jobs.store.results_path(job_id),
+        media_type="application/x-ndjson",
+        filename=f"predictions-{job_id}.jsonl",
+    )
+
+
+# ---------------------------------------------------------------------------
+# Model admin
+# ---------------------------------------------------------------------------
+def _check_admin(token):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not token or not secrets.compare_digest(token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def _model_status():
+    return {
+        # Admin calls change only this worker process (see scripts/serve.py)
+        "worker": os.getpid(),
+        "active": model_version,
+        "canary": canary.status() if canary else None,
+        "available": [CURRENT, *list_versions(MODEL_HISTORY_DIR)],
+    }
+
+
+@app.get("/api/admin/models")
+async def admin_models(x_admin_token: Optional[str] = Header(None)):
+    """Active and canary versions, and the versions that can be loaded."""
+    _check_admin(x_admin_token)
+    return _model_status()
+
+
+@app.post("/api/admin/reload")
+async def admin_reload(
+    reload: ModelReloadInput, x_admin_token: Optional[str] = Header(None)
+):
+    """Load a version in the background, warm it, then swap or canary it.
+
+    The swap is a reassignment on the event loop.  Requests and jobs capture
+    the active version and canary when they start (``_serving``), so ones
+    already running finish on the previous model.
+    """
+    global model, scaler, model_version, canary
+    _check_admin(x_admin_token)
+    name = reload.version or CURRENT
+    try:
+        paths = resolve_version(name, MODEL_PATH, SCALER_PATH, MODEL_HISTORY_DIR)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    if name == CURRENT:
+        name = manifest_version(MANIFEST_PATH)
+
+    async with reload_lock:
+        try:
+            loaded = await asyncio.to_thread(load_version, name, *paths, _load_model)
+        except Exception as e:
+            logger.error(f"Failed to load model version {name}: {e}")
+            raise HTTPException(
+                status_code=500, detail=f"Failed to load model version {name}"
+            ) from e
+
+        if reload.shadow or reload.canary_percent > 0:
+            canary = Canary(loaded, reload.canary_percent, reload.shadow)
+            logger.info(f"Routing to candidate model {name}: {canary.status()}")
+        else:
+            model, scaler, model_version = loaded.model, loaded.scaler, name
+            canary = None
+            logger.info(f"Swapped in model version {name}")
+    return _model_status()
+
+
+@app.post("/api/admin/promote")
+async def admin_promote(x_admin_token: Optional[str] = Header(None)):
+    """Make the canary version the active one."""
+    global model, scaler, model_version, canary
+    _check_admin(x_admin_token)
+    if canary is None:
+        raise HTTPException(status_code=409, detail="No canary to promote")
+    candidate = canary.candidate
+    model, scaler, model_version = candidate.model, candidate.scaler, candidate.version
+    canary = None
+    logger.info(f"Promoted model version {model_version}")
+    return _model_status()
+
+
+@app.post("/api/admin/rollback")
+async def admin_rollback(x_admin_token: Optional[str] = Header(None)):
+    """Stop routing to the canary version."""
+    global canary
+    _check_admin(x_admin_token)
+    if canary is not None:
+        logger.info(f"Dropped canary model version {canary.candidate.version}")
+    canary = None
+    return _model_status()
+
+
 # ---------------------------------------------------------------------------
 # Static files (React build)
 # ---------------------------------------------------------------------------
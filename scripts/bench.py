@@ -0,0 +1,396 @@
+"""
+Prediction Hot-Path Microbenchmarks
+===================================
+Times the pieces of a prediction in isolation and compares runs against a
+stored baseline.
+
+Usage:
+    python scripts/bench.py                                   # run everything
+    python scripts/bench.py --filter make_prediction
+    python scripts/bench.py --save benchmarks/baseline.json
+    python scripts/bench.py --compare benchmarks/baseline.json --threshold 0.10
+
+``--compare`` exits with status 1 when any benchmark's median time per call
+is slower than the baseline by more than the threshold. Benchmarks whose
+dependencies are missing (TensorFlow, a Redis server via ``REDIS_URL``) are
+reported as skipped rather than failing the run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.elo import EloContest, rating_deltas  # noqa: E402
+from app.services.leetcode import compute_history_features  # noqa: E402
+from app.services.lookup import build_lookup_table  # noqa: E402
+from app.services.prediction import (  # noqa: E402
+    build_features,
+    make_batch_prediction,
+    make_prediction,
+)
+from app.services.simulation import simulate  # noqa: E402
+from app.utils.cache import RedisCache, TTLCache  # noqa: E402
+from scripts.fake_leetcode import synthesize_history  # noqa: E402
+
+BATCH_SIZES = [1, 4, 16, 64, 256, 1024, 4096]
+HISTORY_SIZES = [10, 100, 1000]
+
+SAMPLE_USER = {
+    "rating": 1850.0,
+    "attendedContestsCount": 45,
+    "avgSolveRate": 0.62,
+    "avgFinishTime": 3100.0,
+    "recentSolveRate": 0.7,
+    "recentFinishTime": 2600.0,
+    "ratingTrend": 6.5,
+    "maxRating": 1900.0,
+}
+
+
+class SkipBenchmarkError(Exception):
+    """Raised by a benchmark factory when its dependencies are unavailable."""
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+BENCHMARKS = {}
+
+
+def benchmark(name, batch=1):
+    """Register a factory returning the zero-argument callable to time."""
+
+    def decorator(factory):
+        BENCHMARKS[name] = (factory, batch)
+        return factory
+
+    return decorator
+
+
+_artifacts = {}
+
+
+def _scaler():
+    if "scaler" not in _artifacts:
+        import joblib
+
+        path = os.environ.get("SCALER_PATH", str(ROOT / "scaler.save"))
+        if not os.path.exists(path):
+            raise SkipBenchmarkError(f"scaler not found at {path}")
+        _artifacts["scaler"] = joblib.load(path)
+    return _artifacts["scaler"]
+
+
+def _model():
+    if "model" not in _artifacts:
+        try:
+            import tensorflow as tf
+        except ImportError:
+            raise SkipBenchmarkError("tensorflow not installed") from None
+        from app.model_loader import load_keras_model
+
+        path = os.environ.get("MODEL_PATH", str(ROOT / "model.keras"))
+        _artifacts["model"] = load_keras_model(tf, path)
+    return _artifacts["model"]
+
+
+def _compiled_model(jit_compile=False):
+    key = f"compiled-jit={jit_compile}"
+    if key not in _artifacts:
+        model = _model()
+        import tensorflow as tf
+
+        from app.tf_runtime import compile_keras_model
+
+        _artifacts[key] = compile_keras_model(tf, model, jit_compile=jit_compile)
+    return _artifacts[key]
+
+
+def _feature_batch(n):
+    rng = np.random.default_rng(0)
+    ranks = rng.integers(1, 30000, size=n)
+    ratings = rng.normal(1700, 250, size=n)
+    return build_features(SAMPLE_USER, ratings, 45, ranks, 30000)
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+
+@benchmark("build_features[single]")
+def _bench_build_features():
+    return lambda: build_features(SAMPLE_USER, 1850.0, 45, 1234, 30000)
+
+
+@benchmark("build_features[batch=4096]", batch=4096)
+def _bench_build_features_batch():
+    ranks = np.arange(1, 4097)
+    return lambda: build_features(SAMPLE_USER, 1850.0, 45, ranks, 30000)
+
+
+@benchmark("scaler.transform[single]")
+def _bench_scaler():
+    scaler, features = _scaler(), _feature_batch(1)
+    return lambda: scaler.transform(features)
+
+
+def _register_prediction_benchmarks():
+    for size in BATCH_SIZES:
+
+        def factory(size=size):
+            model, scaler, features = _model(), _scaler(), _feature_batch(size)
+            if size == 1:
+                return lambda: make_prediction(model, scaler, features)
+            return lambda: make_batch_prediction(model, scaler, features)
+
+        benchmark(f"make_prediction[batch={size}]", batch=size)(factory)
+
+        for jit in (False, True):
+
+            def compiled_factory(size=size, jit=jit):
+                model = _compiled_model(jit)
+                scaler, features = _scaler(), _feature_batch(size)
+                return lambda: make_batch_prediction(model, scaler, features)
+
+            label = "compiled_xla" if jit else "compiled"
+            benchmark(f"{label}[batch={size}]", batch=size)(compiled_factory)
+
+
+def _register_history_benchmarks():
+    for size in HISTORY_SIZES:
+
+        def factory(size=size):
+            history = synthesize_history("bench-user", num_contests=size)
+            return lambda: compute_history_features(history)
+
+        benchmark(f"history_features[contests={size}]")(factory)
+
+
+def _cache_benchmarks(label, make_cache):
+    @benchmark(f"{label}.set")
+    def _set():
+        cache = make_cache()
+        return lambda: cache.set("user:bench", SAMPLE_USER)
+
+    @benchmark(f"{label}.get[hit]")
+    def _get_hit():
+        cache = make_cache()
+        cache.set("user:bench", SAMPLE_USER)
+        return lambda: cache.get("user:bench")
+
+    @benchmark(f"{label}.get[miss]")
+    def _get_miss():
+        cache = make_cache()
+        return lambda: cache.get("user:missing")
+
+
+def _redis_cache():
+    url = os.environ.get("REDIS_URL")
+    if not url:
+        raise SkipBenchmarkError("REDIS_URL not set")
+    try:
+        cache = RedisCache(url, ttl_seconds=300)
+        cache.client.ping()
+    except Exception as e:
+        raise SkipBenchmarkError(f"redis unavailable: {e}") from None
+    return cache
+
+
+class _StubResponse:
+    status_code = 200
+
+    def __init__(self, payload):
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class _StubSession:
+    """Stands in for ``requests.Session`` so the crawler does no network I/O."""
+
+    def __init__(self, history):
+        self._response = _StubResponse({"data": {"userContestRankingHistory": history}})
+
+    def post(self, *args, **kwargs):
+        return self._response
+
+
+@benchmark("crawler.process_user_data[contests=100]")
+def _bench_process_user_data():
+    from scripts.update_data import process_user_data
+
+    session = _StubSession(synthesize_history("bench-user", num_contests=100))
+    return lambda: process_user_data("bench-user", session)
+
+
+def _contest_field(n):
+    rng = np.random.default_rng(0)
+    return rng.normal(1600, 300, n), np.arange(1, n + 1), rng.integers(0, 60, n)
+
+
+@benchmark("elo.rating_deltas[participants=30000]", batch=30000)
+def _bench_elo_contest():
+    ratings, ranks, attended = _contest_field(30000)
+    return lambda: rating_deltas(ratings, ranks, attended)
+
+
+@benchmark("elo.predict[single]")
+def _bench_elo_predict():
+    contest = EloContest(_contest_field(30000)[0])
+    return lambda: contest.predict(1850.0, 1234, 45)
+
+
+@benchmark("lookup.predict_user[single]")
+def _bench_lookup():
+    table = build_lookup_table(_model(), _scaler(), 30000)
+    return lambda: table.predict_user(SAMPLE_USER, 1850.0, 45, 1234)
+
+
+@benchmark("simulate[paths=10000,contests=10]", batch=100_000)
+def _bench_simulate():
+    model, scaler = _model(), _scaler()
+    steps = [
+        {"name": "c", "median": 3000, "spread": 0.6, "total_participants": 30000}
+    ] * 10
+    return lambda: simulate(
+        model, scaler, SAMPLE_USER, 1850.0, 45, steps, 10_000, [5, 50, 95], seed=0
+    )
+
+
+_register_prediction_benchmarks()
+_register_history_benchmarks()
+_cache_benchmarks("TTLCache", lambda: TTLCache(ttl_seconds=300))
+_cache_benchmarks("RedisCache", _redis_cache)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+def measure(fn, repeats: int, min_time: float):
+    """Return per-call timings (ns) for ``repeats`` rounds of ``min_time`` s."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    rounds = timer.repeat(repeat=repeats, number=number)
+    return [r / number * 1e9 for r in rounds], number
+
+
+def run(pattern=None, repeats=5, min_time=0.2):
+    results, skipped = {}, {}
+    for name, (factory, batch) in BENCHMARKS.items():
+        if pattern and pattern not in name:
+            continue
+        try:
+            fn = factory()
+        except SkipBenchmarkError as e:
+            skipped[name] = str(e)
+            print(f"  {name:<45} skipped ({e})")
+            continue
+        per_call, number = measure(fn, repeats, min_time)
+        median = statistics.median(per_call)
+        results[name] = {
+            "median_ns": round(median, 1),
+            "min_ns": round(min(per_call), 1),
+            "stdev_ns": round(statistics.pstdev(per_call), 1),
+            "iterations": number * repeats,
+            "batch": batch,
+            "per_item_ns": round(median / batch, 1),
+        }
+        print(f"  {name:<45} {_fmt(median):>10}/call  {_fmt(median / batch):>10}/item")
+    return results, skipped
+
+
+def compare(results, baseline, threshold: float):
+    """Return ``[(name, baseline_ns, current_ns, ratio)]`` for regressions."""
+    regressions = []
+    for name, current in sorted(results.items()):
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        ratio = current["median_ns"] / base["median_ns"]
+        marker = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"  {name:<45} {ratio:6.2f}x  {marker}")
+        if marker:
+            regressions.append((name, base["median_ns"], current["median_ns"], ratio))
+    return regressions
+
+
+def _fmt(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f}{unit}"
+    return f"{ns:.0f}ns"
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit or None,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prediction microbenchmarks")
+    parser.add_argument("--filter", help="only run benchmarks containing this")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="s per round")
+    parser.add_argument("--save", type=Path, help="write results as a baseline")
+    parser.add_argument("--compare", type=Path, help="baseline to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10, help="allowed slowdown (0.10=10%%)"
+    )
+    args = parser.parse_args(argv)
+
+    print("Running benchmarks...")
+    results, skipped = run(args.filter, args.repeats, args.min_time)
+    report = {"meta": _metadata(), "results": results, "skipped": skipped}
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        print(f"\nComparing against {args.compare} (threshold {args.threshold:.0%})")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed")
+            sys.exit(1)
+        print("\nNo regressions")
+
+
+if __name__ == "__main__":
+    main()
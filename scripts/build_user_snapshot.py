@@ -0,0 +1,113 @@
+"""
+User Snapshot Builder
+=====================
+Fetches known users with the same GraphQL query and feature code as the API
+and stores them as a memory-mapped snapshot (see
+``app/services/user_snapshot.py``).  The API then answers those users
+without calling LeetCode while their entry is fresh, and falls back to the
+snapshot when LeetCode is unavailable.
+
+Usage:
+    python scripts/build_user_snapshot.py
+    python scripts/build_user_snapshot.py --limit 5000 --workers 16
+    python scripts/build_user_snapshot.py --usernames data/usernames.json --fresh
+
+Users already in the snapshot but not fetched this run are kept unless
+``--fresh`` is given.  Set ``LEETCODE_GRAPHQL_URL`` to point at
+``scripts/fake_leetcode.py`` for offline runs.
+"""
+
+import argparse
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.config import LEETCODE_GRAPHQL_URL, USER_SNAPSHOT_DIR  # noqa: E402
+from app.services.leetcode import (  # noqa: E402
+    USER_RANKING_QUERY,
+    parse_user_response,
+)
+from app.services.user_snapshot import (  # noqa: E402
+    get_user_snapshot,
+    write_snapshot,
+)
+from scripts.crawl_plan import (  # noqa: E402
+    USERNAMES_PATH,
+    load_usernames,
+    make_session,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def fetch_user(session, username: str):
+    """``fetch_user_data``'s result for one user, or None."""
+    try:
+        response = session.post(
+            LEETCODE_GRAPHQL_URL,
+            json={"query": USER_RANKING_QUERY, "variables": {"username": username}},
+            timeout=10,
+        )
+        response.raise_for_status()
+        return parse_user_response(response.json())
+    except HTTPException:
+        logger.debug(f"{username}: no contest data")
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Network error fetching {username}: {e}")
+    except ValueError as e:
+        logger.debug(f"Parse error fetching {username}: {e}")
+    return None
+
+
+def fetch_users(session, usernames, workers: int = 10):
+    """``{username: user_data}`` for every user that could be fetched."""
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda name: fetch_user(session, name), usernames)
+        users = {
+            name: data
+            for name, data in zip(usernames, results, strict=True)
+            if data is not None
+        }
+    return users
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the user snapshot")
+    parser.add_argument("--usernames", type=Path, default=USERNAMES_PATH)
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--output", type=Path, default=Path(USER_SNAPSHOT_DIR))
+    parser.add_argument(
+        "--fresh", action="store_true", help="drop users not fetched this run"
+    )
+    args = parser.parse_args(argv)
+
+    usernames = load_usernames(args.usernames)[: args.limit]
+    logger.info(f"Fetching {len(usernames)} users")
+    users = fetch_users(make_session(), usernames, args.workers)
+    if not users:
+        logger.error("No users fetched, keeping the existing snapshot")
+        sys.exit(1)
+
+    previous = None if args.fresh else get_user_snapshot(str(args.output))
+    snapshot = write_snapshot(args.output, users, previous=previous)
+    logger.info(
+        f"Fetched {len(users)}/{len(usernames)} users; "
+        f"snapshot now holds {len(snapshot)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Username Index Builder
+======================
+Builds the username autocomplete index (see ``app/services/usernames.py``)
+from the crawled username pool, or merges more names into an existing one.
+
+Usage:
+    python scripts/build_username_index.py
+    python scripts/build_username_index.py --usernames data/usernames.json \\
+        --output data/username_index
+    python scripts/build_username_index.py --merge --usernames new_names.json
+
+The API merges names seen in successful predictions on its own; rebuild
+from scratch after a large crawl, merge for smaller additions.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import USERNAME_INDEX_DIR  # noqa: E402
+from app.services.usernames import merge_index, write_index  # noqa: E402
+from scripts.crawl_plan import USERNAMES_PATH, load_usernames  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the username index")
+    parser.add_argument("--usernames", type=Path, default=USERNAMES_PATH)
+    parser.add_argument("--output", type=Path, default=Path(USERNAME_INDEX_DIR))
+    parser.add_argument(
+        "--merge", action="store_true", help="add to the existing index"
+    )
+    args = parser.parse_args(argv)
+
+    names = load_usernames(args.usernames)
+    started = time.perf_counter()
+    build = merge_index if args.merge else write_index
+    index = build(args.output, names)
+    logger.info(
+        f"{'Merged' if args.merge else 'Indexed'} {len(names)} usernames in "
+        f"{time.perf_counter() - started:.2f}s; index holds {len(index)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
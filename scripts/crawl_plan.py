@@ -0,0 +1,270 @@
+"""
+LeetCode Crawl Planner
+======================
+Grows the username pool from contest ranking pages and splits it into
+deterministic shards so several crawlers can run side by side.
+
+Usage:
+    python scripts/crawl_plan.py discover weekly-contest-490 --pages 1-200
+    python scripts/crawl_plan.py stats --shards 8
+    python scripts/crawl_plan.py merge data/data.shard-*-of-8.json
+
+Shard ``i/N`` (0-based) owns every username whose hash modulo ``N`` is ``i``.
+The assignment depends only on the username, so shards never overlap and
+their outputs can be concatenated without deduplication.
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+USERNAMES_PATH = DATA_DIR / "usernames.json"
+
+LEETCODE_RANKING_URL = os.environ.get(
+    "LEETCODE_RANKING_URL", "https://leetcode.com/contest/api/ranking/{slug}/"
+)
+
+HEADERS = {
+    "Content-Type": "application/json",
+    "Referer": "https://leetcode.com/",
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
+}
+
+
+# ---------------------------------------------------------------------------
+# Username pool
+# ---------------------------------------------------------------------------
+
+
+def username_key(username: str) -> str:
+    """Canonical form used for deduplication and sharding."""
+    return username.strip().lower()
+
+
+def dedupe(usernames):
+    """Drop blanks and case-insensitive duplicates, keeping first-seen order."""
+    seen = set()
+    unique = []
+    for name in usernames:
+        key = username_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(name.strip())
+    return unique
+
+
+def load_usernames(path=USERNAMES_PATH):
+    with open(path, "r") as f:
+        return dedupe(json.load(f))
+
+
+def save_usernames(usernames, path=USERNAMES_PATH):
+    tmp = Path(f"{path}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(usernames, f, indent=4)
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Sharding
+# ---------------------------------------------------------------------------
+
+
+def parse_shard(spec: str):
+    """Parse ``"i/N"`` into ``(i, N)`` with ``0 <= i < N``."""
+    try:
+        index, count = (int(p) for p in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Invalid shard '{spec}'. Use i/N, e.g. 0/4") from None
+    if count <= 0 or not 0 <= index < count:
+        raise ValueError(f"Shard index must satisfy 0 <= i < N, got '{spec}'")
+    return index, count
+
+
+def shard_of(username: str, num_shards: int) -> int:
+    """Stable shard assignment (independent of PYTHONHASHSEED and platform)."""
+    digest = hashlib.blake2b(username_key(username).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def select_shard(usernames, index: int, num_shards: int, limit=None):
+    """Return the usernames owned by shard ``index``, in pool order."""
+    selected = [u for u in usernames if shard_of(u, num_shards) == index]
+    return selected[:limit] if limit is not None else selected
+
+
+def shard_output_path(index: int, num_shards: int) -> Path:
+    if num_shards == 1:
+        return DATA_DIR / "data.json"
+    return DATA_DIR / f"data.shard-{index}-of-{num_shards}.json"
+
+
+# ---------------------------------------------------------------------------
+# Discovery from contest ranking pages
+# ---------------------------------------------------------------------------
+
+
+def fetch_ranking_page(session, contest_slug: str, page: int):
+    """Fetch one page (25 rows) of a contest's global ranking, or None."""
+    try:
+        response = session.get(
+            LEETCODE_RANKING_URL.format(slug=contest_slug),
+            params={"pagination": page, "region": "global"},
+            timeout=10,
+        )
+        if response.status_code == 200:
+            return response.json()
+        logger.debug(f"{contest_slug} page {page}: HTTP {response.status_code}")
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"Network error fetching {contest_slug} page {page}: {e}")
+    except ValueError as e:
+        logger.debug(f"Parse error fetching {contest_slug} page {page}: {e}")
+    return None
+
+
+def _page_usernames(page_data):
+    rows = (page_data or {}).get("total_rank") or []
+    # CN-region rows carry a different account namespace; skip them
+    return [
+        r["username"]
+        for r in rows
+        if r.get("username") and r.get("data_region", "US") == "US"
+    ]
+
+
+def discover_usernames(session, contest_slugs, pages, workers=10):
+    """Collect usernames from the given ranking pages of each contest.
+
+    Pages are fetched concurrently but read back in contest and page order,
+    so the same plan always grows the pool (and fills ``--limit``) the same
+    way.
+    """
+    jobs = [(slug, page) for slug in contest_slugs for page in pages]
+    found = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(lambda job: fetch_ranking_page(session, *job), jobs)
+        for data in results:
+            found.extend(_page_usernames(data))
+    return found
+
+
+def grow_pool(usernames, discovered):
+    """Append discovered names not already in the pool; returns (pool, added)."""
+    seen = {username_key(u) for u in usernames}
+    added = [u for u in dedupe(discovered) if username_key(u) not in seen]
+    return usernames + added, len(added)
+
+
+def parse_pages(spec: str):
+    """Parse ``"1-200"`` or ``"3"`` into a range of 1-based page numbers."""
+    start, _, end = spec.partition("-")
+    first, last = int(start), int(end or start)
+    if first < 1 or last < first:
+        raise ValueError(f"Invalid page range '{spec}'")
+    return range(first, last + 1)
+
+
+def make_session():
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    return session
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+
+def merge_outputs(paths, dest: Path) -> int:
+    """Concatenate JSONL shard outputs into ``dest``; returns record count."""
+    count = 0
+    tmp = Path(f"{dest}.tmp")
+    with open(tmp, "w") as out:
+        for path in sorted(paths):
+            with open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        out.write(line if line.endswith("\n") else line + "\n")
+                        count += 1
+    os.replace(tmp, dest)
+    return count
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+
+def _cmd_discover(args):
+    usernames = load_usernames(args.usernames)
+    discovered = discover_usernames(
+        make_session(), args.contests, parse_pages(args.pages), args.workers
+    )
+    pool, added = grow_pool(usernames, discovered)
+    logger.info(f"Discovered {len(discovered)} names, {added} new")
+    if added and not args.dry_run:
+        save_usernames(pool, args.usernames)
+        logger.info(f"Pool now has {len(pool)} usernames ({args.usernames})")
+
+
+def _cmd_stats(args):
+    if args.shards <= 0:
+        raise ValueError("--shards must be positive")
+    usernames = load_usernames(args.usernames)
+    sizes = [0] * args.shards
+    for name in usernames:
+        sizes[shard_of(name, args.shards)] += 1
+    print(f"{len(usernames)} unique usernames across {args.shards} shards")
+    for i, size in enumerate(sizes):
+        print(f"  shard {i}/{args.shards}: {size}")
+
+
+def _cmd_merge(args):
+    count = merge_outputs(args.inputs, Path(args.output))
+    logger.info(f"Merged {count} records from {len(args.inputs)} files")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Plan sharded LeetCode crawls")
+    parser.add_argument("--usernames", type=Path, default=USERNAMES_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("discover", help="grow the pool from contest rankings")
+    p.add_argument("contests", nargs="+", help="contest slugs")
+    p.add_argument("--pages", default="1-40", help="page range, e.g. 1-200")
+    p.add_argument("--workers", type=int, default=10)
+    p.add_argument("--dry-run", action="store_true")
+    p.set_defaults(func=_cmd_discover)
+
+    p = sub.add_parser("stats", help="show shard sizes")
+    p.add_argument("--shards", type=int, default=1)
+    p.set_defaults(func=_cmd_stats)
+
+    p = sub.add_parser("merge", help="merge shard outputs into one file")
+    p.add_argument("inputs", nargs="+", type=Path)
+    p.add_argument("--output", default=str(DATA_DIR / "data.json"))
+    p.set_defaults(func=_cmd_merge)
+
+    args = parser.parse_args(argv)
+    try:
+        args.func(args)
+    except (OSError, ValueError) as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,23 @@
 Usage:
     python download_model.py
 
-Set `MODEL_URL` and `SCALER_URL` environment variables to override manifest.
+Set `MODEL_URL` and `SCALER_URL` environment variables to override manifest
+(and `MODEL_SHA256`/`SCALER_SHA256` to verify them).
+
+Artifacts whose on-disk SHA-256 matches the manifest are skipped.  Downloads
+go to a ``.part`` file that is resumed with HTTP Range requests after an
+interruption; files of ``PARALLEL_MIN_BYTES`` or more are fetched as
+parallel ranged chunks (``DOWNLOAD_WORKERS``, default 4).  The hash is
+computed while streaming and the file is renamed into place only once it
+matches.
 """
 
+import hashlib
 import json
 import os
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from urllib.parse import urlparse
 
@@ -21,6 +31,10 @@ MANIFEST_PATH = ROOT / "models" / "manifest.json"
 # Only allow http(s) schemes
 ALLOWED_SCHEMES = {"http", "https"}
 
+CHUNK_BYTES = 1 << 20
+PARALLEL_MIN_BYTES = 32 << 20
+PARALLEL_CHUNK_BYTES = 8 << 20
+
 
 def _validate_url(url: str) -> None:
     """Reject non-http(s) URLs to prevent local file access."""
@@ -33,14 +47,150 @@ def _validate_url(url: str) -> None:
         )
 
 
-def _stream_to_file(url: str, dest: Path, headers: dict | None = None):
-    """Download a URL to a local file using streaming."""
-    r = requests.get(url, headers=headers or {}, stream=True, timeout=60)
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _probe(url: str, headers: dict):
+    """Return ``(size or None, accepts_ranges)`` from a HEAD request."""
+    try:
+        r = requests.head(url, headers=headers, allow_redirects=True, timeout=30)
+        r.raise_for_status()
+    except requests.RequestException:
+        return None, False
+    size = r.headers.get("Content-Length")
+    ranges = r.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return (int(size) if size and size.isdigit() else None), ranges
+
+
+def _stream_to_file(url: str, part: Path, headers: dict, ranges: bool):
+    """Stream ``url`` into ``part``, resuming an existing partial file.
+
+    Returns the SHA-256 of the complete file, computed while streaming.
+    """
+    digest = hashlib.sha256()
+    offset = part.stat().st_size if part.exists() and ranges else 0
+    if offset:
+        with open(part, "rb") as f:
+            for block in iter(lambda: f.read(CHUNK_BYTES), b""):
+                digest.update(block)
+        headers = {**headers, "Range": f"bytes={offset}-"}
+
+    r = requests.get(url, headers=headers, stream=True, timeout=60)
+    if r.status_code == 416:  # nothing left to fetch
+        return digest.hexdigest()
     r.raise_for_status()
-    with open(dest, "wb") as f:
-        for chunk in r.iter_content(chunk_size=8192):
+    if offset and r.status_code != 206:  # range ignored: start over
+        offset, digest = 0, hashlib.sha256()
+    if offset:
+        print(f"  resuming at {offset} bytes")
+    with open(part, "ab" if offset else "wb") as f:
+        for chunk in r.iter_content(chunk_size=CHUNK_BYTES):
             if chunk:
                 f.write(chunk)
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fetch_range(url: str, headers: dict, part: Path, start: int, end: int):
+    r = requests.get(
+        url, headers={**headers, "Range": f"bytes={start}-{end - 1}"}, timeout=60
+    )
+    r.raise_for_status()
+    if r.status_code != 206 or len(r.content) != end - start:
+        raise OSError(f"Server returned a bad range for bytes {start}-{end - 1}")
+    fd = os.open(part, os.O_WRONLY)
+    try:
+        os.pwrite(fd, r.content, start)
+    finally:
+        os.close(fd)
+
+
+def _parallel_to_file(url: str, part: Path, headers: dict, size: int, workers: int):
+    """Fetch ``size`` bytes as parallel ranged chunks into ``part``.
+
+    Finished chunks are recorded in ``<part>.chunks`` so an interrupted run
+    only refetches the rest.  The hash is advanced over the contiguous
+    finished prefix as chunks land, so it is ready when the last one does.
+    """
+    state_path = part.with_name(part.name + ".chunks")
+    state = {"size": size, "chunk": PARALLEL_CHUNK_BYTES, "done": []}
+    if part.exists() and state_path.exists():
+        saved = json.loads(state_path.read_text())
+        if (saved["size"], saved["chunk"]) == (size, PARALLEL_CHUNK_BYTES):
+            state = saved
+    if not state["done"]:
+        with open(part, "wb") as f:
+            f.truncate(size)
+    done = set(state["done"])
+    if done:
+        print(f"  resuming, {len(done)} chunks already present")
+
+    bounds = [
+        (i, start, min(size, start + PARALLEL_CHUNK_BYTES))
+        for i, start in enumerate(range(0, size, PARALLEL_CHUNK_BYTES))
+    ]
+    digest, hashed = hashlib.sha256(), 0
+
+    def advance():
+        nonlocal hashed
+        with open(part, "rb") as f:
+            while hashed < len(bounds) and hashed in done:
+                _, start, end = bounds[hashed]
+                f.seek(start)
+                digest.update(f.read(end - start))
+                hashed += 1
+
+    advance()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(_fetch_range, url, headers, part, start, end): i
+            for i, start, end in bounds
+            if i not in done
+        }
+        for future in as_completed(futures):
+            future.result()
+            done.add(futures[future])
+            state["done"] = sorted(done)
+            state_path.write_text(json.dumps(state))
+            advance()
+    state_path.unlink()
+    return digest.hexdigest()
+
+
+def fetch(url: str, dest: Path, sha256=None, headers=None, workers: int = 4) -> bool:
+    """Download ``url`` to ``dest`` unless it already matches ``sha256``.
+
+    Data goes to ``<dest>.part`` (resumed if present) and is renamed into
+    place only after the hash checks out.  Returns False if ``dest`` was
+    already up to date.
+    """
+    headers = headers or {}
+    if sha256 and dest.exists() and _file_sha256(dest) == sha256:
+        print(f"{dest.name} is up to date")
+        return False
+
+    part = dest.with_name(dest.name + ".part")
+    size, ranges = _probe(url, headers)
+    resumed = part.exists()
+    while True:
+        if ranges and size is not None and size >= PARALLEL_MIN_BYTES and workers > 1:
+            actual = _parallel_to_file(url, part, headers, size, workers)
+        else:
+            actual = _stream_to_file(url, part, headers, ranges)
+        if not sha256 or actual == sha256:
+            break
+        part.unlink()
+        if not resumed:
+            raise ValueError(f"SHA-256 mismatch for {dest.name}: got {actual}")
+        print(f"  partial {part.name} was stale, downloading from scratch")
+        resumed = False
+    os.replace(part, dest)
+    return True
 
 
 def _resolve_gh_url(gh_url: str) -> tuple[str, dict]:
@@ -73,7 +223,7 @@ def _resolve_gh_url(gh_url: str) -> tuple[str, dict]:
     raise ValueError(f"Asset {asset_name} not found in release {tag}")
 
 
-def download(url: str, dest: Path):
+def download(url: str, dest: Path, sha256=None, workers: int = 4) -> bool:
     _validate_url(url)
     # Resolve dest and ensure it stays within the project root
     resolved = dest.resolve()
@@ -81,23 +231,33 @@ def download(url: str, dest: Path):
         raise ValueError(f"Destination {dest} is outside the project root")
 
     dest.parent.mkdir(parents=True, exist_ok=True)
+    headers = {}
+    if url.startswith("gh:"):
+        if sha256 and resolved.exists() and _file_sha256(resolved) == sha256:
+            print(f"{dest.name} is up to date")
+            return False
+        url, headers = _resolve_gh_url(url)
     print(f"Downloading {url} -> {dest}")
+    return fetch(url, resolved, sha256, headers, workers)
 
-    if url.startswith("gh:"):
-        download_url, headers = _resolve_gh_url(url)
-        _stream_to_file(download_url, resolved, headers)
-    else:
-        _stream_to_file(url, resolved)
 
+def _artifact(manifest, name: str, url_var: str, sha_var: str):
+    """``(url, sha256)``; the manifest hash only applies to the manifest URL."""
+    entry = manifest.get(name, {})
+    url = os.environ.get(url_var)
+    if url:
+        return url, os.environ.get(sha_var) or None
+    return entry.get("url"), entry.get("sha256") or None
 
-def main():
-    model_url = os.environ.get("MODEL_URL")
-    scaler_url = os.environ.get("SCALER_URL")
 
-    if MANIFEST_PATH.exists():
-        manifest = json.loads(MANIFEST_PATH.read_text())
-        model_url = model_url or manifest.get("model.keras", {}).get("url")
-        scaler_url = scaler_url or manifest.get("scaler.save", {}).get("url")
+def main():
+    manifest = json.loads(MANIFEST_PATH.read_text()) if MANIFEST_PATH.exists() else {}
+    model_url, model_sha = _artifact(
+        manifest, "model.keras", "MODEL_URL", "MODEL_SHA256"
+    )
+    scaler_url, scaler_sha = _artifact(
+        manifest, "scaler.save", "SCALER_URL", "SCALER_SHA256"
+    )
 
     if not model_url or not scaler_url:
         print(
@@ -106,9 +266,19 @@ def main():
         )
         sys.exit(1)
 
+    workers = int(os.environ.get("DOWNLOAD_WORKERS", "4"))
     try:
-        download(model_url, ROOT / "model.keras")
-        download(scaler_url, ROOT / "scaler.save")
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            jobs = [
+                pool.submit(
+                    download, model_url, ROOT / "model.keras", model_sha, workers
+                ),
+                pool.submit(
+                    download, scaler_url, ROOT / "scaler.save", scaler_sha, workers
+                ),
+            ]
+            for job in jobs:
+                job.result()
     except Exception as e:
         print(f"Failed to download artifacts: {e}")
         sys.exit(2)
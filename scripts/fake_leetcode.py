@@ -0,0 +1,426 @@
+"""
+Fake LeetCode Server
+====================
+Local stand-in for the LeetCode GraphQL and contest-ranking endpoints, used
+for offline benchmarking and load tests.
+
+Usage:
+    python scripts/fake_leetcode.py --port 8100 --latency lognormal:80,0.6
+    LEETCODE_GRAPHQL_URL=http://127.0.0.1:8100/graphql python main.py
+
+    # Record real responses once, then replay them offline
+    python scripts/fake_leetcode.py --record data/recordings.jsonl
+    python scripts/fake_leetcode.py --replay data/recordings.jsonl
+
+Unknown usernames and contests get synthetic but deterministic data: the same
+username always yields the same history, whatever the seed or request order.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+UPSTREAM_GRAPHQL_URL = "https://leetcode.com/graphql"
+UPSTREAM_RANKING_URL = "https://leetcode.com/contest/api/ranking/{slug}/"
+
+# Weekly contest 1 started 2018-09-30 (approximately); one per week after that
+_WEEKLY_EPOCH = 1538274600
+_WEEK = 7 * 24 * 3600
+LATEST_WEEKLY = 490
+RANKING_PAGE_SIZE = 25
+
+
+# ---------------------------------------------------------------------------
+# Deterministic synthetic data
+# ---------------------------------------------------------------------------
+
+
+def _rng(*parts) -> random.Random:
+    """Random generator seeded from the given parts (stable across runs)."""
+    key = "\x1f".join(str(p) for p in parts).encode()
+    seed = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+    return random.Random(seed)  # noqa: S311 - synthetic data, not crypto
+
+
+def contest_participants(contest_slug: str) -> int:
+    """Plausible participant count for a contest."""
+    base = 18000 if contest_slug.startswith("biweekly") else 26000
+    return base + _rng("participants", contest_slug).randint(0, 12000)
+
+
+def synthesize_history(username: str, num_contests: Optional[int] = None):
+    """Return a ``userContestRankingHistory`` list for any username.
+
+    Ratings follow a damped random walk around a per-user skill level, and
+    rank, solve count and finish time are derived from that skill so the
+    features the predictor computes look like real data.
+    """
+    rng = _rng("history", username)
+    if num_contests is None:
+        num_contests = rng.randint(5, 150)
+    skill = rng.gauss(1650, 250)
+    attend_prob = rng.uniform(0.4, 1.0)
+    first = max(1, LATEST_WEEKLY - num_contests + 1)
+
+    history = []
+    rating = 1500.0
+    for i in range(num_contests):
+        number = first + i
+        attended = rng.random() < attend_prob
+        entry = {
+            "attended": attended,
+            "rating": round(rating, 3),
+            "ranking": 0,
+            "problemsSolved": 0,
+            "totalProblems": 4,
+            "finishTimeInSeconds": 0,
+            "contest": {
+                "title": f"Weekly Contest {number}",
+                "startTime": _WEEKLY_EPOCH + number * _WEEK,
+            },
+        }
+        if attended:
+            form = rng.gauss(skill, 120)
+            participants = contest_participants(f"weekly-contest-{number}")
+            pct = 1 / (1 + 10 ** ((form - 1500) / 400))
+            rank = max(1, int(participants * pct * rng.uniform(0.8, 1.2)))
+            solved = min(4, max(0, round(4 * (1 - pct) + rng.gauss(0, 0.7))))
+            rating += (form - rating) * 0.12 + rng.gauss(0, 8)
+            entry.update(
+                rating=round(rating, 3),
+                ranking=rank,
+                problemsSolved=solved,
+                finishTimeInSeconds=rng.randint(600, 5400) if solved else 0,
+            )
+        history.append(entry)
+    return history
+
+
+def synthesize_user(username: str):
+    """Return ``(userContestRanking, userContestRankingHistory)``."""
+    history = synthesize_history(username)
+    attended = [h for h in history if h["attended"]]
+    ranking = {
+        "attendedContestsCount": len(attended),
+        "rating": attended[-1]["rating"] if attended else 1500.0,
+    }
+    return ranking, history
+
+
+def synthesize_ranking_page(contest_slug: str, page: int):
+    """Return one page of a contest's ranking in the REST API's shape."""
+    user_num = contest_participants(contest_slug)
+    start = (page - 1) * RANKING_PAGE_SIZE
+    rows = []
+    for rank in range(start + 1, min(start + RANKING_PAGE_SIZE, user_num) + 1):
+        rng = _rng("rank", contest_slug, rank)
+        rows.append(
+            {
+                "username": f"synthetic-{rng.getrandbits(40):010x}",
+                "rank": rank,
+                "score": max(0, 18 - (rank * 18) // user_num),
+                "finish_time": 1_700_000_000 + rank // 3,
+                "data_region": "US",
+            }
+        )
+    return {"total_rank": rows, "user_num": user_num}
+
+
+# ---------------------------------------------------------------------------
+# Fault and latency injection
+# ---------------------------------------------------------------------------
+
+
+def parse_latency(spec: str):
+    """Parse a latency spec into a sampler returning seconds.
+
+    ``none``, ``fixed:MS``, ``uniform:LO,HI`` or ``lognormal:MEDIAN,SIGMA``.
+    """
+    kind, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",")] if params else []
+    if kind == "none":
+        return lambda rng: 0.0
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0] / 1000
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f"Invalid latency spec '{spec}'")
+
+
+class TokenBucket:
+    """Thread-safe token bucket; ``rate <= 0`` disables the cap."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._last) * self.rate
+            )
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+@dataclass
+class FakeConfig:
+    latency: str = "none"
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    max_rps: float = 0.0
+    seed: int = 0
+    replay: Optional[Path] = None
+    record: Optional[Path] = None
+    stats: dict = field(default_factory=dict)
+
+
+# ---------------------------------------------------------------------------
+# Recording / replay
+# ---------------------------------------------------------------------------
+
+
+def _operation(query: str) -> str:
+    for op in (
+        "userContestRanking",
+        "contestDetailPage",
+        "topTwoContests",
+        "pastContests",
+    ):
+        if op in query:
+            return op
+    return "unknown"
+
+
+def recording_key(operation: str, variables: dict) -> str:
+    return f"{operation}:{json.dumps(variables or {}, sort_keys=True)}"
+
+
+def load_recordings(path: Path):
+    recordings = {}
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                recordings[entry["key"]] = (entry["status"], entry["body"])
+    logger.info(f"Loaded {len(recordings)} recorded responses from {path}")
+    return recordings
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+
+def _graphql_response(operation: str, variables: dict):
+    if operation == "userContestRanking":
+        username = variables.get("username", "")
+        if username.startswith("missing-"):
+            return {"data": {"userContestRanking": None}}
+        ranking, history = synthesize_user(username)
+        return {
+            "data": {
+                "userContestRanking": ranking,
+                "userContestRankingHistory": history,
+            }
+        }
+    if operation == "contestDetailPage":
+        slug = variables.get("contestSlug", "")
+        return {
+            "data": {
+                "contestDetailPage": {
+                    "title": slug.replace("-", " ").title(),
+                    "titleSlug": slug,
+                    "registerUserNum": contest_participants(slug),
+                }
+            }
+        }
+    if operation == "topTwoContests":
+        return {
+            "data": {
+                "topTwoContests": [
+                    {
+                        "title": f"Weekly Contest {LATEST_WEEKLY + 1}",
+                        "titleSlug": f"weekly-contest-{LATEST_WEEKLY + 1}",
+                    },
+                    {
+                        "title": f"Weekly Contest {LATEST_WEEKLY}",
+                        "titleSlug": f"weekly-contest-{LATEST_WEEKLY}",
+                    },
+                ]
+            }
+        }
+    if operation == "pastContests":
+        past = [
+            {"title": f"Weekly Contest {n}", "titleSlug": f"weekly-contest-{n}"}
+            for n in range(LATEST_WEEKLY, LATEST_WEEKLY - 5, -1)
+        ]
+        return {"data": {"pastContests": {"data": past}}}
+    return {"errors": [{"message": "Unsupported query"}]}
+
+
+class FakeLeetCode:
+    """Fault injection plus replay/record/synthesis for one server instance."""
+
+    def __init__(self, config: FakeConfig):
+        self.config = config
+        self.sample_latency = parse_latency(config.latency)
+        self.rng = random.Random(config.seed)  # noqa: S311 - fault injection only
+        self.bucket = TokenBucket(config.max_rps)
+        self.recordings = load_recordings(config.replay) if config.replay else {}
+        self.upstream = httpx.AsyncClient(timeout=30.0) if config.record else None
+        self._record_lock = threading.Lock()
+        self.stats = config.stats
+        self.stats.update(requests=0, errors=0, rate_limited=0, replayed=0)
+
+    async def inject(self):
+        """Apply latency and fault injection; returns an error response or None."""
+        self.stats["requests"] += 1
+        await asyncio.sleep(self.sample_latency(self.rng))
+        limited = not self.bucket.try_acquire()
+        if limited or self.rng.random() < self.config.rate_limit_rate:
+            self.stats["rate_limited"] += 1
+            return JSONResponse(
+                {"error": "Too Many Requests"},
+                status_code=429,
+                headers={"Retry-After": "1"},
+            )
+        if self.rng.random() < self.config.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"error": "Internal Server Error"}, status_code=500)
+        return None
+
+    async def respond(self, key: str, synthesize, fetch_upstream):
+        """Serve a recording, record from upstream, or synthesize."""
+        if key in self.recordings:
+            self.stats["replayed"] += 1
+            status, body = self.recordings[key]
+            return JSONResponse(body, status_code=status)
+        if self.upstream is not None:
+            response = await fetch_upstream(self.upstream)
+            body = response.json()
+            with self._record_lock, open(self.config.record, "a") as f:
+                entry = {"key": key, "status": response.status_code, "body": body}
+                f.write(json.dumps(entry) + "\n")
+            self.recordings[key] = (response.status_code, body)
+            return JSONResponse(body, status_code=response.status_code)
+        return JSONResponse(synthesize())
+
+
+def create_app(config: FakeConfig) -> FastAPI:
+    """Build the stand-in app for the given fault/latency configuration."""
+    app = FastAPI(title="Fake LeetCode")
+    fake = FakeLeetCode(config)
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        injected = await fake.inject()
+        if injected is not None:
+            return injected
+        payload = await request.json()
+        operation = _operation(payload.get("query", ""))
+        variables = payload.get("variables") or {}
+        return await fake.respond(
+            recording_key(operation, variables),
+            lambda: _graphql_response(operation, variables),
+            lambda upstream: upstream.post(
+                UPSTREAM_GRAPHQL_URL,
+                json=payload,
+                headers={"Referer": "https://leetcode.com/"},
+            ),
+        )
+
+    @app.get("/contest/api/ranking/{slug}/")
+    async def ranking(slug: str, pagination: int = 1, region: str = "global"):
+        injected = await fake.inject()
+        if injected is not None:
+            return injected
+        return await fake.respond(
+            recording_key("ranking", {"slug": slug, "page": pagination}),
+            lambda: synthesize_ranking_page(slug, max(1, pagination)),
+            lambda upstream: upstream.get(
+                UPSTREAM_RANKING_URL.format(slug=slug),
+                params={"pagination": pagination, "region": region},
+                headers={"Referer": "https://leetcode.com/"},
+            ),
+        )
+
+    @app.get("/stats")
+    async def get_stats():
+        return fake.stats
+
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline LeetCode stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument(
+        "--latency",
+        default="none",
+        help="none | fixed:MS | uniform:LO,HI | lognormal:MEDIAN_MS,SIGMA",
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--max-rps", type=float, default=0.0, help="throughput cap (429 above it)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--replay", type=Path, help="JSONL recordings to serve")
+    group.add_argument("--record", type=Path, help="proxy to LeetCode and record")
+    args = parser.parse_args(argv)
+
+    parse_latency(args.latency)  # fail fast on a bad spec
+    config = FakeConfig(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        max_rps=args.max_rps,
+        seed=args.seed,
+        replay=args.replay,
+        record=args.record,
+    )
+
+    import uvicorn
+
+    logger.info(f"GraphQL:  http://{args.host}:{args.port}/graphql")
+    logger.info(
+        f"Rankings: http://{args.host}:{args.port}/contest/api/ranking/{{slug}}/"
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Parallel Hyperparameter Search
+==============================
+Random search over the network's architecture and optimizer settings with
+asynchronous successive halving (ASHA).  Trials run concurrently in a
+process pool, each limited to ``--threads`` TensorFlow threads, and are
+pruned at the rungs ``min_epochs * eta**k``: a trial continues past a rung
+only if its validation MAE is in the best ``1/eta`` of the results recorded
+at that rung so far.  Pruning decisions never wait for other trials.
+
+The training data is prepared once (``scripts/train.py``'s record format)
+and consolidated into ``train.npy``/``val.npy``, which every worker
+memory-maps, so all trials share one copy in the page cache.
+
+Usage:
+    python scripts/hpsearch.py --trials 64
+    python scripts/hpsearch.py --records models/history/run_<version>/records
+    python scripts/hpsearch.py --trials 128 --threads 1 --max-epochs 81
+
+The leaderboard (best first) is rewritten to
+``models/hpsearch/leaderboard.json`` after every finished trial.
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from multiprocessing import Manager
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.train import (  # noqa: E402
+    DATA_PATH,
+    NUM_FEATURES,
+    RECORD_FLOATS,
+    build_model,
+    prepare_records,
+    scaler_from_stats,
+)
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+OUTPUT_DIR = ROOT / "models" / "hpsearch"
+
+SEARCH_SPACE = {
+    "units": [(64, 32), (128, 64), (128, 64, 32), (256, 128, 64), (256, 128, 64, 32)],
+    "dropout": [0.0, 0.1, 0.2, 0.3, 0.4],
+    "learning_rate": (1e-4, 3e-3),  # log-uniform
+    "batch_size": [64, 128, 256, 512],
+}
+
+
+def sample_config(rng):
+    units = SEARCH_SPACE["units"][rng.integers(len(SEARCH_SPACE["units"]))]
+    low, high = SEARCH_SPACE["learning_rate"]
+    return {
+        "units": list(units),
+        "dropout": [
+            float(rng.choice(SEARCH_SPACE["dropout"])) for _ in range(len(units) - 1)
+        ],
+        "learning_rate": float(math.exp(rng.uniform(math.log(low), math.log(high)))),
+        "batch_size": int(rng.choice(SEARCH_SPACE["batch_size"])),
+    }
+
+
+def rung_epochs(min_epochs: int, max_epochs: int, eta: int):
+    """Epoch counts at which trials are compared: ``min_epochs * eta**k``."""
+    rungs, epochs = [], min_epochs
+    while epochs < max_epochs:
+        rungs.append(epochs)
+        epochs *= eta
+    return rungs
+
+
+class AshaRungs:
+    """Shared rung results and the ASHA continue/stop rule.
+
+    ``results`` and ``lock`` are ``multiprocessing.Manager`` proxies (or a
+    plain dict and lock within one process).
+    """
+
+    def __init__(self, results, lock, min_epochs: int, max_epochs: int, eta: int):
+        self.results = results
+        self.lock = lock
+        self.rungs = set(rung_epochs(min_epochs, max_epochs, eta))
+        self.eta = eta
+
+    def report(self, epoch: int, score: float) -> bool:
+        """Record ``score`` (lower is better); return whether to continue."""
+        if epoch not in self.rungs:
+            return True
+        with self.lock:
+            scores = self.results.get(epoch, []) + [score]
+            self.results[epoch] = scores
+        if len(scores) < self.eta:
+            return True
+        return score <= np.percentile(scores, 100 / self.eta)
+
+
+# ---------------------------------------------------------------------------
+# Workers
+# ---------------------------------------------------------------------------
+_rungs = None
+
+
+def _init_worker(results, lock, min_epochs, max_epochs, eta, threads):
+    global _rungs
+    _rungs = AshaRungs(results, lock, min_epochs, max_epochs, eta)
+    for var in ("OMP_NUM_THREADS", "TF_NUM_INTRAOP_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    os.environ["TF_NUM_INTEROP_THREADS"] = "1"
+
+
+def _run_trial(objective, trial_id: int, config, max_epochs: int):
+    started = time.perf_counter()
+    history = []
+
+    def report(epoch, score):
+        history.append(float(score))
+        return _rungs.report(epoch, score)
+
+    objective(config, max_epochs, report)
+    return {
+        "trial": trial_id,
+        "config": config,
+        "val_mae": min(history) if history else math.inf,
+        "epochs": len(history),
+        "completed": len(history) >= max_epochs,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def search(objective, configs, workers: int, threads: int, rung_args, leaderboard):
+    """Run every config through ``objective`` and return the ranked results.
+
+    ``objective(config, max_epochs, report)`` trains one epoch at a time and
+    calls ``report(epoch, val_mae)`` after each, stopping when it returns
+    False.  ``rung_args`` is ``(min_epochs, max_epochs, eta)``.
+    """
+    results = []
+    with Manager() as manager:
+        initargs = (manager.dict(), manager.Lock(), *rung_args, threads)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=initargs
+        ) as pool:
+            futures = [
+                pool.submit(_run_trial, objective, i, config, rung_args[1])
+                for i, config in enumerate(configs)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                results.append(result)
+                write_leaderboard(results, leaderboard)
+                logger.info(
+                    f"trial {result['trial']}: val MAE {result['val_mae']:.3f} "
+                    f"after {result['epochs']} epochs ({result['seconds']}s)"
+                )
+    return sorted(results, key=lambda r: r["val_mae"])
+
+
+def write_leaderboard(results, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps(sorted(results, key=lambda r: r["val_mae"]), indent=2) + "\n"
+    )
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Shared data and the TensorFlow objective
+# ---------------------------------------------------------------------------
+def consolidate(records_dir: Path, out_dir: Path):
+    """Scale each split into one ``.npy`` that workers memory-map."""
+    meta = json.loads((records_dir / "meta.json").read_text())
+    scaler = scaler_from_stats(meta)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for split in ("train", "val"):
+        files = sorted((records_dir / split).glob("*.f32"))
+        rows = sum(f.stat().st_size for f in files) // (RECORD_FLOATS * 4)
+        out = np.lib.format.open_memmap(
+            out_dir / f"{split}.npy", "w+", np.float32, (rows, RECORD_FLOATS)
+        )
+        offset = 0
+        for f in files:
+            block = np.fromfile(f, dtype=np.float32).reshape(-1, RECORD_FLOATS)
+            block[:, :NUM_FEATURES] = scaler.transform(block[:, :NUM_FEATURES])
+            out[offset : offset + len(block)] = block
+            offset += len(block)
+        out.flush()
+        del out
+    return out_dir
+
+
+_data = {}
+
+
+def _shared(path: str):
+    if path not in _data:
+        _data[path] = np.load(path, mmap_mode="r")
+    return _data[path]
+
+
+def tf_objective(config, max_epochs, report, data_dir):
+    """Train ``config`` on the memory-mapped splits, one epoch at a time."""
+    import tensorflow as tf
+
+    threads = int(os.environ.get("TF_NUM_INTRAOP_THREADS", "0"))
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    train = _shared(os.path.join(data_dir, "train.npy"))
+    val = _shared(os.path.join(data_dir, "val.npy"))
+
+    class Batches(tf.keras.utils.PyDataset):
+        """Shuffled batches gathered straight from the shared mmap."""
+
+        def __init__(self, rows, batch_size, shuffle):
+            super().__init__()
+            self.rows, self.batch_size, self.shuffle = rows, batch_size, shuffle
+            self.order = np.arange(len(rows))
+            self.on_epoch_end()
+
+        def __len__(self):
+            return math.ceil(len(self.rows) / self.batch_size)
+
+        def __getitem__(self, i):
+            index = np.sort(self.order[i * self.batch_size : (i + 1) * self.batch_size])
+            block = self.rows[index]
+            return block[:, :NUM_FEATURES], block[:, NUM_FEATURES]
+
+        def on_epoch_end(self):
+            if self.shuffle:
+                np.random.default_rng().shuffle(self.order)
+
+    model = build_model(tf, config["units"], config["dropout"], config["learning_rate"])
+    train_batches = Batches(train, config["batch_size"], shuffle=True)
+    val_batches = Batches(val, 4096, shuffle=False)
+    for epoch in range(1, max_epochs + 1):
+        model.fit(train_batches, initial_epoch=epoch - 1, epochs=epoch, verbose=0)
+        _, val_mae = model.evaluate(val_batches, verbose=0)
+        if not report(epoch, float(val_mae)):
+            break
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search")
+    parser.add_argument("--records", type=Path, help="prepared records directory")
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--trials", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=2, help="per trial")
+    parser.add_argument("--workers", type=int, help="default: cores // threads")
+    parser.add_argument("--min-epochs", type=int, default=3)
+    parser.add_argument("--max-epochs", type=int, default=81)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR)
+    args = parser.parse_args(argv)
+
+    workers = args.workers or max(1, (os.cpu_count() or 1) // args.threads)
+    records = args.records or args.output / "records"
+    if not (records / "meta.json").exists():
+        if not args.data.exists():
+            logger.error(f"{args.data} not found (pass --records or --data)")
+            sys.exit(1)
+        prepare_records([args.data], records, os.cpu_count() or 1)
+    data_dir = consolidate(records, args.output / "shared")
+
+    rng = np.random.default_rng(args.seed)
+    configs = [sample_config(rng) for _ in range(args.trials)]
+    logger.info(
+        f"{args.trials} trials on {workers} workers x {args.threads} threads, "
+        f"rungs at {rung_epochs(args.min_epochs, args.max_epochs, args.eta)} epochs"
+    )
+    started = time.perf_counter()
+    results = search(
+        partial(tf_objective, data_dir=str(data_dir)),
+        configs,
+        workers,
+        args.threads,
+        (args.min_epochs, args.max_epochs, args.eta),
+        args.output / "leaderboard.json",
+    )
+    wall = time.perf_counter() - started
+    sequential = sum(r["seconds"] for r in results)
+    best = results[0]
+    print(
+        f"\nBest val MAE {best['val_mae']:.3f}: {json.dumps(best['config'])}\n"
+        f"{wall:.0f}s wall vs {sequential:.0f}s of trial time "
+        f"({sequential / wall:.1f}x); "
+        f"{sum(r['completed'] for r in results)}/{len(results)} ran to completion"
+    )
+
+
+if __name__ == "__main__":
+    main()
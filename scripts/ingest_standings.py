@@ -0,0 +1,118 @@
+"""
+Contest Standings Ingestion
+===========================
+Pages through a contest's global ranking concurrently and stores it as
+memory-mapped columns (see ``app/services/standings.py``), so predictions
+can use the real participant count without calling LeetCode.
+
+Usage:
+    python scripts/ingest_standings.py weekly-contest-490
+    python scripts/ingest_standings.py weekly-contest-490 biweekly-contest-160 \\
+        --workers 16 --store data/contests
+
+Set ``LEETCODE_RANKING_URL`` to point at ``scripts/fake_leetcode.py`` for
+offline runs.
+"""
+
+import argparse
+import logging
+import math
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import CONTEST_NAME_RE, CONTEST_STORE_DIR  # noqa: E402
+from app.services.standings import write_standings  # noqa: E402
+from scripts.crawl_plan import fetch_ranking_page, make_session  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 25
+MAX_ATTEMPTS = 3
+
+
+def _rows(page_data):
+    return [
+        {
+            "username": r["username"],
+            "rank": int(r["rank"]),
+            "score": int(r.get("score") or 0),
+            "finish_time": int(r.get("finish_time") or 0),
+        }
+        for r in (page_data or {}).get("total_rank") or []
+        if r.get("username")
+    ]
+
+
+def fetch_standings(session, contest_slug: str, workers: int = 10):
+    """Fetch every ranking page of a contest; returns (rows, missing_pages)."""
+    first = fetch_ranking_page(session, contest_slug, 1)
+    if not first or not first.get("user_num"):
+        raise ValueError(f"No ranking available for {contest_slug}")
+    num_pages = math.ceil(first["user_num"] / PAGE_SIZE)
+    pages = {1: _rows(first)}
+
+    pending = list(range(2, num_pages + 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for attempt in range(MAX_ATTEMPTS):
+            if not pending:
+                break
+            if attempt:
+                logger.info(f"Retrying {len(pending)} pages of {contest_slug}")
+            results = executor.map(
+                lambda page: fetch_ranking_page(session, contest_slug, page), pending
+            )
+            failed = []
+            for page, data in zip(pending, results, strict=True):
+                if data is None:
+                    failed.append(page)
+                else:
+                    pages[page] = _rows(data)
+            pending = failed
+
+    rows = [row for page in sorted(pages) for row in pages[page]]
+    return rows, pending
+
+
+def ingest(session, contest_slug: str, store: Path, workers: int = 10):
+    if not CONTEST_NAME_RE.match(contest_slug):
+        raise ValueError(f"Invalid contest name '{contest_slug}'")
+    rows, missing = fetch_standings(session, contest_slug, workers)
+    if missing:
+        raise ValueError(
+            f"{contest_slug}: {len(missing)} pages failed after "
+            f"{MAX_ATTEMPTS} attempts, not storing a partial ranking"
+        )
+    standings = write_standings(store, contest_slug, rows)
+    logger.info(f"Stored {standings.participants} rows for {contest_slug}")
+    return standings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest contest standings")
+    parser.add_argument("contests", nargs="+", help="contest slugs")
+    parser.add_argument("--store", type=Path, default=Path(CONTEST_STORE_DIR))
+    parser.add_argument("--workers", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    session = make_session()
+    failed = 0
+    for slug in args.contests:
+        try:
+            ingest(session, slug, args.store, args.workers)
+        except (OSError, ValueError) as e:
+            logger.error(str(e))
+            failed += 1
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+"""
+API Load Test
+=============
+Drives ``/api/predict``, ``/api/contestData`` and ``/api/health`` with a
+configurable request mix and reports throughput, latency percentiles and
+error rates as JSON.
+
+Usage:
+    # Fully offline: spawns scripts/fake_leetcode.py and uvicorn main:app
+    python scripts/loadtest.py --spawn --mix hit --mode closed --concurrency 32
+
+    # Against an already running server, fixed arrival rate
+    python scripts/loadtest.py --url http://127.0.0.1:8000 --mode open --rate 200
+
+Mixes:
+    hit     a small pool of users, one contest each (mostly cache hits)
+    cold    a fresh username on every request (always misses the cache)
+    whatif  pooled users predicting 3-8 consecutive contests each
+
+Open-loop latency is measured from each request's scheduled send time, so a
+saturated server shows up as latency instead of silently lowering the rate.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+LATEST_CONTEST = 490
+
+
+# ---------------------------------------------------------------------------
+# Request mixes
+# ---------------------------------------------------------------------------
+
+
+class RequestMix:
+    """Generates ``(endpoint, method, path, body)`` tuples for one mix."""
+
+    def __init__(self, name: str, weights: dict, users: int = 50, seed: int = 0):
+        if name not in ("hit", "cold", "whatif"):
+            raise ValueError(f"Unknown mix '{name}'")
+        self.name = name
+        self.rng = random.Random(seed)  # noqa: S311 - load shape, not crypto
+        self.pool = [f"load-user-{seed}-{i}" for i in range(users)]
+        self._cold = 0
+        self._endpoints = list(weights)
+        self._weights = [weights[e] for e in self._endpoints]
+
+    def _username(self) -> str:
+        if self.name == "cold":
+            self._cold += 1
+            return f"load-cold-{os.getpid()}-{time.time_ns()}-{self._cold}"
+        return self.rng.choice(self.pool)
+
+    def _contests(self):
+        count = self.rng.randint(3, 8) if self.name == "whatif" else 1
+        first = LATEST_CONTEST - self.rng.randint(0, 20)
+        return [
+            {"name": f"weekly-contest-{first + i}", "rank": self.rng.randint(1, 30000)}
+            for i in range(count)
+        ]
+
+    def next(self):
+        endpoint = self.rng.choices(self._endpoints, self._weights)[0]
+        if endpoint == "predict":
+            body = {"username": self._username(), "contests": self._contests()}
+            return endpoint, "POST", "/api/predict", body
+        if endpoint == "contest":
+            return endpoint, "GET", "/api/contestData", None
+        return endpoint, "GET", "/api/health", None
+
+
+def parse_weights(spec: str) -> dict:
+    """Parse ``"predict=8,contest=1,health=1"`` into a weight dict."""
+    weights = {}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name not in ("predict", "contest", "health"):
+            raise ValueError(f"Unknown endpoint '{name}' in weights")
+        weights[name] = float(value)
+    if not any(w > 0 for w in weights.values()):
+        raise ValueError("At least one endpoint weight must be positive")
+    return weights
+
+
+# ---------------------------------------------------------------------------
+# Recording results
+# ---------------------------------------------------------------------------
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = {}  # endpoint -> list of (latency_s, status)
+
+    def add(self, endpoint: str, latency: float, status: int):
+        self.samples.setdefault(endpoint, []).append((latency, status))
+
+
+def summarize(samples, duration: float) -> dict:
+    """Throughput, error rate and latency percentiles (ms) for samples."""
+    if not samples:
+        return {"requests": 0, "throughput_rps": 0.0, "error_rate": 0.0}
+    latencies = np.array([s[0] for s in samples]) * 1000
+    statuses = {}
+    for _, status in samples:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    errors = sum(1 for _, status in samples if not 200 <= status < 300)
+    summary = {
+        "requests": len(samples),
+        "throughput_rps": round(len(samples) / duration, 2),
+        "error_rate": round(errors / len(samples), 5),
+        "status_codes": statuses,
+        "latency_ms": {
+            name: round(float(np.percentile(latencies, q)), 3)
+            for name, q in PERCENTILES.items()
+        },
+    }
+    summary["latency_ms"]["mean"] = round(float(latencies.mean()), 3)
+    summary["latency_ms"]["max"] = round(float(latencies.max()), 3)
+    return summary
+
+
+def build_report(recorder: Recorder, duration: float, args) -> dict:
+    everything = [s for samples in recorder.samples.values() for s in samples]
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "config": {
+            "mode": args.mode,
+            "mix": args.mix,
+            "weights": args.weights,
+            "rate": args.rate if args.mode == "open" else None,
+            "concurrency": args.concurrency if args.mode == "closed" else None,
+            "duration_s": args.duration,
+        },
+        "duration_s": round(duration, 3),
+        "overall": summarize(everything, duration),
+        "endpoints": {
+            name: summarize(samples, duration)
+            for name, samples in sorted(recorder.samples.items())
+        },
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+        )
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+
+async def _send(client, recorder, request, started: float):
+    endpoint, method, path, body = request
+    try:
+        response = await client.request(method, path, json=body)
+        status = response.status_code
+    except httpx.HTTPError:
+        status = 599  # transport error / client-side timeout
+    recorder.add(endpoint, time.perf_counter() - started, status)
+
+
+async def run_closed(client, mix, recorder, concurrency: int, duration: float):
+    """``concurrency`` workers, each sending its next request on completion."""
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await _send(client, recorder, mix.next(), time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+
+async def run_open(client, mix, recorder, rate: float, duration: float, poisson):
+    """Send at a fixed (or Poisson) arrival rate regardless of completions."""
+    rng = random.Random(0)  # noqa: S311 - arrival jitter only
+    start = time.perf_counter()
+    scheduled = start
+    tasks = set()
+    while scheduled < start + duration:
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(_send(client, recorder, mix.next(), scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+        scheduled += rng.expovariate(rate) if poisson else 1.0 / rate
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def run_load(args, transport=None) -> dict:
+    mix = RequestMix(args.mix, parse_weights(args.weights), args.users, args.seed)
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    async with httpx.AsyncClient(
+        base_url=args.url, timeout=args.timeout, limits=limits, transport=transport
+    ) as client:
+        if args.warmup > 0:
+            await run_closed(client, mix, Recorder(), args.concurrency, args.warmup)
+
+        recorder = Recorder()
+        started = time.perf_counter()
+        if args.mode == "open":
+            await run_open(
+                client, mix, recorder, args.rate, args.duration, args.poisson
+            )
+        else:
+            await run_closed(client, mix, recorder, args.concurrency, args.duration)
+        return build_report(recorder, time.perf_counter() - started, args)
+
+
+# ---------------------------------------------------------------------------
+# Offline stack
+# ---------------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} did not become ready within {timeout:.0f}s")
+
+
+def spawn_stack(args):
+    """Start the fake LeetCode server and the API; returns (processes, api_url)."""
+    fake_port, api_port = _free_port(), _free_port()
+    fake = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            str(ROOT / "scripts" / "fake_leetcode.py"),
+            "--port",
+            str(fake_port),
+            "--latency",
+            args.upstream_latency,
+        ]
+    )
+    env = dict(os.environ)
+    env["LEETCODE_GRAPHQL_URL"] = f"http://127.0.0.1:{fake_port}/graphql"
+    api = subprocess.Popen(  # noqa: S603
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "main:app",
+            "--port",
+            str(api_port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env=env,
+    )
+    processes = [fake, api]
+    try:
+        _wait_ready(f"http://127.0.0.1:{fake_port}/stats")
+        _wait_ready(f"http://127.0.0.1:{api_port}/api/health")
+    except RuntimeError:
+        stop_stack(processes)
+        raise
+    return processes, f"http://127.0.0.1:{api_port}"
+
+
+def stop_stack(processes):
+    for proc in processes:
+        proc.terminate()
+    for proc in processes:
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the prediction API")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument(
+        "--spawn", action="store_true", help="start fake LeetCode + API locally"
+    )
+    parser.add_argument("--upstream-latency", default="lognormal:80,0.5")
+    parser.add_argument("--mode", choices=["open", "closed"], default="closed")
+    parser.add_argument("--rate", type=float, default=50.0, help="open-loop req/s")
+    parser.add_argument("--poisson", action="store_true", help="Poisson arrivals")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--mix", choices=["hit", "cold", "whatif"], default="hit")
+    parser.add_argument("--weights", default="predict=8,contest=1,health=1")
+    parser.add_argument("--users", type=int, default=50, help="user pool size")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the JSON report here")
+    args = parser.parse_args(argv)
+    if args.rate <= 0 or args.concurrency <= 0 or args.duration <= 0:
+        parser.error("--rate, --concurrency and --duration must be positive")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    processes = []
+    if args.spawn:
+        processes, args.url = spawn_stack(args)
+    try:
+        report = asyncio.run(run_load(args))
+    finally:
+        stop_stack(processes)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Prediction Lookup Table Precompute
+==================================
+Evaluates the model over a dense (rating, rank, solve rate, attended) grid
+for a contest whose participant count is known, measures the table against
+the real model, and stores it where the API picks it up (``LOOKUP_DIR``).
+
+Usage:
+    python scripts/precompute_tables.py weekly-contest-490
+    python scripts/precompute_tables.py weekly-contest-490 --participants 29841
+    python scripts/precompute_tables.py weekly-contest-490 --samples 20000
+
+The participant count comes from the ingested standings
+(``scripts/ingest_standings.py``) unless ``--participants`` is given.  Error
+samples are drawn from the training data (``data/data.json``) when present,
+otherwise from synthetic users.
+
+Tables record the model version they were built from (the manifest version
+for ``MODEL_PATH``, ``<version>`` for ``models/history/model_<version>.keras``,
+or ``--version``) and the runtime that evaluated it (``--runtime``, default
+``MODEL_RUNTIME``, loaded the way the API loads it); the API only serves
+tables of its active version and runtime.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import (  # noqa: E402
+    LOOKUP_DIR,
+    MANIFEST_PATH,
+    MODEL_PATH,
+    MODEL_RUNTIME,
+    MODEL_VARIANTS_DIR,
+    SCALER_PATH,
+    TREE_MODEL_PATH,
+)
+from app.registry import CURRENT, manifest_version  # noqa: E402
+from app.services.leetcode import compute_history_features  # noqa: E402
+from app.services.lookup import (  # noqa: E402
+    build_lookup_table,
+    measure_error,
+    table_path,
+)
+from app.services.standings import get_contest_standings  # noqa: E402
+from scripts.fake_leetcode import synthesize_history  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DATA_PATH = ROOT / "data" / "data.json"
+
+
+def users_from_records(records):
+    """Map training records (f1..f15) to ``fetch_user_data``-shaped dicts."""
+    return [
+        {
+            "rating": r["f1"],
+            "attendedContestsCount": r["f5"],
+            "avgSolveRate": r["f6"],
+            "avgFinishTime": r["f7"],
+            "recentSolveRate": r["f8"],
+            "recentFinishTime": r["f9"],
+            "ratingTrend": r["f10"],
+            "maxRating": r["f11"],
+        }
+        for r in records
+    ]
+
+
+def synthetic_users(count: int):
+    users = []
+    for i in range(count):
+        history = synthesize_history(f"lookup-sample-{i}")
+        user = compute_history_features(history)
+        user["rating"] = history[-1]["rating"]
+        user["attendedContestsCount"] = sum(1 for h in history if h["attended"])
+        users.append(user)
+    return users
+
+
+def sample_users(count: int, rng, data_path=DATA_PATH):
+    if os.path.exists(data_path):
+        with open(data_path, "r") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if records:
+            picks = rng.choice(len(records), size=min(count, len(records)))
+            return users_from_records([records[i] for i in picks])
+    logger.info("No training data found, measuring on synthetic users")
+    return synthetic_users(count)
+
+
+def sample_ranks(count: int, total: int, rng):
+    """Log-uniform ranks, so top ranks are checked as densely as the tail."""
+    return np.exp(rng.uniform(0, np.log(total), count)).round().astype(int)
+
+
+def model_version_for(model_path) -> str:
+    """The version name the API serves ``model_path`` under."""
+    name = Path(model_path).name
+    if name.startswith("model_") and name.endswith(".keras"):
+        return name[len("model_") : -len(".keras")]
+    return manifest_version(MANIFEST_PATH)
+
+
+def load_model(runtime: str, model_path):
+    """The model the API evaluates ``model_path`` with under ``runtime``."""
+    if runtime in ("keras", "compiled"):
+        import tensorflow as tf
+
+        from app.model_loader import load_keras_model
+
+        # "compiled" runs the same graph; tables evaluate it with Keras
+        return load_keras_model(tf, model_path)
+
+    from app.mlp_runtime import MLPModel, load_variant, read_keras_weights
+
+    if str(model_path) != MODEL_PATH:
+        # Variants and tree models only exist for MODEL_PATH
+        return MLPModel.from_keras_weights(read_keras_weights(model_path))
+    if runtime == "tree":
+        from app.tree_runtime import load_tree_model
+
+        return load_tree_model(TREE_MODEL_PATH)
+    return load_variant(os.path.join(MODEL_VARIANTS_DIR, runtime))
+
+
+def precompute(
+    contest, total, model, scaler, samples, output_dir, seed=0, version=CURRENT
+):
+    rng = np.random.default_rng(seed)
+    table = build_lookup_table(model, scaler, total, contest)
+    table.meta["model_version"] = version
+    users = sample_users(samples, rng)
+    error = measure_error(
+        table, model, scaler, users, sample_ranks(len(users), total, rng)
+    )
+    table.meta.update(error)
+    path = table_path(contest, str(output_dir))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.npz"
+    table.save(tmp)
+    os.replace(tmp, path)
+    logger.info(
+        f"{contest}: {table.values.size} grid points "
+        f"({table.values.nbytes / 1024:.0f} KiB), error over "
+        f"{error['samples']} samples: max {error['max_abs_error']:.2f}, "
+        f"p99 {error['p99_abs_error']:.2f}, mean {error['mean_abs_error']:.3f}"
+    )
+    return table
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute prediction tables")
+    parser.add_argument("contests", nargs="+", help="contest slugs")
+    parser.add_argument("--participants", type=int, help="override the count")
+    parser.add_argument("--samples", type=int, default=5000)
+    parser.add_argument("--output", type=Path, default=Path(LOOKUP_DIR))
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument(
+        "--version", help="model version to record (default: from --model)"
+    )
+    parser.add_argument(
+        "--runtime", default=MODEL_RUNTIME, help="runtime the API serves with"
+    )
+    args = parser.parse_args(argv)
+    version = args.version or model_version_for(args.model)
+
+    import joblib
+
+    model = load_model(args.runtime, args.model)
+    scaler = joblib.load(args.scaler)
+
+    for contest in args.contests:
+        total = args.participants
+        if total is None:
+            standings = get_contest_standings(contest)
+            if standings is None:
+                logger.error(f"{contest}: not ingested, pass --participants")
+                sys.exit(1)
+            total = standings.participants
+        precompute(
+            contest, total, model, scaler, args.samples, args.output, version=version
+        )
+
+
+if __name__ == "__main__":
+    main()
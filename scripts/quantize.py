@@ -0,0 +1,185 @@
+"""
+Reduced-Precision Model Export
+==============================
+Exports ``model.keras`` as float32, float16 and int8 NumPy-runtime variants
+(see ``app/mlp_runtime.py``) and reports, per variant, the error against the
+float model on a held-out slice of ``data/data.json``, latency at several
+batch sizes and memory.  The cheapest variant within the error budget is
+recommended.
+
+Usage:
+    python scripts/quantize.py
+    python scripts/quantize.py --budget 0.25 --holdout 0.1
+    python scripts/quantize.py --report models/variants/report.json
+
+Serve a variant with ``MODEL_RUNTIME=int8`` (or ``float16``/``float32``);
+TensorFlow is then not needed at runtime.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import MODEL_PATH, MODEL_VARIANTS_DIR, SCALER_PATH  # noqa: E402
+from app.mlp_runtime import (  # noqa: E402
+    VARIANTS,
+    export_variant,
+    load_variant,
+    read_keras_weights,
+)
+from app.services.prediction import build_features  # noqa: E402
+from scripts.precompute_tables import sample_ranks, synthetic_users  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DATA_PATH = ROOT / "data" / "data.json"
+FEATURES = [f"f{i}" for i in range(1, 16)]
+LATENCY_BATCHES = (1, 256, 4096)
+
+
+def load_holdout(path, fraction: float):
+    """Return ``(features, y)`` for the last ``fraction`` of the records.
+
+    Falls back to synthetic feature rows (and ``y=None``) without data.
+    """
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if records:
+            held = records[int(len(records) * (1 - fraction)) :] or records
+            features = np.array(
+                [[r[k] for k in FEATURES] for r in held], dtype=np.float64
+            )
+            y = np.array([r["output"] for r in held], dtype=np.float64)
+            return features, y
+    logger.warning(f"{path} not found, measuring on synthetic feature rows")
+    rng = np.random.default_rng(0)
+    users = synthetic_users(5000)
+    ranks = sample_ranks(len(users), 30000, rng)
+    features = np.array(
+        [
+            build_features(u, u["rating"], u["attendedContestsCount"], k, 30000)[0]
+            for u, k in zip(users, ranks, strict=True)
+        ]
+    )
+    return features, None
+
+
+def latency_us(model, features, batch: int) -> float:
+    rows = (
+        features[:batch]
+        if len(features) >= batch
+        else np.resize(features, (batch, features.shape[1]))
+    )
+    timer = timeit.Timer(lambda: model.predict(rows))
+    number, elapsed = timer.autorange()
+    return min(timer.repeat(repeat=5, number=number)) / number * 1e6
+
+
+def _peak_bytes(model, features) -> int:
+    tracemalloc.start()
+    model.predict(features[:4096])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def evaluate(variant_dirs, features, y):
+    """Measure every exported variant against the float32 variant."""
+    reference = load_variant(variant_dirs["float32"]).predict(features)[:, 0]
+    report = {}
+    for variant, path in variant_dirs.items():
+        model = load_variant(path)
+        pred = model.predict(features)[:, 0]
+        diff = np.abs(pred - reference)
+        entry = {
+            "mae_vs_float": float(diff.mean()),
+            "max_abs_diff": float(diff.max()),
+            "weight_bytes": model.nbytes,
+            "artifact_bytes": sum(p.stat().st_size for p in Path(path).iterdir()),
+            "peak_batch_bytes": _peak_bytes(model, features),
+            "latency_us": {
+                str(b): round(latency_us(model, features, b), 2)
+                for b in LATENCY_BATCHES
+            },
+        }
+        if y is not None:
+            entry["mae_vs_labels"] = float(np.abs(pred - y).mean())
+        report[variant] = entry
+    return report
+
+
+def recommend(report, budget: float):
+    """Smallest weights (then fastest batch) with ``mae_vs_float <= budget``."""
+    eligible = [v for v, r in report.items() if r["mae_vs_float"] <= budget]
+    return min(
+        eligible,
+        key=lambda v: (report[v]["weight_bytes"], report[v]["latency_us"]["4096"]),
+    )
+
+
+def _print_table(report, choice):
+    print(
+        f"\n{'variant':<9} {'mae/float':>10} {'max diff':>9} {'weights':>9} "
+        f"{'b=1 us':>8} {'b=256 us':>9} {'b=4096 us':>10}"
+    )
+    for variant, r in report.items():
+        lat = r["latency_us"]
+        marker = "  <- recommended" if variant == choice else ""
+        print(
+            f"{variant:<9} {r['mae_vs_float']:>10.4f} {r['max_abs_diff']:>9.3f} "
+            f"{r['weight_bytes']:>9} {lat['1']:>8.1f} {lat['256']:>9.1f} "
+            f"{lat['4096']:>10.1f}{marker}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export reduced-precision models")
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--output", type=Path, default=Path(MODEL_VARIANTS_DIR))
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--holdout", type=float, default=0.1, help="tail fraction")
+    parser.add_argument(
+        "--budget", type=float, default=0.5, help="max MAE vs float (rating points)"
+    )
+    parser.add_argument("--report", type=Path, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    layers = read_keras_weights(args.model)
+    variant_dirs = {v: export_variant(layers, v, args.output / v) for v in VARIANTS}
+    logger.info(f"Exported {', '.join(VARIANTS)} to {args.output}")
+
+    features, y = load_holdout(args.data, args.holdout)
+    scaler = joblib.load(args.scaler)
+    report = evaluate(variant_dirs, scaler.transform(features), y)
+    choice = recommend(report, args.budget)
+    _print_table(report, choice)
+    print(f"\n{len(features)} rows; budget {args.budget} -> use MODEL_RUNTIME={choice}")
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        summary = {"rows": len(features), "budget": args.budget, "recommended": choice}
+        args.report.write_text(
+            json.dumps({**summary, "variants": report}, indent=2) + "\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
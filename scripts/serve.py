@@ -0,0 +1,236 @@
+"""
+Preload-and-Fork Server
+=======================
+Runs the API in several worker processes that share one copy of the model.
+
+The parent imports ``main``, loads the model and scaler once, freezes the
+garbage collector's view of those objects (so collections in the workers do
+not write to, and un-share, their pages) and binds the listening socket.
+It then forks ``--workers`` processes that each run uvicorn on the inherited
+socket.  Forked workers share the parent's pages copy-on-write; with the
+NumPy runtimes (``MODEL_RUNTIME=float32|float16|int8``) the weights are
+read-only memory-mapped ``.npy`` files and stay shared for good.
+
+TensorFlow cannot be used across ``fork()``, so with ``MODEL_RUNTIME=keras``
+or ``compiled`` nothing is preloaded and every worker loads its own model,
+as with ``uvicorn --workers``.  Without ``--workers``/``WEB_CONCURRENCY``
+those runtimes therefore get one worker, and the NumPy runtimes two.
+
+The model admin endpoints (``/api/admin/*``) change only the worker that
+handles the call; with several workers the others keep their model.
+
+The parent restarts workers that exit and logs every worker's RSS, PSS
+(RSS with shared pages split between the processes sharing them) and
+private memory at startup and every ``--report-interval`` seconds.
+
+Usage:
+    python scripts/serve.py
+    python scripts/serve.py --workers 4
+    WEB_CONCURRENCY=4 MODEL_RUNTIME=float32 python scripts/serve.py
+"""
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import ADMIN_TOKEN, API_HOST, API_PORT, MODEL_RUNTIME  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+FORK_UNSAFE_RUNTIMES = {"keras", "compiled"}
+# Minimum seconds between restarts of a crashing worker
+RESTART_BACKOFF = 1.0
+
+
+def memory_usage(pid: int):
+    """``{"rss", "pss", "shared", "private"}`` in bytes, or None off Linux."""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) * 1024
+    except OSError:
+        return None
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "shared": fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def report_memory(pids):
+    usage = {pid: memory_usage(pid) for pid in pids}
+    usage = {pid: u for pid, u in usage.items() if u is not None}
+    if not usage:
+        return None
+    mib = 1 << 20
+    for pid, u in sorted(usage.items()):
+        logger.info(
+            f"worker {pid}: rss {u['rss'] / mib:.1f} MiB, "
+            f"pss {u['pss'] / mib:.1f} MiB, shared {u['shared'] / mib:.1f} MiB, "
+            f"private {u['private'] / mib:.1f} MiB"
+        )
+    rss = sum(u["rss"] for u in usage.values())
+    pss = sum(u["pss"] for u in usage.values())
+    logger.info(
+        f"{len(usage)} workers: {pss / mib:.1f} MiB actually resident (PSS) "
+        f"vs {rss / mib:.1f} MiB summed RSS"
+    )
+    return usage
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(app, sock: socket.socket, log_level: str):
+    import uvicorn
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    server = uvicorn.Server(config)
+    asyncio.run(server.serve(sockets=[sock]))
+
+
+class Supervisor:
+    def __init__(self, app, sock, workers: int, log_level: str):
+        self.app = app
+        self.sock = sock
+        self.workers = workers
+        self.log_level = log_level
+        self.children = {}
+        self.stopping = False
+
+    def spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.app, self.sock, self.log_level)
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info(f"Started worker {pid}")
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited workers; restart them unless shutting down."""
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self.children.clear()
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if self.stopping or started is None:
+                continue
+            logger.warning(f"Worker {pid} exited ({status}), restarting")
+            time.sleep(max(0.0, RESTART_BACKOFF - (time.monotonic() - started)))
+            self.spawn()
+
+    def run(self, report_interval: float):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+        next_report = time.monotonic() + min(report_interval or 10, 10)
+        while self.children:
+            time.sleep(0.5)
+            self.reap()
+            if report_interval and time.monotonic() >= next_report:
+                report_memory(list(self.children))
+                next_report = time.monotonic() + report_interval
+        logger.info("All workers stopped")
+
+
+def default_workers(runtime: str = MODEL_RUNTIME) -> int:
+    """``WEB_CONCURRENCY``, else 1 for TensorFlow runtimes and 2 for NumPy ones.
+
+    A second TensorFlow worker would load a second copy of the model; a
+    second NumPy worker shares the first one's.
+    """
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    return 1 if runtime in FORK_UNSAFE_RUNTIMES else 2
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Preload-and-fork API server")
+    parser.add_argument("--host", default=API_HOST)
+    parser.add_argument("--port", type=int, default=API_PORT)
+    parser.add_argument("--workers", type=int, default=default_workers())
+    parser.add_argument(
+        "--report-interval", type=float, default=300, help="seconds, 0 disables"
+    )
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+
+    import main as api
+
+    if not hasattr(os, "fork"):
+        import uvicorn
+
+        logger.warning("fork() unavailable, serving from a single process")
+        uvicorn.run(api.app, host=args.host, port=args.port)
+        return
+
+    if MODEL_RUNTIME in FORK_UNSAFE_RUNTIMES:
+        logger.warning(
+            f"MODEL_RUNTIME={MODEL_RUNTIME} uses TensorFlow, which cannot be "
+            "shared across fork(); each worker loads its own model. Use a "
+            "NumPy runtime (scripts/quantize.py) to share one copy."
+        )
+    else:
+        api.load_artifacts()
+        logger.info(f"Preloaded {MODEL_RUNTIME} model and scaler")
+    gc.collect()
+    gc.freeze()
+
+    if ADMIN_TOKEN and args.workers > 1:
+        logger.warning(
+            "Model admin calls only change the worker that handles them; "
+            f"with {args.workers} workers, reload or canary a model by "
+            "restarting instead"
+        )
+    sock = bind_socket(args.host, args.port)
+    logger.info(f"Listening on {args.host}:{args.port} with {args.workers} workers")
+    Supervisor(api.app, sock, args.workers, args.log_level).run(args.report_interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,333 @@
+"""
+Model Training
+==============
+Scripted, out-of-core version of ``notebooks/LC_Contest_Rating_Predictor.ipynb``.
+
+1. **Prepare** -- the JSON-lines inputs (``data/data.json`` or crawl shards)
+   are cut into byte ranges and parsed in parallel worker processes into
+   fixed-size float32 records (15 features + target), one file per range and
+   split.  The same pass collects the per-feature min/max, which is all a
+   ``MinMaxScaler`` needs, so the scaler is fitted without a second read.
+   Each record's split (train/val/test) is a hash of its line, so it does not
+   depend on how the input was chunked.
+2. **Train** -- a ``tf.data`` pipeline reads the record files in parallel,
+   scales in-graph, shuffles through a bounded buffer, batches and prefetches,
+   so memory use is independent of the dataset size.  The architecture and
+   optimizer match the notebook.  ``BackupAndRestore`` checkpoints every
+   epoch; rerunning with ``--resume <run dir>`` continues where it stopped.
+3. **Save** -- ``model_<version>.keras``, ``scaler_<version>.save`` and
+   ``metrics_<version>.json`` under ``models/history/`` (as the notebook
+   does), plus ``model.keras`` and ``scaler.save`` at the project root unless
+   ``--no-install`` is given.
+
+Usage:
+    python scripts/train.py
+    python scripts/train.py data/data.shard-*-of-8.json --workers 8
+    python scripts/train.py --resume models/history/run_20260101_120000
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import MODEL_PATH, SCALER_PATH  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DATA_PATH = ROOT / "data" / "data.json"
+HISTORY_DIR = ROOT / "models" / "history"
+NUM_FEATURES = 15
+FEATURES = [f"f{i}" for i in range(1, NUM_FEATURES + 1)]
+RECORD_FLOATS = NUM_FEATURES + 1
+SPLITS = ("train", "val", "test")
+SEED = 42
+# Rows buffered per worker before they are appended to the record file
+WRITE_ROWS = 65536
+# Inputs are cut into ranges of at least this many bytes
+MIN_RANGE_BYTES = 16 << 20
+
+
+# ---------------------------------------------------------------------------
+# Prepare: JSON lines -> float32 records + scaler statistics
+# ---------------------------------------------------------------------------
+def assign_split(line: bytes, test_pct: int, val_pct: int) -> str:
+    bucket = zlib.crc32(line) % 100
+    if bucket < test_pct:
+        return "test"
+    if bucket < test_pct + val_pct:
+        return "val"
+    return "train"
+
+
+def byte_ranges(paths, parts: int):
+    """Cut ``paths`` into about ``parts`` ``(path, start, end)`` ranges.
+
+    Boundaries are nominal; :func:`convert_range` moves them to line starts.
+    """
+    sizes = {str(p): os.path.getsize(p) for p in paths}
+    target = max(MIN_RANGE_BYTES, sum(sizes.values()) // max(1, parts))
+    ranges = []
+    for path, size in sizes.items():
+        for start in range(0, max(size, 1), target):
+            ranges.append((path, start, min(size, start + target)))
+    return ranges
+
+
+def _iter_lines(path, start: int, end: int):
+    """Yield the lines that *start* inside ``[start, end)``."""
+    with open(path, "rb") as f:
+        if start:
+            f.seek(start - 1)
+            f.readline()  # finish the line that straddles ``start``
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            yield line
+
+
+def convert_range(task):
+    """Parse one byte range into per-split record files; return its stats."""
+    (path, start, end), out_dir, index, test_pct, val_pct = task
+    buffers = {split: [] for split in SPLITS}
+    counts = dict.fromkeys(SPLITS, 0)
+    low = np.full(NUM_FEATURES, np.inf)
+    high = np.full(NUM_FEATURES, -np.inf)
+    files = {
+        split: open(Path(out_dir) / split / f"{index:05d}.f32", "wb")
+        for split in SPLITS
+    }
+
+    def flush(split):
+        rows = np.asarray(buffers[split], dtype=np.float64)
+        np.minimum(low, rows[:, :NUM_FEATURES].min(axis=0), out=low)
+        np.maximum(high, rows[:, :NUM_FEATURES].max(axis=0), out=high)
+        rows.astype(np.float32).tofile(files[split])
+        counts[split] += len(rows)
+        buffers[split] = []
+
+    try:
+        for line in _iter_lines(path, start, end):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            split = assign_split(line.rstrip(b"\r\n"), test_pct, val_pct)
+            buffers[split].append([record[k] for k in FEATURES] + [record["output"]])
+            if len(buffers[split]) >= WRITE_ROWS:
+                flush(split)
+        for split in SPLITS:
+            if buffers[split]:
+                flush(split)
+    finally:
+        for f in files.values():
+            f.close()
+    return {"counts": counts, "min": low.tolist(), "max": high.tolist()}
+
+
+def prepare_records(paths, out_dir, workers: int, test_pct=10, val_pct=10):
+    """Convert ``paths`` into ``out_dir/{train,val,test}/*.f32``.
+
+    Returns (and stores as ``meta.json``) the record counts and the
+    per-feature min/max across every split.
+    """
+    out_dir = Path(out_dir)
+    for split in SPLITS:
+        (out_dir / split).mkdir(parents=True, exist_ok=True)
+    ranges = byte_ranges(paths, workers * 4)
+    tasks = [(r, str(out_dir), i, test_pct, val_pct) for i, r in enumerate(ranges)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(convert_range, tasks))
+
+    meta = {
+        "inputs": [str(p) for p in paths],
+        "counts": {s: sum(r["counts"][s] for r in results) for s in SPLITS},
+        "min": np.min([r["min"] for r in results], axis=0).tolist(),
+        "max": np.max([r["max"] for r in results], axis=0).tolist(),
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2) + "\n")
+    return meta
+
+
+def scaler_from_stats(meta):
+    """A fitted ``MinMaxScaler`` equal to one fitted on every record."""
+    from sklearn.preprocessing import MinMaxScaler
+
+    return MinMaxScaler().partial_fit(np.array([meta["min"], meta["max"]]))
+
+
+def read_records(path) -> np.ndarray:
+    """Load one record file as an ``(n, 16)`` float32 array (for inspection)."""
+    return np.fromfile(path, dtype=np.float32).reshape(-1, RECORD_FLOATS)
+
+
+# ---------------------------------------------------------------------------
+# Train
+# ---------------------------------------------------------------------------
+def make_dataset(tf, files, scaler, batch_size: int, shuffle: bool):
+    """Parallel, prefetching ``tf.data`` pipeline over record files."""
+    autotune = tf.data.AUTOTUNE
+    scale = tf.constant(scaler.scale_, dtype=tf.float32)
+    offset = tf.constant(scaler.min_, dtype=tf.float32)
+
+    def decode(raw):
+        row = tf.io.decode_raw(raw, tf.float32)
+        row = tf.reshape(row, [-1, RECORD_FLOATS])
+        return row[:, :NUM_FEATURES] * scale + offset, row[:, NUM_FEATURES]
+
+    dataset = tf.data.Dataset.from_tensor_slices(sorted(map(str, files)))
+    if shuffle:
+        dataset = dataset.shuffle(len(files), seed=SEED)
+    dataset = tf.data.FixedLengthRecordDataset(
+        dataset, record_bytes=RECORD_FLOATS * 4, num_parallel_reads=autotune
+    )
+    if shuffle:
+        dataset = dataset.shuffle(64 * batch_size, seed=SEED)
+    return (
+        dataset.batch(batch_size, num_parallel_calls=autotune)
+        .map(decode, num_parallel_calls=autotune)
+        .prefetch(autotune)
+    )
+
+
+DEFAULT_UNITS = (128, 64, 32)
+DEFAULT_DROPOUT = (0.3, 0.2)
+DEFAULT_LEARNING_RATE = 0.0005
+
+
+def build_model(
+    tf,
+    units=DEFAULT_UNITS,
+    dropout=DEFAULT_DROPOUT,
+    learning_rate: float = DEFAULT_LEARNING_RATE,
+):
+    """Dense stack with relu; ``dropout[i]`` follows hidden layer ``i``.
+
+    The defaults are the notebook's architecture:
+    Dense(128)->Dropout(0.3)->Dense(64)->Dropout(0.2)->Dense(32)->Dense(1).
+    """
+    layers = tf.keras.layers
+    stack = [layers.Input(shape=(NUM_FEATURES,))]
+    for i, width in enumerate(units):
+        stack.append(layers.Dense(width, activation="relu"))
+        if i < len(dropout) and dropout[i] > 0:
+            stack.append(layers.Dropout(dropout[i]))
+    stack.append(layers.Dense(1))
+    model = tf.keras.Sequential(stack)
+    model.compile(
+        optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate),
+        loss="mse",
+        metrics=["mae"],
+    )
+    return model
+
+
+def train(tf, run_dir: Path, scaler, epochs: int, batch_size: int, patience: int):
+    records = run_dir / "records"
+    train_ds, val_ds = (
+        make_dataset(
+            tf, list((records / s).glob("*.f32")), scaler, batch_size, s == "train"
+        )
+        for s in ("train", "val")
+    )
+    model = build_model(tf)
+    callbacks = [
+        tf.keras.callbacks.BackupAndRestore(str(run_dir / "backup")),
+        tf.keras.callbacks.ModelCheckpoint(
+            str(run_dir / "best.keras"), monitor="val_loss", save_best_only=True
+        ),
+        tf.keras.callbacks.EarlyStopping(
+            monitor="val_loss", patience=patience, restore_best_weights=True
+        ),
+    ]
+    model.fit(
+        train_ds, validation_data=val_ds, epochs=epochs, callbacks=callbacks, verbose=2
+    )
+    return model
+
+
+def save_artifacts(model, scaler, metrics, version: str, install: bool):
+    import joblib
+
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    model.save(HISTORY_DIR / f"model_{version}.keras")
+    joblib.dump(scaler, HISTORY_DIR / f"scaler_{version}.save")
+    with open(HISTORY_DIR / f"metrics_{version}.json", "w") as f:
+        json.dump(metrics, f, indent=2)
+    logger.info(f"Versioned artifacts: models/history/*_{version}.*")
+    if install:
+        model.save(MODEL_PATH)
+        joblib.dump(scaler, SCALER_PATH)
+        logger.info(f"Installed {MODEL_PATH} and {SCALER_PATH}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the rating model")
+    parser.add_argument("inputs", nargs="*", type=Path, help="JSON-lines files")
+    parser.add_argument("--resume", type=Path, help="run directory to continue")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--epochs", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=128)
+    parser.add_argument("--patience", type=int, default=15)
+    parser.add_argument("--no-install", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        run_dir = args.resume
+        version = run_dir.name.removeprefix("run_")
+    else:
+        version = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = HISTORY_DIR / f"run_{version}"
+    records = run_dir / "records"
+
+    if (records / "meta.json").exists():
+        meta = json.loads((records / "meta.json").read_text())
+        logger.info(f"Reusing prepared records in {records}")
+    else:
+        inputs = args.inputs or [DATA_PATH]
+        missing = [p for p in inputs if not p.exists()]
+        if missing:
+            logger.error(f"Input not found: {', '.join(map(str, missing))}")
+            sys.exit(1)
+        shutil.rmtree(records, ignore_errors=True)
+        meta = prepare_records(inputs, records, args.workers)
+    logger.info(f"Records: {meta['counts']}")
+    scaler = scaler_from_stats(meta)
+
+    import tensorflow as tf
+
+    tf.random.set_seed(SEED)
+    model = train(tf, run_dir, scaler, args.epochs, args.batch_size, args.patience)
+    test_ds = make_dataset(
+        tf, list((records / "test").glob("*.f32")), scaler, 1024, False
+    )
+    test_loss, test_mae = model.evaluate(test_ds, verbose=0)
+    metrics = {
+        "mse": float(test_loss),
+        "rmse": float(np.sqrt(test_loss)),
+        "mae": float(test_mae),
+        "records": sum(meta["counts"].values()),
+        "features": NUM_FEATURES,
+        "params": model.count_params(),
+    }
+    logger.info(f"Test MAE {test_mae:.2f}, RMSE {metrics['rmse']:.2f}")
+    save_artifacts(model, scaler, metrics, version, install=not args.no_install)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Gradient-Boosted-Tree Model Training
+====================================
+Trains a compact gradient-boosted-tree regressor, either distilled from
+``model.keras`` (the default: targets are the network's predictions) or
+directly on the labels in ``data/data.json``, exports it for the NumPy tree
+runtime (``app/tree_runtime.py``) and prints a side-by-side accuracy and
+latency comparison with the network on a held-out tail of the data.
+
+Usage:
+    python scripts/train_tree.py
+    python scripts/train_tree.py --target labels --trees 600 --depth 5
+    python scripts/train_tree.py --max-delta 0.5 --report models/tree_report.json
+
+Serve the result with ``MODEL_RUNTIME=tree``; neither TensorFlow nor the
+network weights are needed at runtime.  The network is evaluated with the
+NumPy float32 runtime (``app/mlp_runtime.py``), so training does not need
+TensorFlow either.  The script exits non-zero when the tree's MAE exceeds
+the network's by more than ``--max-delta`` rating points.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import MODEL_PATH, SCALER_PATH, TREE_MODEL_PATH  # noqa: E402
+from app.mlp_runtime import MLPModel, read_keras_weights  # noqa: E402
+from app.services.prediction import build_features  # noqa: E402
+from app.tree_runtime import export_gbr, load_tree_model  # noqa: E402
+from scripts.precompute_tables import sample_ranks, synthetic_users  # noqa: E402
+from scripts.quantize import FEATURES, latency_us  # noqa: E402
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+logger = logging.getLogger(__name__)
+
+DATA_PATH = ROOT / "data" / "data.json"
+LATENCY_BATCHES = (1, 256, 4096)
+
+
+def load_dataset(path, synthetic: int = 20000, seed: int = 0):
+    """Return ``(features, y)`` from the training data, in file order.
+
+    Falls back to ``synthetic`` generated feature rows (and ``y=None``).
+    """
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        if records:
+            features = np.array(
+                [[r[k] for k in FEATURES] for r in records], dtype=np.float64
+            )
+            return features, np.array([r["output"] for r in records], dtype=float)
+    logger.warning(f"{path} not found, training on synthetic feature rows")
+    rng = np.random.default_rng(seed)
+    users = synthetic_users(synthetic)
+    ranks = sample_ranks(len(users), 30000, rng)
+    features = np.array(
+        [
+            build_features(u, u["rating"], u["attendedContestsCount"], k, 30000)[0]
+            for u, k in zip(users, ranks, strict=True)
+        ]
+    )
+    return features, None
+
+
+def train(features, targets, trees: int, depth: int, learning_rate: float, seed=0):
+    from sklearn.ensemble import GradientBoostingRegressor
+
+    return GradientBoostingRegressor(
+        n_estimators=trees,
+        max_depth=depth,
+        learning_rate=learning_rate,
+        subsample=0.8,
+        random_state=seed,
+    ).fit(features, targets)
+
+
+def compare(models, features, y):
+    """Accuracy against the network (and labels) plus latency, per model."""
+    reference = models["network"].predict(features)[:, 0]
+    report = {}
+    for name, model in models.items():
+        pred = model.predict(features)[:, 0]
+        entry = {
+            "mae_vs_network": float(np.abs(pred - reference).mean()),
+            "max_abs_diff": float(np.abs(pred - reference).max()),
+            "weight_bytes": model.nbytes,
+            "latency_us": {
+                str(b): round(latency_us(model, features, b), 2)
+                for b in LATENCY_BATCHES
+            },
+        }
+        if y is not None:
+            entry["mae_vs_labels"] = float(np.abs(pred - y).mean())
+        report[name] = entry
+    return report
+
+
+def mae_delta(report) -> float:
+    """How much worse the tree is: vs the labels when known, else vs the net."""
+    tree, network = report["tree"], report["network"]
+    if "mae_vs_labels" in tree:
+        return tree["mae_vs_labels"] - network["mae_vs_labels"]
+    return tree["mae_vs_network"]
+
+
+def _print_table(report):
+    print(
+        f"\n{'model':<8} {'mae/net':>8} {'mae/labels':>11} {'weights':>9} "
+        f"{'b=1 us':>8} {'b=256 us':>9} {'b=4096 us':>10}"
+    )
+    for name, r in report.items():
+        lat = r["latency_us"]
+        labels = f"{r['mae_vs_labels']:>11.3f}" if "mae_vs_labels" in r else "-" * 11
+        print(
+            f"{name:<8} {r['mae_vs_network']:>8.3f} {labels} {r['weight_bytes']:>9} "
+            f"{lat['1']:>8.1f} {lat['256']:>9.1f} {lat['4096']:>10.1f}"
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the tree model")
+    parser.add_argument("--target", choices=["model", "labels"], default="model")
+    parser.add_argument("--trees", type=int, default=400)
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--holdout", type=float, default=0.1, help="tail fraction")
+    parser.add_argument(
+        "--max-delta", type=float, default=1.0, help="allowed MAE increase"
+    )
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--scaler", default=SCALER_PATH)
+    parser.add_argument("--data", type=Path, default=DATA_PATH)
+    parser.add_argument("--output", type=Path, default=Path(TREE_MODEL_PATH))
+    parser.add_argument("--report", type=Path, help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    network = MLPModel.from_keras_weights(read_keras_weights(args.model))
+    scaler = joblib.load(args.scaler)
+    features, y = load_dataset(args.data)
+    if y is None and args.target == "labels":
+        logger.error("--target labels needs data/data.json")
+        sys.exit(1)
+
+    scaled = scaler.transform(features)
+    split = int(len(scaled) * (1 - args.holdout))
+    train_x, test_x = scaled[:split], scaled[split:]
+    test_y = y[split:] if y is not None else None
+    targets = network.predict(train_x)[:, 0] if args.target == "model" else y[:split]
+
+    logger.info(f"Fitting {args.trees} trees (depth {args.depth}) on {split} rows")
+    estimator = train(train_x, targets, args.trees, args.depth, args.learning_rate)
+    export_gbr(estimator, args.output)
+    tree = load_tree_model(args.output)
+    logger.info(f"Saved {args.output} ({args.output.stat().st_size / 1024:.0f} KiB)")
+
+    report = compare({"network": network, "tree": tree}, test_x, test_y)
+    _print_table(report)
+    delta = mae_delta(report)
+    ok = delta <= args.max_delta
+    print(
+        f"\n{len(test_x)} held-out rows; MAE delta {delta:+.3f} "
+        f"(limit {args.max_delta}) -> {'OK' if ok else 'over budget'}"
+    )
+
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        summary = {"rows": len(test_x), "target": args.target, "mae_delta": delta}
+        args.report.write_text(json.dumps({**summary, "models": report}, indent=2))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,11 +4,20 @@ LeetCode Training Data Updater
 Fetches contest history with solve rate and finish time for training.
 
 Usage:
-    python scripts/update_data.py
+    python scripts/update_data.py --limit 5000
+    python scripts/update_data.py --shard 2/8 --limit 5000
+
+With ``--shard i/N`` the script crawls only the usernames owned by shard ``i``
+(see ``scripts/crawl_plan.py``) and writes ``data/data.shard-i-of-N.json``.
+``--limit`` applies per shard, so the dataset grows with the number of
+crawlers. Merge the outputs with ``python scripts/crawl_plan.py merge``.
 """
 
+import argparse
 import json
 import logging
+import os
+import sys
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -17,12 +26,26 @@ from pathlib import Path
 import requests
 from tqdm import tqdm
 
+ROOT = Path(__file__).parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from scripts.crawl_plan import (  # noqa: E402
+    USERNAMES_PATH,
+    load_usernames,
+    parse_shard,
+    select_shard,
+    shard_output_path,
+)
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
-LEETCODE_GRAPHQL_URL = "https://leetcode.com/graphql"
+LEETCODE_GRAPHQL_URL = os.environ.get(
+    "LEETCODE_GRAPHQL_URL", "https://leetcode.com/graphql"
+)
 GRAPHQL_QUERY = """
 query userContestRankingInfo($username: String!) {
     userContestRankingHistory(username: $username) {
@@ -141,34 +164,44 @@ def process_user_data(username, session):
     return data
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Fetch LeetCode training data")
+    parser.add_argument(
+        "--shard", default="0/1", help="crawl shard i/N (0-based), default 0/1"
+    )
+    parser.add_argument(
+        "--limit", type=int, default=5000, help="max users per shard (default 5000)"
+    )
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--usernames", type=Path, default=USERNAMES_PATH)
+    parser.add_argument("--output", type=Path, help="defaults to the shard path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     logger.info("=" * 60)
     logger.info("LeetCode Training Data Update")
     logger.info("=" * 60)
 
-    data_dir = Path(__file__).parent.parent / "data"
-    usernames_path = data_dir / "usernames.json"
     try:
-        with open(usernames_path, "r") as f:
-            usernames = json.load(f)
-        logger.info(f"Loaded {len(usernames)} usernames from {usernames_path}")
-    except FileNotFoundError:
-        logger.error(f"{usernames_path} not found!")
-        logger.info("Please ensure data/usernames.json exists")
+        shard_index, num_shards = parse_shard(args.shard)
+    except ValueError as e:
+        logger.error(str(e))
         return
 
-    print(f"\nTotal usernames available: {len(usernames)}")
     try:
-        num_users = input(
-            f"How many users to process? (default: min(5000, {len(usernames)})): "
-        ).strip()
-        num_users = int(num_users) if num_users else min(5000, len(usernames))
-        num_users = max(1, min(num_users, len(usernames)))
-    except (ValueError, EOFError):
-        num_users = min(5000, len(usernames))
+        pool = load_usernames(args.usernames)
+        logger.info(f"Loaded {len(pool)} unique usernames from {args.usernames}")
+    except FileNotFoundError:
+        logger.error(f"{args.usernames} not found!")
+        logger.info("Please ensure data/usernames.json exists")
+        return
 
-    usernames = usernames[:num_users]
-    logger.info(f"\nProcessing {len(usernames)} users...")
+    usernames = select_shard(pool, shard_index, num_shards, max(1, args.limit))
+    logger.info(
+        f"\nProcessing {len(usernames)} users (shard {shard_index}/{num_shards})..."
+    )
 
     session = requests.Session()
     session.headers.update(
@@ -184,7 +217,7 @@ def main():
     successful = 0
     failed = 0
 
-    with ThreadPoolExecutor(max_workers=10) as executor:
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
         future_to_user = {
             executor.submit(process_user_data, username, session): username
             for username in usernames
@@ -212,7 +245,8 @@ def main():
     logger.info(f"Failed/No data: {failed}")
     logger.info(f"Total training records: {len(all_data)}")
 
-    output_file = data_dir / "data.json"
+    output_file = args.output or shard_output_path(shard_index, num_shards)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
     with open(output_file, "w") as f:
         for record in all_data:
             f.write(json.dumps(record) + "\n")
@@ -0,0 +1,146 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.utils.admission import CHEAP_HEADROOM, AdmissionController, OverloadedError
+from app.utils.deadline import DeadlineExceededError, deadline
+
+
+def _controller(max_in_flight=2, max_queue=4, target=0.02, interval=0.05):
+    return AdmissionController(max_in_flight, max_queue, target, interval)
+
+
+async def _hold(controller, release, is_cheap=None, log=None, name=None):
+    async with controller.slot(is_cheap):
+        if log is not None:
+            log.append(name)
+        await release.wait()
+
+
+def test_admits_up_to_capacity_then_queues_in_order():
+    async def run():
+        controller = _controller(max_in_flight=1)
+        first, later = asyncio.Event(), asyncio.Event()
+        log = []
+        holder = asyncio.create_task(_hold(controller, first, log=log, name="a"))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(_hold(controller, later, log=log, name=n)) for n in "bc"
+        ]
+        await asyncio.sleep(0.01)
+        assert log == ["a"] and len(controller.queue) == 2
+        first.set()
+        later.set()
+        await asyncio.gather(holder, *waiters)
+        assert log == ["a", "b", "c"]
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_full_queue_rejects_immediately_with_retry_after():
+    async def run():
+        controller = _controller(max_in_flight=1, max_queue=1)
+        release = asyncio.Event()
+        tasks = [asyncio.create_task(_hold(controller, release)) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as info:
+            async with controller.slot():
+                pass
+        assert info.value.retry_after >= 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(run())
+
+
+def test_standing_queue_sheds_new_and_stale_requests():
+    async def run():
+        controller = _controller(max_in_flight=1, max_queue=100)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, release))
+        await asyncio.sleep(0)
+        queued = [asyncio.create_task(_hold(controller, asyncio.Event()))]
+        await asyncio.sleep(0.03)
+        # The head of the queue is past the target: still queued, for now
+        queued.append(asyncio.create_task(_hold(controller, asyncio.Event())))
+        await asyncio.sleep(0.06)
+        # ...and has stayed there for longer than the interval
+        with pytest.raises(OverloadedError):
+            async with controller.slot():
+                pass
+        assert controller.dropping
+
+        release.set()
+        await holder
+        for task in queued:
+            with pytest.raises(OverloadedError):
+                await task  # waited too long to be worth serving
+        assert controller.in_flight == 0
+        assert not controller.dropping
+
+    asyncio.run(run())
+
+
+def test_cheap_requests_skip_the_queue_up_to_headroom():
+    async def run():
+        controller = _controller(max_in_flight=2, max_queue=0)
+        release = asyncio.Event()
+        tasks = [
+            asyncio.create_task(_hold(controller, release, is_cheap=lambda: True))
+            for _ in range(2 * CHEAP_HEADROOM)
+        ]
+        await asyncio.sleep(0)
+        assert controller.in_flight == 2 * CHEAP_HEADROOM
+        with pytest.raises(OverloadedError):
+            async with controller.slot(lambda: True):
+                pass
+        with pytest.raises(OverloadedError):
+            async with controller.slot(lambda: False):
+                pass
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.in_flight == 0
+
+    asyncio.run(run())
+
+
+def test_deadline_abandons_the_wait_without_leaking_a_slot():
+    async def run():
+        controller = _controller(max_in_flight=1, target=10, interval=10)
+        release = asyncio.Event()
+        holder = asyncio.create_task(_hold(controller, release))
+        await asyncio.sleep(0)
+        with deadline(0.02):
+            with pytest.raises(DeadlineExceededError):
+                async with controller.slot():
+                    pass
+        release.set()
+        await holder
+        assert controller.in_flight == 0
+        async with controller.slot():
+            assert controller.in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_predict_overloaded_returns_503_with_retry_after(monkeypatch):
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    monkeypatch.setattr(app_module, "admission", _controller(0, 0))
+    client = TestClient(app_module.app)
+    r = client.post(
+        "/api/predict",
+        json={
+            "username": "alice",
+            "contests": [{"name": "weekly-contest-400", "rank": 1}],
+        },
+    )
+    assert r.status_code == 503
+    assert int(r.headers["Retry-After"]) >= 1
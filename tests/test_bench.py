@@ -0,0 +1,52 @@
+from app.services.leetcode import compute_history_features
+from scripts.bench import compare, measure
+
+
+def test_compute_history_features():
+    history = [
+        {
+            "attended": True,
+            "problemsSolved": 2,
+            "totalProblems": 4,
+            "finishTimeInSeconds": 3000,
+            "rating": 1500,
+        },
+        {"attended": False, "problemsSolved": 0, "totalProblems": 4},
+        {
+            "attended": True,
+            "problemsSolved": 4,
+            "totalProblems": 4,
+            "finishTimeInSeconds": 1000,
+            "rating": 1540,
+        },
+    ]
+    features = compute_history_features(history)
+    assert features["avgSolveRate"] == 0.75
+    assert features["avgFinishTime"] == 2000
+    assert features["ratingTrend"] == 40
+    assert features["maxRating"] == 1540
+
+
+def test_compute_history_features_defaults():
+    features = compute_history_features([])
+    assert features["avgSolveRate"] == 0.5
+    assert features["recentFinishTime"] == 3000
+    assert features["maxRating"] == 1500
+
+
+def test_measure_reports_per_call_ns():
+    per_call, number = measure(lambda: None, repeats=2, min_time=0.01)
+    assert len(per_call) == 2
+    assert number >= 1
+    assert all(t > 0 for t in per_call)
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"results": {"a": {"median_ns": 100.0}, "b": {"median_ns": 100.0}}}
+    results = {
+        "a": {"median_ns": 105.0},
+        "b": {"median_ns": 150.0},
+        "new": {"median_ns": 1.0},
+    }
+    regressions = compare(results, baseline, threshold=0.10)
+    assert [r[0] for r in regressions] == ["b"]
@@ -22,6 +22,16 @@ def test_ttl_cache_expiry():
     assert c.get("key1") is None
 
 
+def test_ttl_cache_contains():
+    c = TTLCache(ttl_seconds=1)
+    c.set("a", None)
+    c.set("b", 0)
+    assert c.contains("a", "b") and c.contains()
+    assert not c.contains("a", "missing")
+    time.sleep(1.1)
+    assert not c.contains("a")
+
+
 def test_ttl_cache_overwrite():
     c = TTLCache(ttl_seconds=10)
     c.set("key1", "v1")
@@ -0,0 +1,92 @@
+import json
+import time
+
+import httpx
+import pytest
+
+from scripts.crawl_plan import (
+    dedupe,
+    discover_usernames,
+    grow_pool,
+    merge_outputs,
+    parse_pages,
+    parse_shard,
+    select_shard,
+    shard_of,
+)
+
+
+def test_dedupe_is_case_insensitive_and_keeps_order():
+    assert dedupe(["Alice", "bob", "alice", " bob ", "", "carol"]) == [
+        "Alice",
+        "bob",
+        "carol",
+    ]
+
+
+def test_parse_shard():
+    assert parse_shard("0/1") == (0, 1)
+    assert parse_shard("3/8") == (3, 8)
+    for bad in ["8/8", "-1/4", "1/0", "abc", "1/2/3"]:
+        with pytest.raises(ValueError):
+            parse_shard(bad)
+
+
+def test_shards_are_disjoint_and_cover_pool():
+    pool = [f"user{i}" for i in range(500)]
+    shards = [select_shard(pool, i, 4) for i in range(4)]
+    merged = [u for shard in shards for u in shard]
+    assert sorted(merged) == sorted(pool)
+    assert len(set(merged)) == len(pool)
+
+
+def test_shard_assignment_is_stable_and_case_insensitive():
+    assert shard_of("SomeUser", 16) == shard_of("someuser", 16)
+    # Fixed value guards against accidental changes to the hash scheme
+    assert [shard_of(f"user{i}", 4) for i in range(6)] == [0, 3, 0, 2, 1, 2]
+
+
+def test_select_shard_limit():
+    pool = [f"user{i}" for i in range(100)]
+    assert len(select_shard(pool, 0, 1, limit=10)) == 10
+
+
+def test_grow_pool_only_adds_new_names():
+    pool, added = grow_pool(["alice", "bob"], ["BOB", "carol", "carol", "dave"])
+    assert pool == ["alice", "bob", "carol", "dave"]
+    assert added == 2
+
+
+def test_discovery_order_does_not_depend_on_timing():
+    class Session:
+        """Earlier pages answer last."""
+
+        def get(self, url, params, timeout):
+            page = params["pagination"]
+            time.sleep(0.01 * (4 - page))
+            rows = [{"username": f"{url.split('/')[-2]}-{page}"}]
+            return httpx.Response(200, json={"total_rank": rows})
+
+    found = discover_usernames(Session(), ["a", "b"], range(1, 4), workers=6)
+    assert found == ["a-1", "a-2", "a-3", "b-1", "b-2", "b-3"]
+
+
+def test_parse_pages():
+    assert list(parse_pages("3")) == [3]
+    assert list(parse_pages("1-4")) == [1, 2, 3, 4]
+    with pytest.raises(ValueError):
+        parse_pages("0-2")
+
+
+def test_merge_outputs(tmp_path):
+    a = tmp_path / "data.shard-0-of-2.json"
+    b = tmp_path / "data.shard-1-of-2.json"
+    a.write_text(json.dumps({"f1": 1}) + "\n")
+    b.write_text(json.dumps({"f1": 2}) + "\n" + json.dumps({"f1": 3}))
+    dest = tmp_path / "data.json"
+    assert merge_outputs([b, a], dest) == 3
+    assert [json.loads(line)["f1"] for line in dest.read_text().splitlines()] == [
+        1,
+        2,
+        3,
+    ]
@@ -0,0 +1,178 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.services.leetcode import fetch_user_data
+from app.utils.cache import TTLCache
+from app.utils.deadline import (
+    DeadlineExceededError,
+    bounded,
+    budget_seconds,
+    check,
+    deadline,
+    remaining,
+)
+
+USER = {"rating": 1500.0, "attendedContestsCount": 10}
+
+
+def test_budget_is_the_smaller_positive_limit():
+    assert budget_seconds(None, 0) is None
+    assert budget_seconds(None, 15000) == 15
+    assert budget_seconds(500, 15000) == 0.5
+    assert budget_seconds(60000, 15000) == 15
+    assert budget_seconds(500, 0) == 0.5
+    assert budget_seconds(-1, 0) is None
+
+
+def test_nested_deadlines_only_shorten():
+    assert remaining() is None
+    with deadline(1.0):
+        with deadline(60.0):
+            assert remaining() <= 1.0
+        with deadline(0.1):
+            assert remaining() <= 0.1
+    assert remaining() is None
+
+
+def test_bounded_cancels_the_awaited_work():
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def run():
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceededError) as info:
+                await bounded(slow(), "upstream")
+        assert info.value.stage == "upstream"
+        assert cancelled.is_set()
+
+    asyncio.run(run())
+
+
+def test_bounded_without_deadline_waits():
+    async def run():
+        return await bounded(asyncio.sleep(0.01, result=7), "upstream")
+
+    assert asyncio.run(run()) == 7
+
+
+def test_check_raises_once_spent():
+    with deadline(0):
+        with pytest.raises(DeadlineExceededError):
+            check("inference")
+    check("inference")
+
+
+def test_semaphore_wait_is_bounded():
+    class NeverCalled:
+        async def post(self, *args, **kwargs):
+            raise AssertionError("should not reach upstream")
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        await semaphore.acquire()
+        with deadline(0.05):
+            with pytest.raises(DeadlineExceededError) as info:
+                await fetch_user_data(NeverCalled(), semaphore, TTLCache(), "alice")
+        assert info.value.stage == "semaphore_wait"
+        semaphore.release()
+        # The abandoned waiter must not have taken the slot
+        await asyncio.wait_for(semaphore.acquire(), 1)
+
+    asyncio.run(run())
+
+
+def test_slow_upstream_is_cancelled_not_mapped_to_503():
+    class SlowClient:
+        async def post(self, *args, **kwargs):
+            await asyncio.sleep(10)
+            return httpx.Response(200, json={})
+
+    async def run():
+        with deadline(0.05):
+            await fetch_user_data(SlowClient(), asyncio.Semaphore(5), TTLCache(), "a")
+
+    started = time.perf_counter()
+    with pytest.raises(DeadlineExceededError):
+        asyncio.run(run())
+    assert time.perf_counter() - started < 1
+
+
+@pytest.fixture
+def slow_second_contest(monkeypatch):
+    """Serve the user from memory; the second contest's lookup hangs."""
+    import numpy as np
+
+    class DummyModel:
+        input_shape = (None, 7)
+
+        def predict(self, x, verbose=0):
+            return np.array([[10.0]])
+
+    class DummyScaler:
+        def transform(self, x):
+            return x
+
+    async def fake_user(client, semaphore, cache, username):
+        return dict(USER)
+
+    calls = []
+
+    async def fake_participants(contest):
+        calls.append(contest.name)
+        if len(calls) > 1:
+            await bounded(asyncio.sleep(10), "contest_fetch")
+        return 20000
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "model", DummyModel())
+    monkeypatch.setattr(app_module, "scaler", DummyScaler())
+    monkeypatch.setattr(app_module, "fetch_user_data", fake_user)
+    monkeypatch.setattr(app_module, "_total_participants", fake_participants)
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    return calls
+
+
+def _predict(partial):
+    client = TestClient(app_module.app)
+    return client.post(
+        "/api/predict",
+        headers={"X-Request-Timeout-Ms": "200"},
+        json={
+            "username": "alice",
+            "contests": [
+                {"name": "weekly-contest-400", "rank": 100},
+                {"name": "weekly-contest-401", "rank": 100},
+            ],
+            "partial": partial,
+        },
+    )
+
+
+def test_predict_past_deadline_returns_504(slow_second_contest):
+    started = time.perf_counter()
+    r = _predict(partial=False)
+    assert r.status_code == 504
+    assert "contest_fetch" in r.json()["detail"]
+    assert time.perf_counter() - started < 2
+
+
+def test_predict_partial_returns_completed_predictions(slow_second_contest):
+    r = _predict(partial=True)
+    assert r.status_code == 200
+    assert r.headers["X-Partial-Results"] == "true"
+    assert [p["contest_name"] for p in r.json()] == ["weekly-contest-400"]
@@ -0,0 +1,122 @@
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts import download_model
+
+PAYLOAD = bytes(range(256)) * 4096  # 1 MiB
+SHA = hashlib.sha256(PAYLOAD).hexdigest()
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    ranges = True
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status, length, extra=()):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        if self.ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        for key, value in extra:
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self._headers(200, len(PAYLOAD))
+
+    def do_GET(self):
+        header = self.headers.get("Range")
+        self.requests_seen.append(header)
+        if not header or not self.ranges:
+            self._headers(200, len(PAYLOAD))
+            self.wfile.write(PAYLOAD)
+            return
+        start, _, end = header.removeprefix("bytes=").partition("-")
+        start, end = int(start), int(end) if end else len(PAYLOAD) - 1
+        if start >= len(PAYLOAD):
+            self._headers(416, 0)
+            return
+        body = PAYLOAD[start : end + 1]
+        extra = [("Content-Range", f"bytes {start}-{end}/{len(PAYLOAD)}")]
+        self._headers(206, len(body), extra)
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    RangeHandler.ranges = True
+    RangeHandler.requests_seen = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/model.keras"
+    httpd.shutdown()
+
+
+def test_downloads_and_verifies(server, tmp_path):
+    dest = tmp_path / "model.keras"
+    assert download_model.fetch(server, dest, SHA)
+    assert dest.read_bytes() == PAYLOAD
+    assert not (tmp_path / "model.keras.part").exists()
+
+
+def test_skips_file_matching_hash(server, tmp_path):
+    dest = tmp_path / "model.keras"
+    dest.write_bytes(PAYLOAD)
+    assert not download_model.fetch(server, dest, SHA)
+    assert RangeHandler.requests_seen == []
+
+
+def test_resumes_partial_file(server, tmp_path):
+    dest = tmp_path / "model.keras"
+    (tmp_path / "model.keras.part").write_bytes(PAYLOAD[:1000])
+    assert download_model.fetch(server, dest, SHA)
+    assert RangeHandler.requests_seen == ["bytes=1000-"]
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_restarts_when_range_ignored(server, tmp_path):
+    RangeHandler.ranges = False
+    dest = tmp_path / "model.keras"
+    (tmp_path / "model.keras.part").write_bytes(b"stale")
+    assert download_model.fetch(server, dest, SHA)
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_stale_partial_is_redownloaded(server, tmp_path):
+    dest = tmp_path / "model.keras"
+    (tmp_path / "model.keras.part").write_bytes(b"x" * 1000)
+    assert download_model.fetch(server, dest, SHA)
+    assert RangeHandler.requests_seen == ["bytes=1000-", None]
+    assert dest.read_bytes() == PAYLOAD
+
+
+def test_hash_mismatch_keeps_existing_file(server, tmp_path):
+    dest = tmp_path / "model.keras"
+    dest.write_bytes(b"old")
+    with pytest.raises(ValueError, match="SHA-256 mismatch"):
+        download_model.fetch(server, dest, "0" * 64)
+    assert dest.read_bytes() == b"old"
+    assert not (tmp_path / "model.keras.part").exists()
+
+
+def test_parallel_chunks_and_resume(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(download_model, "PARALLEL_MIN_BYTES", 1)
+    monkeypatch.setattr(download_model, "PARALLEL_CHUNK_BYTES", 100_000)
+    dest = tmp_path / "model.keras"
+    part = tmp_path / "model.keras.part"
+    part.write_bytes(PAYLOAD[:200_000] + bytes(len(PAYLOAD) - 200_000))
+    (tmp_path / "model.keras.part.chunks").write_text(
+        f'{{"size": {len(PAYLOAD)}, "chunk": 100000, "done": [0, 1]}}'
+    )
+
+    assert download_model.fetch(server, dest, SHA, workers=4)
+    assert dest.read_bytes() == PAYLOAD
+    assert "bytes=0-99999" not in RangeHandler.requests_seen
+    assert "bytes=200000-299999" in RangeHandler.requests_seen
+    assert not (tmp_path / "model.keras.part.chunks").exists()
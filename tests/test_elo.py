@@ -0,0 +1,142 @@
+import json
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.services import elo
+from app.services.elo import (
+    EloContest,
+    get_contest_engine,
+    load_standings,
+    rating_deltas,
+    rating_weight,
+    win_probability,
+)
+
+
+def _naive_deltas(ratings, ranks, attended):
+    """Direct O(n^2) evaluation of LeetCode's rating update."""
+    n = len(ratings)
+    seed = 0.5 + win_probability(ratings[:, None] - ratings[None, :]).sum(axis=1)
+    target = np.sqrt(seed * ranks)
+    lo, hi = np.full(n, -6000.0), np.full(n, 12000.0)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        expected = (
+            1
+            + win_probability(mid[:, None] - ratings[None, :]).sum(axis=1)
+            - win_probability(mid - ratings)
+        )
+        too_low = expected > target
+        lo, hi = np.where(too_low, mid, lo), np.where(too_low, hi, mid)
+    return (mid - ratings) * rating_weight(attended)
+
+
+def _field(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ratings = rng.normal(1600, 300, n)
+    ranks = rng.permutation(n) + 1.0
+    attended = rng.integers(0, 60, n)
+    return ratings, ranks, attended
+
+
+def test_rating_weight_limits():
+    assert rating_weight(0) == pytest.approx(0.5)
+    assert rating_weight(1000) == pytest.approx(2 / 9)
+
+
+def test_deltas_match_naive_computation():
+    ratings, ranks, attended = _field(1500)
+    fast = rating_deltas(ratings, ranks, attended)
+    exact = _naive_deltas(ratings, ranks, attended)
+    assert np.abs(fast - exact).max() < 0.01
+
+
+def test_deltas_are_monotonic_in_rank():
+    ratings = np.full(100, 1500.0)
+    deltas = rating_deltas(ratings, np.arange(1, 101), np.full(100, 10))
+    assert deltas[0] > 0 > deltas[-1]
+    assert np.all(np.diff(deltas) < 0)
+
+
+def test_predict_extra_participant_matches_field_member():
+    ratings, ranks, attended = _field(800, seed=1)
+    contest = EloContest(ratings)
+    # Adding one more player barely moves the field, so a what-if prediction
+    # for an existing participant agrees with the in-field delta.
+    in_field = contest.deltas(ranks, attended)[5]
+    what_if = contest.predict(ratings[5], ranks[5], attended[5])
+    assert what_if == pytest.approx(in_field, abs=1.0)
+
+
+def _write_standings(directory, name, n=200):
+    ratings, ranks, attended = _field(n, seed=2)
+    rows = [
+        {"rank": int(k), "rating": float(r), "attendedContestsCount": int(a)}
+        for r, k, a in zip(ratings, ranks, attended, strict=True)
+    ]
+    (directory / f"{name}.json").write_text(json.dumps({"participants": rows}))
+    return ratings
+
+
+def test_load_standings_and_engine_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(elo, "STANDINGS_DIR", str(tmp_path))
+    ratings = _write_standings(tmp_path, "weekly-contest-400")
+
+    loaded, ranks, attended = load_standings(str(tmp_path / "weekly-contest-400.json"))
+    np.testing.assert_allclose(loaded, ratings)
+    assert ranks.shape == attended.shape == ratings.shape
+
+    engine = get_contest_engine("weekly-contest-400")
+    assert engine.participants == 200
+    assert get_contest_engine("weekly-contest-400") is engine
+    assert get_contest_engine("weekly-contest-401") is None
+
+
+@pytest.fixture
+def elo_client(tmp_path, monkeypatch):
+    monkeypatch.setattr(elo, "STANDINGS_DIR", str(tmp_path))
+    _write_standings(tmp_path, "weekly-contest-400")
+
+    async def fake_fetch_user_data(client, semaphore, cache, username):
+        return {"rating": 1600.0, "attendedContestsCount": 12}
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "fetch_user_data", fake_fetch_user_data)
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    return TestClient(app_module.app)
+
+
+def test_predict_with_elo_engine(elo_client):
+    r = elo_client.post(
+        "/api/predict",
+        json={
+            "username": "someone",
+            "engine": "elo",
+            "contests": [{"name": "weekly-contest-400", "rank": 1}],
+        },
+    )
+    assert r.status_code == 200
+    result = r.json()[0]
+    assert result["engine"] == "elo"
+    assert result["total_participants"] == 200
+    assert result["prediction"] > 0
+
+
+def test_predict_elo_engine_without_standings(elo_client):
+    r = elo_client.post(
+        "/api/predict",
+        json={
+            "username": "someone",
+            "engine": "elo",
+            "contests": [{"name": "weekly-contest-401", "rank": 1}],
+        },
+    )
+    assert r.status_code == 400
+    assert "standings" in r.json()["detail"]
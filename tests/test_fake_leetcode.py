@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.services.leetcode import fetch_contest_data, fetch_user_data
+from app.utils.cache import TTLCache
+from scripts.fake_leetcode import (
+    FakeConfig,
+    create_app,
+    parse_latency,
+    recording_key,
+    synthesize_history,
+)
+
+
+def _query(client, username):
+    return client.post(
+        "/graphql",
+        json={
+            "query": "query userContestRankingInfo { userContestRanking }",
+            "variables": {"username": username},
+        },
+    )
+
+
+def test_synthetic_history_is_deterministic():
+    assert synthesize_history("alice") == synthesize_history("alice")
+    assert synthesize_history("alice") != synthesize_history("bob")
+    assert len(synthesize_history("alice", num_contests=1000)) == 1000
+
+
+def test_parse_latency_specs():
+    import random
+
+    rng = random.Random(0)  # noqa: S311
+    assert parse_latency("none")(rng) == 0.0
+    assert parse_latency("fixed:50")(rng) == 0.05
+    assert 0.01 <= parse_latency("uniform:10,20")(rng) <= 0.02
+    assert parse_latency("lognormal:80,0.5")(rng) > 0
+
+
+def test_user_query_and_missing_user():
+    client = TestClient(create_app(FakeConfig()))
+    data = _query(client, "alice").json()["data"]
+    assert data["userContestRanking"]["attendedContestsCount"] == sum(
+        1 for h in data["userContestRankingHistory"] if h["attended"]
+    )
+    assert _query(client, "missing-bob").json()["data"]["userContestRanking"] is None
+
+
+def test_rate_limit_injection():
+    client = TestClient(create_app(FakeConfig(rate_limit_rate=1.0)))
+    r = _query(client, "alice")
+    assert r.status_code == 429
+    assert r.headers["Retry-After"] == "1"
+
+
+def test_ranking_page_shape():
+    client = TestClient(create_app(FakeConfig()))
+    r = client.get("/contest/api/ranking/weekly-contest-400/", params={"pagination": 2})
+    body = r.json()
+    assert [row["rank"] for row in body["total_rank"]] == list(range(26, 51))
+    assert body["user_num"] > 10000
+
+
+def test_replay_overrides_synthesis(tmp_path):
+    path = tmp_path / "rec.jsonl"
+    body = {"data": {"userContestRanking": None}}
+    key = recording_key("userContestRanking", {"username": "alice"})
+    path.write_text(json.dumps({"key": key, "status": 200, "body": body}) + "\n")
+    client = TestClient(create_app(FakeConfig(replay=path)))
+    assert _query(client, "alice").json() == body
+
+
+def test_api_client_against_fake_server():
+    transport = httpx.ASGITransport(app=create_app(FakeConfig()))
+
+    async def run():
+        async with httpx.AsyncClient(transport=transport) as client:
+            sem, cache = asyncio.Semaphore(5), TTLCache()
+            user = await fetch_user_data(client, sem, cache, "alice")
+            contest = await fetch_contest_data(client, sem, cache, "weekly-contest-400")
+            return user, contest
+
+    user, contest = asyncio.run(run())
+    assert user["attendedContestsCount"] > 0
+    assert 0 <= user["avgSolveRate"] <= 1
+    assert contest["user_num"] > 10000
@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.utils.hedging import MIN_SAMPLES, HedgeBudget, Hedger, LatencyWindow
+
+
+def _warm(hedger, seconds=0.01, operation="op"):
+    for _ in range(MIN_SAMPLES):
+        hedger.observe(operation, seconds)
+
+
+class Upstream:
+    """Scripted calls: each entry is ``(delay, result_or_exception)``."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.started = 0
+        self.cancelled = 0
+
+    async def send(self):
+        delay, result = self.script[self.started]
+        self.started += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_latency_window_percentile():
+    window = LatencyWindow(size=100)
+    for i in range(MIN_SAMPLES - 1):
+        window.add(i)
+    assert window.percentile(95) is None
+    for i in range(MIN_SAMPLES - 1, 100):
+        window.add(i)
+    assert window.percentile(95) == 95
+    assert window.percentile(50) == 50
+    window.add(1000)  # evicts the oldest sample
+    assert window.percentile(100) == 1000
+
+
+def test_budget_allows_one_hedge_per_ratio_of_calls():
+    budget = HedgeBudget(0.05)
+    spent = 0
+    for _ in range(1000):
+        budget.earn()
+        spent += budget.spend()
+    assert spent == 50
+
+
+def test_budget_credit_is_capped():
+    budget = HedgeBudget(0.5, burst=2)
+    for _ in range(100):
+        budget.earn()
+    assert [budget.spend() for _ in range(3)] == [True, True, False]
+
+
+def test_disabled_hedger_never_duplicates():
+    hedger = Hedger(0, 1.0)
+    _warm(hedger)
+    upstream = Upstream((0.05, "slow"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "slow"
+    assert upstream.started == 1
+
+
+def test_no_hedge_before_enough_samples():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    upstream = Upstream((0.05, "slow"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "slow"
+    assert upstream.started == 1
+
+
+def test_slow_call_is_hedged_and_loser_cancelled():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    _warm(hedger)
+    upstream = Upstream((5, "primary"), (0.01, "hedge"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "hedge"
+    assert upstream.started == 2
+    assert upstream.cancelled == 1
+    # Both calls are recorded, the cancelled primary as its time so far
+    samples = list(hedger.latencies["op"].samples)[MIN_SAMPLES:]
+    assert len(samples) == 2 and max(samples) < 1
+
+
+def test_primary_can_still_win():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    _warm(hedger)
+    upstream = Upstream((0.03, "primary"), (5, "hedge"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "primary"
+    assert upstream.cancelled == 1
+
+
+def test_exhausted_budget_skips_the_hedge():
+    hedger = Hedger(95, 0.0)
+    _warm(hedger)
+    upstream = Upstream((0.05, "primary"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "primary"
+    assert upstream.started == 1
+
+
+def test_failed_call_falls_back_to_the_other():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    _warm(hedger)
+    upstream = Upstream((0.03, RuntimeError("boom")), (0.06, "hedge"))
+    assert asyncio.run(hedger.call("op", upstream.send)) == "hedge"
+
+    upstream = Upstream((0.03, RuntimeError("first")), (0.04, ValueError("second")))
+    with pytest.raises(RuntimeError, match="first"):
+        asyncio.run(hedger.call("op", upstream.send))
+
+
+def test_unaccepted_result_loses_unless_the_other_call_fails():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    _warm(hedger)
+    upstream = Upstream((0.03, 503), (0.06, 200))
+    call = hedger.call("op", upstream.send, ok=lambda status: status < 300)
+    assert asyncio.run(call) == 200
+
+    upstream = Upstream((0.03, 503), (0.06, RuntimeError("down")))
+    call = hedger.call("op", upstream.send, ok=lambda status: status < 300)
+    assert asyncio.run(call) == 503
+
+
+def test_cancelling_the_caller_cancels_both_calls():
+    hedger = Hedger(95, 1.0)
+    hedger.budget.credit = 5
+    _warm(hedger)
+    upstream = Upstream((5, "primary"), (5, "hedge"))
+
+    async def run():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedger.call("op", upstream.send), 0.1)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert upstream.started == 2
+    assert upstream.cancelled == 2
@@ -0,0 +1,69 @@
+import json
+import threading
+
+import numpy as np
+
+from scripts import hpsearch
+
+
+def quality_objective(config, max_epochs, report):
+    """Validation MAE that decays towards ``config['floor']``."""
+    for epoch in range(1, max_epochs + 1):
+        if not report(epoch, config["floor"] + 10 / epoch):
+            break
+
+
+def test_rung_epochs():
+    assert hpsearch.rung_epochs(1, 27, 3) == [1, 3, 9]
+    assert hpsearch.rung_epochs(3, 81, 3) == [3, 9, 27]
+    assert hpsearch.rung_epochs(5, 5, 2) == []
+
+
+def test_asha_rule_keeps_top_fraction():
+    rungs = hpsearch.AshaRungs({}, threading.Lock(), 1, 9, 3)
+    assert rungs.report(2, 100.0)  # not a rung
+    assert rungs.report(1, 5.0) and rungs.report(1, 6.0)  # too few results
+    assert not rungs.report(1, 7.0)
+    assert rungs.report(1, 1.0)
+    assert rungs.results[1] == [5.0, 6.0, 7.0, 1.0]
+
+
+def test_sample_config_shapes():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        config = hpsearch.sample_config(rng)
+        assert len(config["dropout"]) == len(config["units"]) - 1
+        assert 1e-4 <= config["learning_rate"] <= 3e-3
+        json.dumps(config)
+
+
+def test_search_prunes_and_ranks(tmp_path):
+    configs = [{"floor": float(f)} for f in (9, 1, 8, 2, 7, 3, 6, 4, 5)]
+    leaderboard = tmp_path / "leaderboard.json"
+    results = hpsearch.search(quality_objective, configs, 2, 1, (1, 9, 3), leaderboard)
+
+    assert [r["config"]["floor"] for r in results][0] == 1.0
+    assert len(results) == len(configs)
+    assert any(not r["completed"] for r in results)
+    assert results[0]["completed"] and results[0]["epochs"] == 9
+    saved = json.loads(leaderboard.read_text())
+    assert [r["trial"] for r in saved] == [r["trial"] for r in results]
+
+
+def test_consolidate_scales_into_shared_arrays(tmp_path):
+    from scripts import train
+
+    rng = np.random.default_rng(0)
+    rows = rng.normal(1500, 300, size=(200, 16)).round(2)
+    with open(tmp_path / "data.json", "w") as f:
+        for row in rows:
+            record = dict(zip(train.FEATURES, row.tolist(), strict=False))
+            record["output"] = row[-1]
+            f.write(json.dumps(record) + "\n")
+    meta = train.prepare_records([tmp_path / "data.json"], tmp_path / "rec", 1)
+    out = hpsearch.consolidate(tmp_path / "rec", tmp_path / "shared")
+
+    shared = np.load(out / "train.npy", mmap_mode="r")
+    assert isinstance(shared, np.memmap)
+    assert len(shared) == meta["counts"]["train"]
+    assert shared[:, :15].min() >= -1e-6 and shared[:, :15].max() <= 1 + 1e-6
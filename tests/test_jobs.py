@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.services.jobs import CHUNK_USERS, JobRunner, JobStore, QueueFullError
+
+CONTESTS = [
+    {"name": "weekly-contest-400", "rank": 100},
+    {"name": "biweekly-contest-130", "rank": 2000},
+]
+
+
+class Fakes:
+    """Upstream and model stand-ins recording what the runner asked for."""
+
+    def __init__(self):
+        self.fetched = []
+        self.batches = []
+        self.predictors = 0
+
+    async def fetch_user(self, username):
+        self.fetched.append(username)
+        if username.startswith("missing"):
+            raise HTTPException(status_code=400, detail="No contest data found")
+        return {"rating": 1500.0 + len(username), "attendedContestsCount": 3}
+
+    async def participants(self, contest):
+        return 30000
+
+    def predictor(self):
+        self.predictors += 1
+        return self.predict_batch
+
+    def predict_batch(self, features):
+        self.batches.append(len(features))
+        return np.full(len(features), 10.0)
+
+    def runner(self, store, max_queued=10):
+        return JobRunner(
+            store,
+            self.fetch_user,
+            self.participants,
+            self.predictor,
+            workers=2,
+            max_queued=max_queued,
+        )
+
+
+async def _wait_done(store, job_id):
+    for _ in range(500):
+        job = store.load(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def _results(store, job_id):
+    return [json.loads(line) for line in store.results_path(job_id).open()]
+
+
+def test_job_predicts_every_user_in_batches(tmp_path):
+    fakes = Fakes()
+    store = JobStore(tmp_path)
+    usernames = [f"user{i}" for i in range(CHUNK_USERS * 2 + 5)] + ["missing1"]
+
+    async def run():
+        runner = fakes.runner(store)
+        job = runner.submit(usernames, CONTESTS)
+        done = await _wait_done(store, job["job_id"])
+        await runner.stop()
+        return done
+
+    job = asyncio.run(run())
+    assert job["status"] == "done"
+    assert job["progress"] == {"done": len(usernames), "total": len(usernames)}
+
+    rows = _results(store, job["job_id"])
+    assert [r["username"] for r in rows] == usernames
+    assert rows[-1] == {"username": "missing1", "error": "No contest data found"}
+    first = rows[0]["predictions"]
+    assert [p["contest_name"] for p in first] == [c["name"] for c in CONTESTS]
+    assert first[0]["rating_before_contest"] == 1505.0
+    assert first[1]["rating_before_contest"] == first[0]["rating_after_contest"]
+    assert first[1]["attended_contests_count"] == 4
+    # One model call per contest per chunk, never per user
+    assert fakes.batches == [CHUNK_USERS] * 4 + [5, 5]
+    assert fakes.predictors == 1  # one model version for the whole job
+
+
+def test_resume_skips_completed_users_and_drops_torn_line(tmp_path):
+    fakes = Fakes()
+    previous = JobStore(tmp_path)
+    usernames = [f"user{i}" for i in range(CHUNK_USERS + 3)]
+    job = previous.create(usernames, CONTESTS)
+    job["status"] = "running"
+    previous.save(job)
+    previous.append_results(job["job_id"], [{"username": u} for u in usernames[:10]])
+    with open(previous.results_path(job["job_id"]), "a") as f:
+        f.write('{"username": "us')  # crashed mid-write
+    previous.release(job["job_id"])  # the process died
+    store = JobStore(tmp_path)
+
+    async def run():
+        runner = fakes.runner(store)
+        runner.recover(resume=True)
+        done = await _wait_done(store, job["job_id"])
+        await runner.stop()
+        return done
+
+    assert asyncio.run(run())["status"] == "done"
+    assert fakes.fetched == usernames[10:]
+    assert [r["username"] for r in _results(store, job["job_id"])] == usernames
+
+
+def test_recover_without_persistence_fails_unfinished_jobs(tmp_path):
+    previous = JobStore(tmp_path)
+    job = previous.create(["alice"], CONTESTS)
+    previous.release(job["job_id"])
+    store = JobStore(tmp_path)
+
+    async def run():
+        runner = Fakes().runner(store)
+        runner.recover(resume=False)
+        await runner.stop()
+
+    asyncio.run(run())
+    job = store.load(job["job_id"])
+    assert job["status"] == "failed"
+    assert "restart" in job["error"]
+
+
+@pytest.mark.parametrize("resume", [False, True])
+def test_recover_leaves_jobs_claimed_by_a_sibling_worker(tmp_path, resume):
+    sibling = JobStore(tmp_path)
+    job = sibling.create(["alice"], CONTESTS)
+    store = JobStore(tmp_path)
+
+    async def run():
+        runner = Fakes().runner(store)
+        runner.recover(resume=resume)
+        assert runner.queue.empty()
+        await runner.stop()
+
+    asyncio.run(run())
+    assert store.load(job["job_id"])["status"] == "queued"
+    assert store.load(job["job_id"])["owner"] == os.getpid()
+
+    sibling.release(job["job_id"])
+    assert store.claim(job["job_id"])
+    assert not sibling.claim(job["job_id"])
+
+
+def test_submit_rejects_when_queue_is_full(tmp_path):
+    store = JobStore(tmp_path)
+
+    async def run():
+        runner = Fakes().runner(store, max_queued=1)
+        runner.workers = 0  # nothing drains the queue
+        runner.submit(["alice"], CONTESTS)
+        with pytest.raises(QueueFullError):
+            runner.submit(["bob"], CONTESTS)
+
+    asyncio.run(run())
+
+
+def test_store_rejects_invalid_job_ids(tmp_path):
+    store = JobStore(tmp_path)
+    assert store.load("../../etc") is None
+    with pytest.raises(FileNotFoundError):
+        store.results_path("not-a-job")
+
+
+def test_job_api_submit_poll_download(tmp_path, monkeypatch):
+    fakes = Fakes()
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    # The client is used as a context manager so the worker tasks live on one
+    # event loop across requests; that runs the app's lifespan
+    monkeypatch.setattr(app_module.app.router, "lifespan_context", dummy_lifespan)
+    monkeypatch.setattr(app_module, "jobs", fakes.runner(JobStore(tmp_path)))
+
+    with TestClient(app_module.app) as client:
+        r = client.post(
+            "/api/jobs", json={"usernames": ["alice", "bob"], "contests": CONTESTS}
+        )
+        assert r.status_code == 202
+        status = r.json()
+        assert status["progress"]["total"] == 2
+
+        for _ in range(200):
+            status = client.get(f"/api/jobs/{status['job_id']}").json()
+            if status["status"] == "done":
+                break
+            time.sleep(0.01)
+        assert status["status"] == "done"
+
+        r = client.get(status["results_url"])
+        assert r.status_code == 200
+        assert r.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in r.text.splitlines()]
+        assert [line["username"] for line in lines] == ["alice", "bob"]
+
+        assert client.get("/api/jobs/" + "0" * 32).status_code == 404
+        r = client.post("/api/jobs", json={"usernames": [], "contests": CONTESTS})
+        assert r.status_code == 422
@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import main as app_module
+from scripts.fake_leetcode import FakeConfig, create_app
+from scripts.loadtest import RequestMix, parse_args, parse_weights, run_load, summarize
+
+
+def test_parse_weights():
+    assert parse_weights("predict=8,health=2") == {"predict": 8.0, "health": 2.0}
+    with pytest.raises(ValueError):
+        parse_weights("login=1")
+    with pytest.raises(ValueError):
+        parse_weights("predict=0")
+
+
+def test_mixes_shape_requests():
+    hit = RequestMix("hit", {"predict": 1}, users=3)
+    names = {hit.next()[3]["username"] for _ in range(50)}
+    assert len(names) <= 3
+
+    cold = RequestMix("cold", {"predict": 1})
+    names = {cold.next()[3]["username"] for _ in range(50)}
+    assert len(names) == 50
+
+    whatif = RequestMix("whatif", {"predict": 1})
+    assert 3 <= len(whatif.next()[3]["contests"]) <= 8
+
+
+def test_summarize_percentiles_and_errors():
+    samples = [(i / 1000, 200) for i in range(1, 1001)] + [(0.5, 503)] * 10
+    summary = summarize(samples, duration=2.0)
+    assert summary["requests"] == 1010
+    assert summary["throughput_rps"] == 505.0
+    assert summary["status_codes"] == {"200": 1000, "503": 10}
+    assert abs(summary["error_rate"] - 10 / 1010) < 1e-4
+    assert summary["latency_ms"]["p50"] < summary["latency_ms"]["p99"]
+    assert set(summary["latency_ms"]) >= {"p50", "p90", "p99", "p999"}
+
+
+def test_closed_loop_against_app_and_fake_upstream(monkeypatch):
+    class DummyModel:
+        input_shape = (None, 15)
+
+        def predict(self, x, verbose=0):
+            return np.zeros((len(x), 1))
+
+    class DummyScaler:
+        def transform(self, x):
+            return x
+
+    fake = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(FakeConfig()))
+    )
+    monkeypatch.setattr(app_module, "model", DummyModel())
+    monkeypatch.setattr(app_module, "scaler", DummyScaler())
+    monkeypatch.setattr(app_module, "async_client", fake)
+
+    args = parse_args(
+        [
+            "--url",
+            "http://test",
+            "--duration",
+            "0.3",
+            "--warmup",
+            "0",
+            "--concurrency",
+            "4",
+            "--mix",
+            "whatif",
+        ]
+    )
+    report = asyncio.run(
+        run_load(args, transport=httpx.ASGITransport(app=app_module.app))
+    )
+    assert report["overall"]["requests"] > 0
+    assert report["overall"]["error_rate"] == 0.0
+    assert "predict" in report["endpoints"]
@@ -0,0 +1,175 @@
+import logging
+
+import numpy as np
+import pytest
+
+from app.config import LOOKUP_MAX_P99_ERROR
+from app.mlp_runtime import MLPModel
+from app.services import lookup
+from app.services.lookup import (
+    LookupTable,
+    build_lookup_table,
+    get_lookup_table,
+    measure_error,
+    model_runtime,
+)
+from app.services.prediction import build_features
+from scripts.precompute_tables import model_version_for, precompute
+
+# Linear in every column the table interpolates or corrects for, so the
+# table must reproduce it exactly (up to float32 storage).
+WEIGHTS = np.zeros(15)
+WEIGHTS[[0, 4, 5, 6, 7, 8, 9, 10, 14]] = [
+    0.02,
+    -0.3,
+    40,
+    0.004,
+    9,
+    -0.002,
+    0.5,
+    -0.01,
+    7,
+]
+
+
+class LinearModel:
+    input_shape = (None, 15)
+
+    def predict(self, x, verbose=0):
+        return (x @ WEIGHTS)[:, None]
+
+
+class IdentityScaler:
+    def transform(self, x):
+        return x
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_lookup_table(
+        LinearModel(), IdentityScaler(), 20000, "weekly-contest-1"
+    )
+
+
+def _user(rng):
+    return {
+        "rating": float(rng.uniform(900, 3000)),
+        "attendedContestsCount": int(rng.integers(0, 300)),
+        "avgSolveRate": float(rng.uniform(0, 1)),
+        "avgFinishTime": float(rng.uniform(1000, 5000)),
+        "recentSolveRate": float(rng.uniform(0, 1)),
+        "recentFinishTime": float(rng.uniform(1000, 5000)),
+        "ratingTrend": float(rng.normal(0, 20)),
+        "maxRating": float(rng.uniform(1500, 3200)),
+    }
+
+
+def test_predict_user_matches_model_with_history_correction(table):
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        user = _user(rng)
+        rating, attended = user["rating"], user["attendedContestsCount"]
+        rank = int(rng.integers(1, 20000))
+        exact = LinearModel().predict(
+            build_features(user, rating, attended, rank, 20000)
+        )[0, 0]
+        approx = table.predict_user(user, rating, attended, rank)
+        assert approx == pytest.approx(exact, abs=1e-2)
+
+
+def test_scalar_and_batch_interpolation_agree(table):
+    ratings = np.array([850.0, 1750.0, 2999.0])
+    ranks = np.array([1, 777, 19999])
+    solve = np.array([0.05, 0.5, 0.95])
+    attended = np.array([0, 7, 250])
+    batch = table.predict(ratings, ranks, solve, attended)
+    single = [
+        table.predict(*args)
+        for args in zip(ratings, ranks, solve, attended, strict=True)
+    ]
+    np.testing.assert_allclose(batch, single, rtol=1e-6)
+
+
+def test_save_load_roundtrip(table, tmp_path):
+    path = tmp_path / "t.npz"
+    table.save(path)
+    loaded = LookupTable.load(path)
+    assert loaded.total_participants == 20000
+    np.testing.assert_array_equal(loaded.values, table.values)
+    assert loaded.predict(1800.0, 100, 0.5, 10) == table.predict(1800.0, 100, 0.5, 10)
+
+
+def test_measure_error_on_exact_table(table):
+    rng = np.random.default_rng(1)
+    users = [_user(rng) for _ in range(20)]
+    error = measure_error(
+        table, LinearModel(), IdentityScaler(), users, [1, 10, 100, 1000] * 5
+    )
+    assert error["samples"] == 20
+    assert error["max_abs_error"] < 1e-2
+
+
+def test_get_lookup_table_checks_participants_and_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(lookup, "LOOKUP_DIR", str(tmp_path))
+    logging.disable(logging.INFO)
+    try:
+        precompute(
+            "weekly-contest-1",
+            20000,
+            LinearModel(),
+            IdentityScaler(),
+            50,
+            tmp_path,
+            version="v1",
+        )
+    finally:
+        logging.disable(logging.NOTSET)
+
+    def served(name, total=20000, error=1.0, version="v1", runtime="keras"):
+        return get_lookup_table(name, total, error, version, runtime) is not None
+
+    found = get_lookup_table("weekly-contest-1", 20000, 1.0, "v1", "keras")
+    assert found.meta["samples"] == 50
+    assert found.meta["runtime"] == "keras"
+    assert not served("weekly-contest-1", total=19999)
+    assert not served("weekly-contest-2")
+
+    inaccurate = LookupTable(found.axes, found.values, {**found.meta})
+    inaccurate.meta["p99_abs_error"] = 5.0
+    inaccurate.save(tmp_path / "weekly-contest-3.npz")
+    assert not served("weekly-contest-3")
+    assert served("weekly-contest-3", error=10.0)
+    # Built from another model version or runtime, or before they were recorded
+    assert not served("weekly-contest-3", error=10.0, version="v2")
+    assert not served("weekly-contest-3", error=10.0, runtime="int8")
+    for key in ("model_version", "runtime"):
+        meta = {k: v for k, v in inaccurate.meta.items() if k != key}
+        LookupTable(found.axes, found.values, meta).save(tmp_path / "old.npz")
+        assert not served("old", error=10.0)
+
+
+def test_model_runtime():
+    layer = (np.ones((15, 1), dtype=np.int8), np.ones(1), np.zeros(1), "linear")
+    assert model_runtime(MLPModel([layer], "int8")) == "int8"
+    assert model_runtime(LinearModel()) == "keras"
+
+
+def test_shipped_table_error_is_served_by_default(table, tmp_path, monkeypatch):
+    monkeypatch.setattr(lookup, "LOOKUP_DIR", str(tmp_path))
+    # Measured for the shipped model on a 30k-participant contest
+    meta = {**table.meta, "model_version": "v1"}
+    meta.update(max_abs_error=24.6, p99_abs_error=3.3, mean_abs_error=0.53)
+    LookupTable(table.axes, table.values, meta).save(tmp_path / "weekly-contest-1.npz")
+    assert get_lookup_table(
+        "weekly-contest-1", 20000, LOOKUP_MAX_P99_ERROR, "v1", "keras"
+    )
+
+
+def test_precompute_records_the_model_version(monkeypatch):
+    monkeypatch.setattr(
+        "scripts.precompute_tables.MANIFEST_PATH", "/nonexistent/manifest.json"
+    )
+    assert model_version_for("models/history/model_20260101_000000.keras") == (
+        "20260101_000000"
+    )
+    assert model_version_for("models/model.keras") == "current"
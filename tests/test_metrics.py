@@ -0,0 +1,81 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.utils.cache import InstrumentedCache, TTLCache
+from app.utils.metrics import CACHE_REQUESTS, Counter, Gauge, Histogram, Registry
+
+
+@pytest.fixture(autouse=True)
+def patch_lifespan(monkeypatch):
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+
+
+def test_histogram_renders_cumulative_buckets():
+    h = Histogram("test_seconds", "Test.", ["stage"], buckets=(0.1, 1.0))
+    h.observe(0.05, "a")
+    h.observe(0.5, "a")
+    h.observe(5.0, "a")
+    text = "\n".join(h.render())
+    assert 'test_seconds_bucket{stage="a",le="0.1"} 1' in text
+    assert 'test_seconds_bucket{stage="a",le="1.0"} 2' in text
+    assert 'test_seconds_bucket{stage="a",le="+Inf"} 3' in text
+    assert 'test_seconds_count{stage="a"} 3' in text
+    assert "# TYPE test_seconds histogram" in text
+
+
+def test_counter_and_gauge():
+    c = Counter("test_total", "Test.", ["status"])
+    c.inc("200")
+    c.inc("200")
+    c.inc("429")
+    assert c.value("200") == 2
+    g = Gauge("test_inflight", "Test.")
+    g.inc()
+    g.inc()
+    g.dec()
+    assert g.value() == 1
+    with pytest.raises(ValueError):
+        c.inc()
+
+
+def test_label_values_are_escaped():
+    c = Counter("test_escape_total", "Test.", ["name"])
+    c.inc('a"b\\c')
+    assert 'name="a\\"b\\\\c"' in c.render()[-1]
+
+
+def test_registry_rejects_duplicates():
+    registry = Registry()
+    registry.register(Counter("dup_total", "Test."))
+    with pytest.raises(ValueError):
+        registry.register(Counter("dup_total", "Test."))
+
+
+def test_instrumented_cache_counts_hits_and_misses():
+    cache = InstrumentedCache(TTLCache(), "test-backend")
+    cache.set("k", 1)
+    assert cache.get("k") == 1
+    assert cache.get("missing") is None
+    assert CACHE_REQUESTS.value("test-backend", "hit") == 1
+    assert CACHE_REQUESTS.value("test-backend", "miss") == 1
+
+    assert cache.contains("k") and not cache.contains("k", "missing")
+    assert CACHE_REQUESTS.value("test-backend", "hit") == 1
+    assert CACHE_REQUESTS.value("test-backend", "miss") == 1
+
+
+def test_metrics_endpoint_exposes_text_format():
+    client = TestClient(app_module.app)
+    client.post("/api/predict", json={"username": "testuser", "contests": []})
+    r = client.get("/api/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain")
+    assert "# TYPE predictor_stage_duration_seconds histogram" in r.text
+    assert "predictor_upstream_slots_in_use" in r.text
@@ -0,0 +1,113 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import main as app_module
+from app.mlp_runtime import (
+    VARIANTS,
+    MLPModel,
+    _dense_layers_from_config,
+    export_variant,
+    load_variant,
+    quantize_int8,
+    read_keras_weights,
+)
+from app.services.prediction import make_batch_prediction
+from scripts.quantize import recommend
+
+MODEL_PATH = Path(__file__).parent.parent / "model.keras"
+
+
+def _layers(seed=0):
+    rng = np.random.default_rng(seed)
+    shapes = [(15, 32), (32, 16), (16, 1)]
+    return [
+        (
+            rng.normal(0, 0.3, shape).astype(np.float32),
+            rng.normal(0, 0.1, shape[1]).astype(np.float32),
+            "relu" if i < len(shapes) - 1 else "linear",
+        )
+        for i, shape in enumerate(shapes)
+    ]
+
+
+def test_read_keras_weights_from_archive():
+    layers = read_keras_weights(MODEL_PATH)
+    assert [k.shape for k, _, _ in layers] == [(15, 128), (128, 64), (64, 32), (32, 1)]
+    assert [a for _, _, a in layers] == ["relu", "relu", "relu", "linear"]
+
+
+def test_unsupported_layers_are_rejected():
+    config = {"config": {"layers": [{"class_name": "LSTM", "config": {}}]}}
+    with pytest.raises(ValueError, match="LSTM"):
+        list(_dense_layers_from_config(config))
+
+
+def test_quantize_int8_error_within_half_step():
+    kernel = np.random.default_rng(1).normal(0, 1, (64, 8)).astype(np.float32)
+    q, scale = quantize_int8(kernel)
+    assert q.dtype == np.int8
+    assert np.all(np.abs(q * scale - kernel) <= scale / 2 + 1e-6)
+
+
+@pytest.mark.parametrize("variant", VARIANTS)
+def test_variant_roundtrip(tmp_path, variant):
+    layers = _layers()
+    x = np.random.default_rng(2).uniform(0, 1, (100, 15))
+    reference = MLPModel.from_keras_weights(layers).predict(x)
+
+    model = load_variant(export_variant(layers, variant, tmp_path / variant))
+    assert model.variant == variant
+    assert model.input_shape == (None, 15)
+    tolerance = {"float32": 1e-6, "float16": 1e-2, "int8": 5e-2}[variant]
+    np.testing.assert_allclose(model.predict(x), reference, atol=tolerance)
+
+
+def test_int8_keeps_outer_layers_float(tmp_path):
+    model = load_variant(export_variant(_layers(), "int8", tmp_path / "int8"))
+    dtypes = [kernel.dtype for kernel, _, _, _ in model.layers]
+    assert dtypes == [np.float32, np.int8, np.float32]
+    assert (
+        model.nbytes
+        < load_variant(export_variant(_layers(), "float32", tmp_path / "f32")).nbytes
+    )
+
+
+def test_variant_works_with_batch_prediction(tmp_path):
+    class IdentityScaler:
+        def transform(self, x):
+            return x
+
+    model = load_variant(export_variant(_layers(), "float16", tmp_path / "f16"))
+    out = make_batch_prediction(model, IdentityScaler(), np.ones((7, 15)))
+    assert out.shape == (7,)
+
+
+def test_recommend_picks_smallest_within_budget():
+    report = {
+        "float32": {
+            "mae_vs_float": 0.0,
+            "weight_bytes": 400,
+            "latency_us": {"4096": 1},
+        },
+        "float16": {
+            "mae_vs_float": 0.01,
+            "weight_bytes": 200,
+            "latency_us": {"4096": 2},
+        },
+        "int8": {"mae_vs_float": 0.9, "weight_bytes": 100, "latency_us": {"4096": 2}},
+    }
+    assert recommend(report, budget=0.5) == "float16"
+    assert recommend(report, budget=1.0) == "int8"
+
+
+def test_load_model_uses_configured_variant(tmp_path, monkeypatch):
+    export_variant(_layers(), "int8", tmp_path / "int8")
+    monkeypatch.setattr(app_module, "MODEL_RUNTIME", "int8")
+    monkeypatch.setattr(app_module, "MODEL_VARIANTS_DIR", str(tmp_path))
+    assert isinstance(app_module._load_model(), MLPModel)
+
+    monkeypatch.setattr(app_module, "MODEL_RUNTIME", "float16")
+    with pytest.raises(FileNotFoundError):
+        app_module._load_model()
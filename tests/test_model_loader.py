@@ -0,0 +1,69 @@
+import os
+
+import h5py
+
+from app.model_loader import _is_hdf5, _save_migrated, migrated_path
+
+
+class SavableModel:
+    def __init__(self, payload=b"model"):
+        self.payload = payload
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.payload)
+
+
+def _legacy_file(path, value=1):
+    with h5py.File(path, "w") as f:
+        f.attrs["model_config"] = '{"class_name": "Sequential"}'
+        f["w"] = [value]
+    return str(path)
+
+
+def test_migrated_path_is_keyed_by_content(tmp_path):
+    source = _legacy_file(tmp_path / "model.keras")
+    first = migrated_path(source)
+    assert first == migrated_path(source)
+    assert os.path.dirname(first) == str(tmp_path)
+    assert os.path.basename(first).startswith("model.migrated-")
+    assert first.endswith(".keras")
+
+    _legacy_file(tmp_path / "model.keras", value=2)
+    assert migrated_path(source) != first
+
+
+def test_detects_hdf5(tmp_path):
+    assert _is_hdf5(_legacy_file(tmp_path / "model.keras"))
+    (tmp_path / "zip.keras").write_bytes(b"PK\x03\x04rest")
+    assert not _is_hdf5(str(tmp_path / "zip.keras"))
+
+
+def test_save_migrated_replaces_stale_copies(tmp_path):
+    source = _legacy_file(tmp_path / "model.keras")
+    stale = tmp_path / "model.migrated-0000000000000000.keras"
+    stale.write_bytes(b"old")
+    unrelated = tmp_path / "other.migrated-0000000000000000.keras"
+    unrelated.write_bytes(b"keep")
+
+    cached = migrated_path(source)
+    _save_migrated(SavableModel(b"new"), source, cached)
+
+    with open(cached, "rb") as f:
+        assert f.read() == b"new"
+    assert not stale.exists()
+    assert unrelated.exists()
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["model.keras", os.path.basename(cached), unrelated.name]
+    )
+
+
+def test_save_migrated_failure_is_not_fatal(tmp_path):
+    class Unserialisable:
+        def save(self, path):
+            raise ValueError("Unknown layer: LegacyLayer")
+
+    source = _legacy_file(tmp_path / "model.keras")
+    cached = migrated_path(source)
+    _save_migrated(Unserialisable(), source, cached)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["model.keras"]
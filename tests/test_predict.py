@@ -110,3 +110,66 @@ def test_make_prediction_lstm_reshapes():
 
     assert received_shapes["scaler_input"] == (1, 7)
     assert received_shapes["model_input"] == (1, 1, 7)  # LSTM: reshaped to 3D
+
+
+def test_build_features_matches_training_order():
+    from app.services.prediction import build_features
+
+    user = {
+        "rating": 1957,
+        "avgSolveRate": 0.58,
+        "avgFinishTime": 3100,
+        "recentSolveRate": 0.45,
+        "recentFinishTime": 2200,
+        "ratingTrend": 4.0,
+        "maxRating": 2007,
+    }
+    features = build_features(user, 1957, 87, 1869, 21165)
+    expected = [
+        1957,
+        1869,
+        21165,
+        1869 * 100 / 21165,
+        87,
+        0.58,
+        3100,
+        0.45,
+        2200,
+        4.0,
+        2007,
+        np.log1p(1869),
+        1957 * 1869 / 21165,
+        0.58 * 1957,
+        3100 / 5400,
+    ]
+    assert features.shape == (1, 15)
+    np.testing.assert_allclose(features[0], expected)
+
+
+def test_build_features_batch_matches_single_rows():
+    from app.services.prediction import build_features
+
+    user = {"rating": 1800, "avgSolveRate": 0.6}
+    ranks = np.array([10, 500, 9000])
+    batch = build_features(user, 1800.0, 40, ranks, 20000)
+    assert batch.shape == (3, 15)
+    for i, rank in enumerate(ranks):
+        single = build_features(user, 1800.0, 40, int(rank), 20000)
+        np.testing.assert_allclose(batch[i], single[0])
+
+
+def test_make_batch_prediction_returns_one_value_per_row():
+    from app.services.prediction import make_batch_prediction
+
+    class DummyModel:
+        input_shape = (None, 3)
+
+        def predict(self, x, verbose=0):
+            return x.sum(axis=1, keepdims=True)
+
+    class DummyScaler:
+        def transform(self, x):
+            return x
+
+    out = make_batch_prediction(DummyModel(), DummyScaler(), np.ones((4, 3)))
+    np.testing.assert_allclose(out, [3.0, 3.0, 3.0, 3.0])
@@ -0,0 +1,100 @@
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.utils.profiling import ProfilingMiddleware
+from app.utils.timing import format_server_timing
+from scripts.fake_leetcode import FakeConfig, create_app
+
+
+@pytest.fixture(autouse=True)
+def patch_lifespan(monkeypatch):
+    class DummyModel:
+        input_shape = (None, 15)
+
+        def predict(self, x, verbose=0):
+            return np.array([[10.0]])
+
+    class DummyScaler:
+        def transform(self, x):
+            return x
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "model", DummyModel())
+    monkeypatch.setattr(app_module, "scaler", DummyScaler())
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+
+
+def test_format_server_timing():
+    header = format_server_timing({"upstream": 0.0125, "inference": 0.002}, 0.02)
+    assert header == "upstream;dur=12.50, inference;dur=2.00, total;dur=20.00"
+
+
+def test_every_response_has_server_timing():
+    client = TestClient(app_module.app)
+    r = client.get("/api/health")
+    assert "total;dur=" in r.headers["server-timing"]
+
+
+def test_timing_allow_origin_only_for_allowed_origins():
+    client = TestClient(app_module.app)
+    r = client.get("/api/health", headers={"Origin": "http://localhost:3000"})
+    assert r.headers["timing-allow-origin"] == "http://localhost:3000"
+    r = client.get("/api/health", headers={"Origin": "http://evil.example"})
+    assert "timing-allow-origin" not in r.headers
+
+
+def test_predict_server_timing_has_stage_breakdown(monkeypatch):
+    fake = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=create_app(FakeConfig()))
+    )
+    monkeypatch.setattr(app_module, "async_client", fake)
+    client = TestClient(app_module.app)
+    r = client.post(
+        "/api/predict",
+        json={
+            "username": "timing-user",
+            "contests": [{"name": "weekly-contest-400", "rank": 500}],
+        },
+    )
+    assert r.status_code == 200
+    stages = {part.split(";")[0] for part in r.headers["server-timing"].split(", ")}
+    assert {"user_fetch", "contest_fetch", "upstream", "cache"} <= stages
+    assert {"feature_build", "scale", "inference", "total"} <= stages
+
+
+def test_profiling_middleware_writes_collapsed_stacks(tmp_path):
+    app = FastAPI()
+
+    @app.post("/api/predict")
+    def slow():
+        deadline = time.perf_counter() + 0.05
+        while time.perf_counter() < deadline:
+            pass
+        return {"ok": True}
+
+    @app.get("/api/health")
+    def health():
+        return {"ok": True}
+
+    app.add_middleware(
+        ProfilingMiddleware, sample_rate=1.0, output_dir=str(tmp_path), interval_ms=1
+    )
+    client = TestClient(app)
+    r = client.post("/api/predict")
+    profile_id = r.headers["x-profile-id"]
+    lines = (tmp_path / f"{profile_id}.collapsed").read_text().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack and int(count) > 0
+
+    assert "x-profile-id" not in client.get("/api/health").headers
@@ -0,0 +1,234 @@
+from contextlib import asynccontextmanager
+
+import joblib
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sklearn.preprocessing import MinMaxScaler
+
+import main as app_module
+from app.registry import (
+    Canary,
+    ModelVersion,
+    list_versions,
+    load_version,
+    manifest_version,
+    resolve_version,
+)
+from app.schemas import Contest
+from app.utils.metrics import MODEL_PREDICTIONS
+
+
+class ConstantModel:
+    input_shape = (None, 15)
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def predict(self, x, verbose=0):
+        self.calls += 1
+        return np.full((len(x), 1), self.value)
+
+
+class FailingModel(ConstantModel):
+    def predict(self, x, verbose=0):
+        raise RuntimeError("boom")
+
+
+class IdentityScaler:
+    def transform(self, x):
+        return x
+
+
+def _version(name, value, model_cls=ConstantModel):
+    return ModelVersion(name, model_cls(value), IdentityScaler())
+
+
+def _history(tmp_path, *versions):
+    scaler = MinMaxScaler().fit(np.vstack([np.zeros(15), np.ones(15)]))
+    for v in versions:
+        (tmp_path / f"model_{v}.keras").write_bytes(b"")
+        joblib.dump(scaler, tmp_path / f"scaler_{v}.save")
+    return tmp_path
+
+
+FEATURES = np.zeros((1, 15))
+
+
+def test_list_and_resolve_versions(tmp_path):
+    _history(tmp_path, "20260101_000000", "20260201_000000")
+    (tmp_path / "model_orphan.keras").write_bytes(b"")
+    assert list_versions(tmp_path) == ["20260101_000000", "20260201_000000"]
+    assert list_versions(tmp_path / "missing") == []
+
+    assert resolve_version(None, "m.keras", "s.save", tmp_path) == (
+        "m.keras",
+        "s.save",
+    )
+    model, scaler = resolve_version("20260101_000000", "m", "s", tmp_path)
+    assert model.endswith("model_20260101_000000.keras")
+    for bad in ("orphan", "../etc/passwd"):
+        with pytest.raises(FileNotFoundError):
+            resolve_version(bad, "m", "s", tmp_path)
+
+
+def test_manifest_version(tmp_path):
+    path = tmp_path / "manifest.json"
+    assert manifest_version(path) == "current"
+    path.write_text('{"model.keras": {"version": "v7"}}')
+    assert manifest_version(path) == "v7"
+
+
+def test_load_version_warms_model(tmp_path):
+    _history(tmp_path, "v2")
+    model = ConstantModel(3.0)
+    version = load_version(
+        "v2", "unused", str(tmp_path / "scaler_v2.save"), lambda path: model
+    )
+    assert version.version == "v2" and version.model is model
+    assert model.calls == 2
+
+
+def test_canary_routing():
+    active, candidate = _version("v1", 1.0), _version("v2", 2.0)
+    assert Canary(candidate, 0, False).predict(active, FEATURES) == 1.0
+    assert candidate.model.calls == 0
+
+    before = MODEL_PREDICTIONS.value("v2", "canary")
+    assert Canary(candidate, 100, False).predict(active, FEATURES) == 2.0
+    assert active.model.calls == 2  # still evaluated, for the comparison log
+    assert MODEL_PREDICTIONS.value("v2", "canary") == before + 1
+
+    before = MODEL_PREDICTIONS.value("v2", "shadow")
+    assert Canary(candidate, 0, True).predict(active, FEATURES) == 1.0
+    assert MODEL_PREDICTIONS.value("v2", "shadow") == before + 1
+
+
+def test_failing_candidate_falls_back():
+    active = _version("v1", 1.0)
+    candidate = _version("v2", 0.0, FailingModel)
+    assert Canary(candidate, 100, False).predict(active, FEATURES) == 1.0
+
+
+@pytest.fixture
+def admin_client(monkeypatch, tmp_path):
+    history = _history(tmp_path, "v2")
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(app_module, "MODEL_HISTORY_DIR", str(history))
+    monkeypatch.setattr(app_module, "model", ConstantModel(1.0))
+    monkeypatch.setattr(app_module, "scaler", IdentityScaler())
+    monkeypatch.setattr(app_module, "model_version", "v1")
+    monkeypatch.setattr(app_module, "canary", None)
+    monkeypatch.setattr(app_module, "_load_model", lambda path: ConstantModel(2.0))
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    return TestClient(app_module.app)
+
+
+AUTH = {"X-Admin-Token": "secret"}
+
+
+def test_admin_requires_token(admin_client, monkeypatch):
+    assert admin_client.get("/api/admin/models").status_code == 403
+    bad = {"X-Admin-Token": "nope"}
+    assert admin_client.get("/api/admin/models", headers=bad).status_code == 403
+    monkeypatch.setattr(app_module, "ADMIN_TOKEN", "")
+    assert admin_client.get("/api/admin/models", headers=AUTH).status_code == 404
+
+
+def test_admin_reload_swaps(admin_client):
+    old_model = app_module.model
+    r = admin_client.post("/api/admin/reload", json={"version": "v2"}, headers=AUTH)
+    assert r.status_code == 200
+    assert r.json()["active"] == "v2"
+    assert r.json()["available"] == ["current", "v2"]
+    assert app_module.model is not old_model
+    assert app_module.model.value == 2.0
+
+
+def test_admin_reload_unknown_version(admin_client):
+    r = admin_client.post("/api/admin/reload", json={"version": "v9"}, headers=AUTH)
+    assert r.status_code == 404
+
+
+def test_admin_canary_promote_and_rollback(admin_client):
+    r = admin_client.post(
+        "/api/admin/reload",
+        json={"version": "v2", "canary_percent": 10},
+        headers=AUTH,
+    )
+    assert r.json()["active"] == "v1"
+    assert r.json()["canary"] == {"version": "v2", "percent": 10, "shadow": False}
+    assert admin_client.get("/api/health").json()["canary"]["version"] == "v2"
+
+    assert (
+        admin_client.post("/api/admin/rollback", headers=AUTH).json()["canary"] is None
+    )
+    assert admin_client.post("/api/admin/promote", headers=AUTH).status_code == 409
+
+    admin_client.post(
+        "/api/admin/reload", json={"version": "v2", "shadow": True}, headers=AUTH
+    )
+    r = admin_client.post("/api/admin/promote", headers=AUTH)
+    assert r.json()["active"] == "v2" and r.json()["canary"] is None
+    assert app_module.model.value == 2.0
+
+
+def test_lookup_tables_follow_the_active_version(admin_client, monkeypatch):
+    class Table:
+        def predict_user(self, *args):
+            return 99.0
+
+    def tables(name, total, max_p99_error, version, runtime):
+        return Table() if version == "v1" else None
+
+    monkeypatch.setattr(app_module, "get_lookup_table", tables)
+    contest = Contest(name="weekly-contest-400", rank=100)
+
+    def engine():
+        serving = app_module._serving()
+        name, _ = app_module._model_prediction(contest, {}, 1, 10, 20000, serving)
+        return name
+
+    assert engine() == "lookup"
+    admin_client.post(
+        "/api/admin/reload",
+        json={"version": "v2", "canary_percent": 10},
+        headers=AUTH,
+    )
+    assert engine() == "model"  # the canary sees every contest
+    admin_client.post("/api/admin/rollback", headers=AUTH)
+    assert engine() == "lookup"
+    admin_client.post("/api/admin/reload", json={"version": "v2"}, headers=AUTH)
+    assert engine() == "model"  # v1's table is not v2's answer
+
+
+def test_request_keeps_its_model_across_a_swap(admin_client, monkeypatch):
+    async def fake_user(client, semaphore, cache, username):
+        return {"rating": 1500.0, "attendedContestsCount": 10}
+
+    async def participants(contest):
+        # A reload lands while the request waits on LeetCode
+        monkeypatch.setattr(app_module, "model", ConstantModel(2.0))
+        monkeypatch.setattr(app_module, "model_version", "v2")
+        return 20000
+
+    monkeypatch.setattr(app_module, "fetch_user_data", fake_user)
+    monkeypatch.setattr(app_module, "_total_participants", participants)
+    r = admin_client.post(
+        "/api/predict",
+        json={
+            "username": "alice",
+            "contests": [
+                {"name": "weekly-contest-400", "rank": 100},
+                {"name": "weekly-contest-401", "rank": 100},
+            ],
+        },
+    )
+    assert r.status_code == 200
+    assert [p["prediction"] for p in r.json()] == [1.0, 1.0]
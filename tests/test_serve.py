@@ -0,0 +1,89 @@
+import os
+import signal
+import time
+import urllib.request
+
+import pytest
+
+from scripts import serve
+
+pytestmark = pytest.mark.skipif(
+    not os.path.exists(f"/proc/{os.getpid()}/smaps_rollup"),
+    reason="needs Linux /proc/<pid>/smaps_rollup",
+)
+
+
+async def hello_app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while (await receive())["type"] != "lifespan.shutdown":
+            await send({"type": "lifespan.startup.complete"})
+        await send({"type": "lifespan.shutdown.complete"})
+        return
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": str(os.getpid()).encode()})
+
+
+def test_memory_usage_of_this_process():
+    usage = serve.memory_usage(os.getpid())
+    assert usage["rss"] > 0
+    assert 0 < usage["pss"] <= usage["rss"]
+    assert usage["shared"] + usage["private"] == pytest.approx(usage["rss"], rel=0.05)
+
+
+def test_memory_usage_of_missing_process_is_none():
+    assert serve.memory_usage(2**22 + 1) is None
+
+
+def test_report_memory_skips_missing_processes(caplog):
+    caplog.set_level("INFO")
+    usage = serve.report_memory([os.getpid(), 2**22 + 1])
+    assert list(usage) == [os.getpid()]
+    assert "1 workers:" in caplog.text
+
+
+def test_supervisor_serves_restarts_and_stops():
+    sock = serve.bind_socket("127.0.0.1", 0)
+    port = sock.getsockname()[1]
+    supervisor = serve.Supervisor(hello_app, sock, workers=1, log_level="warning")
+
+    def fetch():
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                url = f"http://127.0.0.1:{port}/"
+                with urllib.request.urlopen(url, timeout=2) as resp:  # noqa: S310
+                    return int(resp.read())
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    supervisor.spawn()
+    try:
+        first = fetch()
+        assert first in supervisor.children
+
+        os.kill(first, signal.SIGKILL)
+        deadline = time.monotonic() + 10
+        while first in supervisor.children or not supervisor.children:
+            assert time.monotonic() < deadline
+            supervisor.reap()
+            time.sleep(0.1)
+        assert fetch() != first
+    finally:
+        supervisor.stop(signal.SIGTERM, None)
+        deadline = time.monotonic() + 10
+        while supervisor.children and time.monotonic() < deadline:
+            supervisor.reap()
+            time.sleep(0.1)
+        assert not supervisor.children
+        sock.close()
+
+
+def test_default_workers(monkeypatch):
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    assert serve.default_workers("keras") == 1
+    assert serve.default_workers("compiled") == 1
+    assert serve.default_workers("float16") == 2
+    monkeypatch.setenv("WEB_CONCURRENCY", "4")
+    assert serve.default_workers("keras") == 4
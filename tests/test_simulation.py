@@ -0,0 +1,199 @@
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.services.simulation import (
+    SimulationExpiredError,
+    rank_distribution_from_history,
+    sample_ranks,
+    simulate,
+)
+
+
+class RankModel:
+    """Rating change of ``10 - rank / 100``: +10 at rank 1, -10 at rank 2000."""
+
+    input_shape = (None, 15)
+
+    def predict(self, x, verbose=0):
+        return (10 - x[:, 1] / 100)[:, None]
+
+
+class IdentityScaler:
+    def transform(self, x):
+        return x
+
+
+def test_rank_distribution_from_history():
+    assert rank_distribution_from_history([100, 200]) is None
+    assert rank_distribution_from_history([0, 100, 0, 200]) is None
+    median, spread = rank_distribution_from_history([100, 100, 100, 100])
+    assert median == pytest.approx(100)
+    assert spread == pytest.approx(0.1)  # floored
+    median, spread = rank_distribution_from_history([10, 100, 1000])
+    assert median == pytest.approx(100)
+    assert spread == pytest.approx(np.std(np.log([10, 100, 1000])))
+
+
+def test_sample_ranks_are_clipped_integers():
+    rng = np.random.default_rng(0)
+    ranks = sample_ranks(500, 2.0, 1000, 10_000, rng)
+    assert ranks.min() >= 1 and ranks.max() <= 1000
+    assert np.all(ranks == np.rint(ranks))
+    assert np.median(ranks) == pytest.approx(500, rel=0.1)
+
+
+def _steps(n, median=500.0, spread=0.0):
+    return [
+        {
+            "name": f"weekly-contest-{500 + i}",
+            "median": median,
+            "spread": spread,
+            "total_participants": 30000,
+        }
+        for i in range(n)
+    ]
+
+
+def test_simulate_without_spread_is_deterministic_chain():
+    steps, final = simulate(
+        RankModel(), IdentityScaler(), {}, 1600.0, 10, _steps(3), 100, [5, 50, 95]
+    )
+    np.testing.assert_allclose(final, 1600.0 + 3 * 5.0)
+    assert [s["mean"] for s in steps] == [1605.0, 1610.0, 1615.0]
+    assert steps[-1]["percentiles"] == {"p5": 1615.0, "p50": 1615.0, "p95": 1615.0}
+
+
+def test_simulate_bands_widen_with_spread():
+    steps, final = simulate(
+        RankModel(),
+        IdentityScaler(),
+        {},
+        1600.0,
+        10,
+        _steps(5, spread=0.8),
+        5000,
+        [5, 95],
+        seed=1,
+    )
+    widths = [s["percentiles"]["p95"] - s["percentiles"]["p5"] for s in steps]
+    assert widths == sorted(widths)
+    assert final.shape == (5000,)
+
+
+class SlowModel(RankModel):
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.calls = 0
+
+    def predict(self, x, verbose=0):
+        self.calls += 1
+        time.sleep(self.seconds)
+        return super().predict(x)
+
+
+def test_simulate_stops_once_expired():
+    model = SlowModel(0)
+    with pytest.raises(SimulationExpiredError):
+        simulate(model, IdentityScaler(), {}, 1600, 10, _steps(3), 10, [50], None, 0)
+    assert model.calls == 0
+
+
+@pytest.fixture
+def sim_client(monkeypatch):
+    async def fake_fetch_user_data(client, semaphore, cache, username):
+        ranks = [] if username == "newbie" else [400, 500, 600, 500]
+        return {"rating": 1600.0, "attendedContestsCount": 12, "recentRanks": ranks}
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    monkeypatch.setattr(app_module, "fetch_user_data", fake_fetch_user_data)
+    monkeypatch.setattr(app_module, "model", RankModel())
+    monkeypatch.setattr(app_module, "scaler", IdentityScaler())
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    return TestClient(app_module.app)
+
+
+def test_simulate_endpoint(sim_client):
+    r = sim_client.post(
+        "/api/simulate",
+        json={
+            "username": "someone",
+            "paths": 2000,
+            "seed": 7,
+            "contests": [
+                {"name": "weekly-contest-500"},
+                {"name": "weekly-contest-501", "rank": {"median": 100, "spread": 0}},
+            ],
+        },
+    )
+    assert r.status_code == 200
+    data = r.json()
+    assert data["paths"] == 2000
+    first, second = data["steps"]
+    assert first["rank_median"] == pytest.approx(494.9, abs=0.1)
+    assert first["total_participants"] == 30000
+    assert second["rank_median"] == 100
+    assert set(data["final"]) == {"p5", "p25", "p50", "p75", "p95"}
+    assert data["final"]["p5"] <= data["final"]["p50"] <= data["final"]["p95"]
+
+
+def test_simulate_requires_rank_distribution_without_history(sim_client):
+    r = sim_client.post(
+        "/api/simulate",
+        json={"username": "newbie", "contests": [{"name": "weekly-contest-500"}]},
+    )
+    assert r.status_code == 400
+    assert "rank" in r.json()["detail"]
+
+
+def test_simulate_validates_paths(sim_client):
+    r = sim_client.post(
+        "/api/simulate",
+        json={
+            "username": "someone",
+            "paths": 10_000_000,
+            "contests": [{"name": "weekly-contest-500"}],
+        },
+    )
+    assert r.status_code == 422
+
+
+def test_simulate_stops_working_after_the_deadline(sim_client, monkeypatch):
+    model = SlowModel(0.1)
+    monkeypatch.setattr(app_module, "model", model)
+    contests = [{"name": f"weekly-contest-{500 + i}"} for i in range(20)]
+    r = sim_client.post(
+        "/api/simulate",
+        headers={"X-Request-Timeout-Ms": "250"},
+        json={"username": "someone", "paths": 10, "contests": contests},
+    )
+    assert r.status_code == 504
+    time.sleep(0.5)
+    assert model.calls <= 4  # not all 20 contests
+
+
+def test_simulate_keeps_its_model_across_a_swap(sim_client, monkeypatch):
+    class Swapped(RankModel):
+        def predict(self, x, verbose=0):
+            return np.full((len(x), 1), -100.0)
+
+    async def swap_during_fetch(client, semaphore, cache, username):
+        monkeypatch.setattr(app_module, "model", Swapped())
+        return {"rating": 1600.0, "attendedContestsCount": 12, "recentRanks": []}
+
+    monkeypatch.setattr(app_module, "fetch_user_data", swap_during_fetch)
+    rank = {"median": 100, "spread": 0}
+    contest = {"name": "weekly-contest-500", "rank": rank}
+    r = sim_client.post(
+        "/api/simulate",
+        json={"username": "someone", "contests": [contest]},
+    )
+    assert r.status_code == 200
+    assert r.json()["final"]["p50"] == 1609.0  # RankModel's +9 at rank 100
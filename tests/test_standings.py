@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+import main as app_module
+from app.schemas import Contest
+from app.services import standings as standings_module
+from app.services.standings import (
+    get_contest_standings,
+    load_usernames,
+    write_standings,
+)
+from scripts.fake_leetcode import contest_participants, synthesize_ranking_page
+from scripts.ingest_standings import ingest
+
+
+def _rows(n=10):
+    return [
+        {
+            "username": f"user{i}",
+            "rank": i + 1,
+            "score": 18 - (i * 18) // n,
+            "finish_time": 1000 + i,
+        }
+        for i in range(n)
+    ]
+
+
+def test_write_and_lookup(tmp_path):
+    standings = write_standings(tmp_path, "weekly-contest-1", _rows())
+    assert standings.participants == 10
+    assert list(standings.score) == [18, 17, 15, 13, 11, 9, 8, 6, 4, 2]
+
+    assert standings.percentile(1) == pytest.approx(10.0)
+    assert standings.percentile(10) == pytest.approx(100.0)
+
+    assert standings.rank_for_score(20) == 1
+    assert standings.rank_for_score(15) == 3
+    assert standings.rank_for_score(16) == 3
+    assert standings.rank_for_score(0) == 11
+
+
+def test_rank_for_score_breaks_ties_by_finish_time(tmp_path):
+    rows = [
+        {"username": f"u{i}", "rank": i + 1, "score": 12, "finish_time": 100 * i}
+        for i in range(5)
+    ]
+    standings = write_standings(tmp_path, "weekly-contest-2", rows)
+    assert standings.rank_for_score(12) == 1
+    assert standings.rank_for_score(12, finish_time=250) == 4
+    assert standings.rank_for_score(12, finish_time=10_000) == 6
+
+
+def test_username_pool_is_shared_across_contests(tmp_path):
+    write_standings(tmp_path, "weekly-contest-1", _rows(3))
+    second = write_standings(tmp_path, "weekly-contest-2", _rows(5)[::-1])
+    assert load_usernames(tmp_path) == [f"user{i}" for i in range(5)]
+    assert list(second.user_idx) == [0, 1, 2, 3, 4]
+
+
+def test_failed_write_leaves_the_pool_untouched(tmp_path, monkeypatch):
+    write_standings(tmp_path, "weekly-contest-1", _rows(3))
+    pool = (tmp_path / "usernames.txt").read_bytes()
+
+    def crash(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(standings_module.np, "save", crash)
+    with pytest.raises(OSError):
+        write_standings(tmp_path, "weekly-contest-2", _rows(5))
+    assert (tmp_path / "usernames.txt").read_bytes() == pool
+    assert get_contest_standings("weekly-contest-2", str(tmp_path)) is None
+
+
+def test_rewrite_replaces_contest(tmp_path):
+    write_standings(tmp_path, "weekly-contest-1", _rows(10))
+    assert write_standings(tmp_path, "weekly-contest-1", _rows(4)).participants == 4
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "usernames.txt",
+        "weekly-contest-1",
+    ]
+
+
+def test_ingest_pages_through_ranking(tmp_path, monkeypatch):
+    failed = set()
+
+    def fake_fetch(session, slug, page):
+        if page == 3 and page not in failed:
+            failed.add(page)
+            return None
+        return synthesize_ranking_page(slug, page)
+
+    monkeypatch.setattr("scripts.ingest_standings.fetch_ranking_page", fake_fetch)
+    standings = ingest(None, "weekly-contest-400", tmp_path, workers=4)
+
+    expected = contest_participants("weekly-contest-400")
+    assert standings.participants == expected
+    assert list(standings.rank[:3]) == [1, 2, 3]
+    assert standings.rank[-1] == expected
+
+
+def test_predict_uses_stored_participant_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(standings_module, "CONTEST_STORE_DIR", str(tmp_path))
+    write_standings(tmp_path, "weekly-contest-1", _rows(10))
+    assert get_contest_standings("weekly-contest-1").participants == 10
+    assert get_contest_standings("weekly-contest-9") is None
+
+    async def no_upstream(*args):
+        raise AssertionError("upstream should not be called")
+
+    monkeypatch.setattr(app_module, "fetch_contest_data", no_upstream)
+    total = asyncio.run(
+        app_module._total_participants(Contest(name="weekly-contest-1", rank=4))
+    )
+    assert total == 10
@@ -0,0 +1,82 @@
+import numpy as np
+
+from app.services.prediction import make_batch_prediction
+from app.tf_runtime import CompiledModel
+
+
+class RecordingForward:
+    """Stands in for the compiled graph: a fixed linear map that logs shapes."""
+
+    def __init__(self, n_features=15):
+        self.weights = np.arange(n_features, dtype=np.float32)[:, None] / 10
+        self.shapes = []
+
+    def __call__(self, x):
+        self.shapes.append(x.shape)
+        return x @ self.weights
+
+
+def _rows(n, n_features=15):
+    return np.random.default_rng(n).random((n, n_features)).astype(np.float32)
+
+
+def test_unpadded_passes_batch_through():
+    forward = RecordingForward()
+    model = CompiledModel(forward, 15)
+    x = _rows(7)
+    np.testing.assert_allclose(model.predict(x), x @ forward.weights)
+    assert forward.shapes == [(7, 15)]
+    assert model.input_shape == (None, 15)
+
+
+def test_padding_uses_bucket_shapes_only():
+    forward = RecordingForward()
+    model = CompiledModel(forward, 15, buckets=(1, 4, 16), pad_to_buckets=True)
+    for n in (1, 3, 4, 9, 16):
+        x = _rows(n)
+        out = model.predict(x)
+        assert out.shape == (n, 1)
+        np.testing.assert_allclose(out, x @ forward.weights, rtol=1e-6)
+    assert {s[0] for s in forward.shapes} <= {1, 4, 16}
+
+
+def test_padding_clears_stale_rows_and_reuses_buffers():
+    forward = RecordingForward()
+    model = CompiledModel(forward, 15, buckets=(4,), pad_to_buckets=True)
+    model.predict(_rows(4))
+    buffer = model._buffers[4]
+    x = _rows(2)
+    np.testing.assert_allclose(model.predict(x), x @ forward.weights, rtol=1e-6)
+    assert model._buffers[4] is buffer
+    assert not buffer[2:].any()
+
+
+def test_large_batches_run_in_chunks_of_largest_bucket():
+    forward = RecordingForward()
+    model = CompiledModel(forward, 15, buckets=(1, 4), pad_to_buckets=True)
+    x = _rows(10)
+    np.testing.assert_allclose(model.predict(x), x @ forward.weights, rtol=1e-6)
+    assert forward.shapes == [(4, 15)] * 3
+
+
+def test_warm_up_traces_every_bucket_only_with_padding():
+    forward = RecordingForward()
+    CompiledModel(forward, 15, buckets=(1, 4, 16)).warm_up()
+    assert forward.shapes == [(1, 15)]
+
+    forward = RecordingForward()
+    CompiledModel(forward, 15, buckets=(1, 4, 16), pad_to_buckets=True).warm_up()
+    assert forward.shapes == [(1, 15), (4, 15), (16, 15)]
+
+
+def test_accepts_legacy_lstm_layout_and_make_batch_prediction():
+    class IdentityScaler:
+        def transform(self, x):
+            return x
+
+    forward = RecordingForward()
+    model = CompiledModel(forward, 15)
+    x = _rows(3)
+    np.testing.assert_allclose(model.predict(x[:, None, :]), x @ forward.weights)
+    deltas = make_batch_prediction(model, IdentityScaler(), x.astype(np.float64))
+    np.testing.assert_allclose(deltas, (x @ forward.weights)[:, 0], rtol=1e-6)
@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.preprocessing import MinMaxScaler
+
+from scripts import train
+
+
+def _write_records(path, count, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = rng.normal(1500, 400, size=(count, 16)).round(3)
+    with open(path, "w") as f:
+        for row in rows:
+            record = {k: float(v) for k, v in zip(train.FEATURES, row, strict=False)}
+            record["output"] = float(row[-1])
+            f.write(json.dumps(record) + "\n")
+    return rows
+
+
+def _all_records(out_dir, split):
+    files = sorted((out_dir / split).glob("*.f32"))
+    if not files:
+        return np.empty((0, 16), dtype=np.float32)
+    return np.concatenate([train.read_records(p) for p in files])
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    monkeypatch.setattr(train, "MIN_RANGE_BYTES", 1000)
+
+
+def test_prepare_covers_every_record_once(tmp_path, small_ranges):
+    rows = _write_records(tmp_path / "data.json", 500)
+    meta = train.prepare_records([tmp_path / "data.json"], tmp_path / "rec", 3)
+
+    assert sum(meta["counts"].values()) == 500
+    assert meta["counts"]["test"] > 0 and meta["counts"]["val"] > 0
+    got = np.concatenate([_all_records(tmp_path / "rec", s) for s in train.SPLITS])
+    expected = rows.astype(np.float32)
+    np.testing.assert_array_equal(
+        got[np.lexsort(got.T)], expected[np.lexsort(expected.T)]
+    )
+    assert json.loads((tmp_path / "rec" / "meta.json").read_text()) == meta
+
+
+def test_split_does_not_depend_on_chunking(tmp_path, monkeypatch):
+    _write_records(tmp_path / "data.json", 300)
+    whole = train.prepare_records([tmp_path / "data.json"], tmp_path / "a", 1)
+    monkeypatch.setattr(train, "MIN_RANGE_BYTES", 500)
+    chunked = train.prepare_records([tmp_path / "data.json"], tmp_path / "b", 4)
+    assert whole["counts"] == chunked["counts"]
+    for split in train.SPLITS:
+        a, b = _all_records(tmp_path / "a", split), _all_records(tmp_path / "b", split)
+        np.testing.assert_array_equal(a[np.lexsort(a.T)], b[np.lexsort(b.T)])
+
+
+def test_streamed_scaler_matches_full_fit(tmp_path, small_ranges):
+    rows = _write_records(tmp_path / "one.json", 200, seed=1)
+    rows = np.vstack([rows, _write_records(tmp_path / "two.json", 150, seed=2)])
+    meta = train.prepare_records(
+        [tmp_path / "one.json", tmp_path / "two.json"], tmp_path / "rec", 2
+    )
+    scaler = train.scaler_from_stats(meta)
+    reference = MinMaxScaler().fit(rows[:, :15])
+    np.testing.assert_allclose(scaler.data_min_, reference.data_min_)
+    np.testing.assert_allclose(scaler.data_max_, reference.data_max_)
+    np.testing.assert_allclose(
+        scaler.transform(rows[:5, :15]), reference.transform(rows[:5, :15])
+    )
+
+
+def test_byte_ranges_cover_files(tmp_path, small_ranges):
+    _write_records(tmp_path / "data.json", 100)
+    size = (tmp_path / "data.json").stat().st_size
+    ranges = train.byte_ranges([tmp_path / "data.json"], 8)
+    assert ranges[0][1] == 0 and ranges[-1][2] == size
+    assert all(a[2] == b[1] for a, b in zip(ranges, ranges[1:], strict=False))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor
+
+from app.services.prediction import make_batch_prediction
+from app.tree_runtime import CHUNK_ROWS, export_gbr, load_tree_model
+
+
+@pytest.fixture(scope="module")
+def fitted():
+    rng = np.random.default_rng(0)
+    x = rng.random((2000, 15))
+    y = 80 * x[:, 0] - 40 * x[:, 3] + 20 * np.sin(6 * x[:, 5])
+    estimator = GradientBoostingRegressor(
+        n_estimators=50, max_depth=3, random_state=0
+    ).fit(x, y)
+    return estimator, x
+
+
+def test_matches_sklearn(fitted, tmp_path):
+    estimator, x = fitted
+    model = load_tree_model(export_gbr(estimator, tmp_path / "tree.npz"))
+    assert model.trees == 50
+    assert model.input_shape == (None, 15)
+    np.testing.assert_allclose(model.predict(x)[:, 0], estimator.predict(x))
+
+
+def test_chunked_batches_and_single_rows(fitted, tmp_path):
+    estimator, x = fitted
+    model = load_tree_model(export_gbr(estimator, tmp_path / "tree.npz"))
+    big = np.resize(x, (CHUNK_ROWS * 2 + 7, 15))
+    np.testing.assert_allclose(model.predict(big)[:, 0], estimator.predict(big))
+    assert model.predict(x[0]).shape == (1, 1)
+    np.testing.assert_allclose(model.predict(x[:1, None, :]), model.predict(x[:1]))
+
+
+def test_threshold_ties_follow_sklearn(fitted, tmp_path):
+    estimator, x = fitted
+    model = load_tree_model(export_gbr(estimator, tmp_path / "tree.npz"))
+    tree = estimator.estimators_[0, 0].tree_
+    row = x[:1].copy()
+    row[0, tree.feature[0]] = tree.threshold[0]
+    np.testing.assert_allclose(model.predict(row)[:, 0], estimator.predict(row))
+
+
+def test_make_batch_prediction(fitted, tmp_path):
+    class IdentityScaler:
+        def transform(self, x):
+            return x
+
+    estimator, x = fitted
+    model = load_tree_model(export_gbr(estimator, tmp_path / "tree.npz"))
+    deltas = make_batch_prediction(model, IdentityScaler(), x[:10])
+    np.testing.assert_allclose(deltas, estimator.predict(x[:10]))
+
+
+def test_rejects_unknown_format(fitted, tmp_path):
+    estimator, _ = fitted
+    path = export_gbr(estimator, tmp_path / "tree.npz")
+    with np.load(path) as data:
+        arrays = dict(data)
+    arrays["meta"][0] = 99
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError, match="format"):
+        load_tree_model(path)
@@ -0,0 +1,230 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import app.services.leetcode as leetcode
+from app.config import USER_SNAPSHOT_MAX_AGE
+from app.services.user_snapshot import (
+    RECENT_RANKS,
+    UserSnapshot,
+    get_user_snapshot,
+    write_snapshot,
+)
+from app.utils.cache import TTLCache
+from scripts import build_user_snapshot
+
+ALICE = {
+    "rating": 1850.5,
+    "attendedContestsCount": 42,
+    "avgSolveRate": 0.75,
+    "avgFinishTime": 3600.0,
+    "recentSolveRate": 0.5,
+    "recentFinishTime": 2400.0,
+    "ratingTrend": 12.5,
+    "maxRating": 1900.0,
+    "recentRanks": list(range(1, RECENT_RANKS + 3)),
+}
+
+
+def test_round_trip_is_case_insensitive(tmp_path):
+    root = tmp_path / "users"
+    write_snapshot(root, {"Alice": ALICE}, fetched_at=1000)
+    snapshot = get_user_snapshot(str(root))
+
+    user = snapshot.lookup("alice", now=1600)
+    assert user["rating"] == pytest.approx(1850.5)
+    assert user["attendedContestsCount"] == 42
+    assert user["recentRanks"] == ALICE["recentRanks"][-RECENT_RANKS:]
+    assert user["snapshotFetchedAt"] == 1000
+    assert user["snapshotAge"] == 600
+    assert snapshot.lookup("bob") is None
+
+
+def test_rebuild_keeps_previous_users_and_refreshes_fetched(tmp_path):
+    root = tmp_path / "users"
+    first = write_snapshot(root, {"alice": ALICE, "bob": ALICE}, fetched_at=1000)
+    bob = dict(ALICE, rating=1500.0, recentRanks=[])
+    write_snapshot(root, {"bob": bob}, fetched_at=2000, previous=first)
+
+    snapshot = UserSnapshot(root)
+    assert len(snapshot) == 2
+    assert snapshot.lookup("alice", now=2000)["snapshotFetchedAt"] == 1000
+    refreshed = snapshot.lookup("bob", now=2000)
+    assert refreshed["rating"] == 1500.0
+    assert refreshed["recentRanks"] == []
+    assert refreshed["snapshotAge"] == 0
+    assert not (tmp_path / ".users.tmp").exists()
+    assert not (tmp_path / ".users.old").exists()
+
+
+def test_missing_or_unknown_format_snapshot(tmp_path):
+    assert get_user_snapshot(str(tmp_path / "none")) is None
+    write_snapshot(tmp_path / "users", {"alice": ALICE})
+    meta = tmp_path / "users" / "meta.json"
+    meta.write_text(json.dumps({"format": 99}))
+    with pytest.raises(ValueError):
+        UserSnapshot(tmp_path / "users")
+
+
+class Upstream:
+    """Stand-in for the LeetCode client; ``fail`` makes every call error."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = 0
+
+    async def post(self, url, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise httpx.ConnectError("LeetCode is down")
+        body = {
+            "data": {
+                "userContestRanking": {"rating": 2000.0, "attendedContestsCount": 50},
+                "userContestRankingHistory": [],
+            }
+        }
+        return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+
+def _fetch(monkeypatch, tmp_path, client, fetched_at, username="alice"):
+    root = tmp_path / "users"
+    write_snapshot(root, {"alice": ALICE}, fetched_at=fetched_at)
+    monkeypatch.setattr(
+        leetcode, "get_user_snapshot", lambda: get_user_snapshot(str(root))
+    )
+    return asyncio.run(
+        leetcode.fetch_user_data(client, asyncio.Semaphore(1), TTLCache(), username)
+    )
+
+
+def test_fresh_snapshot_is_served_without_calling_leetcode(monkeypatch, tmp_path):
+    client = Upstream()
+    user = _fetch(monkeypatch, tmp_path, client, fetched_at=None)
+    assert user["rating"] == pytest.approx(1850.5)
+    assert user["snapshotAge"] <= 1
+    assert client.calls == 0
+
+
+def test_stale_snapshot_is_refreshed_from_leetcode(monkeypatch, tmp_path):
+    client = Upstream()
+    user = _fetch(monkeypatch, tmp_path, client, fetched_at=1000)
+    assert user["rating"] == 2000.0
+    assert "snapshotAge" not in user
+    assert client.calls == 1
+
+
+def test_stale_snapshot_is_served_when_leetcode_fails(monkeypatch, tmp_path):
+    user = _fetch(monkeypatch, tmp_path, Upstream(fail=True), fetched_at=1000)
+    assert user["rating"] == pytest.approx(1850.5)
+    assert user["snapshotFetchedAt"] == 1000
+
+
+def test_unknown_user_still_fails_when_leetcode_fails(monkeypatch, tmp_path):
+    with pytest.raises(HTTPException) as info:
+        _fetch(monkeypatch, tmp_path, Upstream(fail=True), 1000, username="bob")
+    assert info.value.status_code == 503
+
+
+def test_builder_skips_users_without_contest_data(tmp_path, monkeypatch):
+    class Session:
+        def post(self, url, json, timeout):
+            name = json["variables"]["username"]
+            ranking = None if name == "ghost" else {"rating": 1600.0}
+            ranking = ranking and dict(ranking, attendedContestsCount=3)
+            body = {"data": {"userContestRanking": ranking}}
+            return httpx.Response(200, json=body, request=httpx.Request("POST", url))
+
+    usernames = tmp_path / "usernames.json"
+    usernames.write_text(json.dumps(["alice", "ghost", "Bob"]))
+    monkeypatch.setattr(build_user_snapshot, "make_session", Session)
+    output = tmp_path / "users"
+    build_user_snapshot.main(["--usernames", str(usernames), "--output", str(output)])
+
+    snapshot = UserSnapshot(output)
+    assert len(snapshot) == 2
+    assert snapshot.lookup("bob")["rating"] == 1600.0
+    assert snapshot.lookup("ghost") is None
+
+
+@pytest.fixture
+def predict_app(monkeypatch, tmp_path):
+    """The API with a dummy model; returns ``write(fetched_at)`` for alice."""
+    import numpy as np
+
+    import main as app_module
+
+    class DummyModel:
+        input_shape = (None, 7)
+
+        def predict(self, x, verbose=0):
+            return np.array([[10.0]])
+
+    class DummyScaler:
+        def transform(self, x):
+            return x
+
+    async def participants(contest):
+        return 20000
+
+    @asynccontextmanager
+    async def dummy_lifespan(app):
+        yield
+
+    root = tmp_path / "users"
+    monkeypatch.setattr(
+        leetcode, "get_user_snapshot", lambda: get_user_snapshot(str(root))
+    )
+    monkeypatch.setattr(app_module, "model", DummyModel())
+    monkeypatch.setattr(app_module, "scaler", DummyScaler())
+    monkeypatch.setattr(app_module, "_total_participants", participants)
+    monkeypatch.setattr(app_module, "lifespan", dummy_lifespan)
+    monkeypatch.setattr(app_module, "cache", TTLCache())
+    return app_module, lambda fetched_at: write_snapshot(
+        root, {"alice": ALICE}, fetched_at=fetched_at
+    )
+
+
+def _predict(app_module, headers=None):
+    return TestClient(app_module.app).post(
+        "/api/predict",
+        headers=headers or {},
+        json={
+            "username": "alice",
+            "contests": [{"name": "weekly-contest-400", "rank": 100}],
+        },
+    )
+
+
+def test_predict_reports_snapshot_age(predict_app):
+    app_module, write = predict_app
+    write(None)
+    r = _predict(app_module)
+    assert r.status_code == 200
+    assert int(r.headers["X-User-Data-Age"]) <= 1
+    assert r.json()[0]["rating_before_contest"] == pytest.approx(1850.5)
+
+
+def test_predict_answers_from_stale_snapshot_when_leetcode_hangs(
+    predict_app, monkeypatch
+):
+    app_module, write = predict_app
+    write(1000)
+
+    class HangingClient:
+        async def post(self, url, **kwargs):
+            await asyncio.sleep(10)
+
+    monkeypatch.setattr(app_module, "async_client", HangingClient())
+    started = time.perf_counter()
+    r = _predict(app_module, {"X-Request-Timeout-Ms": "400"})
+    # LeetCode got half the budget; the other half was left to predict
+    assert r.status_code == 200
+    assert r.json()[0]["rating_before_contest"] == pytest.approx(1850.5)
+    assert int(r.headers["X-User-Data-Age"]) > USER_SNAPSHOT_MAX_AGE
+    assert time.perf_counter() - started < 2
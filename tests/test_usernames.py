@@ -0,0 +1,107 @@
+import asyncio
+import fcntl
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main as app_module
+from app.services.usernames import (
+    UsernameCatalog,
+    UsernameIndex,
+    get_username_index,
+    merge_index,
+    write_index,
+)
+from scripts import build_username_index
+
+NAMES = ["alice", "Alicia", "ALICE", "bob", "alex_99", "al", " ", "zed"]
+
+
+def test_prefix_search_is_case_insensitive_and_ordered(tmp_path):
+    index = write_index(tmp_path / "idx", NAMES)
+    assert len(index) == 6
+    assert index.search("AL", 10) == ["al", "alex_99", "alice", "Alicia"]
+    assert index.search("ali", 1) == ["alice"]
+    assert index.search("c", 10) == []
+    assert "BOB" in index and "bo" not in index
+    assert list(index) == ["al", "alex_99", "alice", "Alicia", "bob", "zed"]
+
+
+def test_empty_index(tmp_path):
+    index = write_index(tmp_path / "idx", [])
+    assert len(index) == 0
+    assert index.search("a", 10) == []
+    assert "a" not in index
+
+
+def test_merge_adds_names_and_keeps_existing_spelling(tmp_path):
+    root = tmp_path / "idx"
+    write_index(root, ["bob", "Carol"])
+    merge_index(root, ["carol", "Amy", "dave", "amy"])
+    index = UsernameIndex(root)
+    assert list(index) == ["Amy", "bob", "Carol", "dave"]
+    assert not (tmp_path / ".idx.tmp").exists()
+
+    merge_index(tmp_path / "fresh", ["x"])
+    assert list(get_username_index(str(tmp_path / "fresh"))) == ["x"]
+
+
+def test_rebuild_waits_for_a_running_merge(tmp_path):
+    root = tmp_path / "idx"
+    write_index(root, ["bob"])
+    with open(tmp_path / ".idx.lock", "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)  # as merge_index holds it
+        rebuild = threading.Thread(target=write_index, args=(root, ["amy"]))
+        rebuild.start()
+        rebuild.join(0.2)
+        assert rebuild.is_alive()
+        assert list(UsernameIndex(root)) == ["bob"]
+    rebuild.join(5)
+    assert list(UsernameIndex(root)) == ["amy"]
+
+
+def test_catalog_serves_pending_names_until_flushed(tmp_path):
+    root = tmp_path / "idx"
+    write_index(root, ["alice", "bob"])
+    catalog = UsernameCatalog(root, max_pending=2)
+    catalog.add("Alf")
+    catalog.add("bob")  # already indexed
+    catalog.add("ALF")
+    catalog.add("carl")
+    catalog.add("dan")  # buffer full
+    assert catalog.pending_keys == [b"alf", b"carl"]
+    assert catalog.search("al", 10) == ["Alf", "alice"]
+
+    asyncio.run(catalog.flush())
+    assert catalog.pending == {}
+    assert list(catalog.index()) == ["Alf", "alice", "bob", "carl"]
+    assert catalog.search("al", 1) == ["Alf"]
+
+
+def test_usernames_endpoint(tmp_path, monkeypatch):
+    write_index(tmp_path / "idx", NAMES)
+    monkeypatch.setattr(
+        app_module, "username_catalog", UsernameCatalog(tmp_path / "idx", 10)
+    )
+    client = TestClient(app_module.app)
+
+    r = client.get("/api/usernames", params={"prefix": "Ali", "limit": 2})
+    assert r.status_code == 200
+    assert r.json() == {"prefix": "Ali", "usernames": ["alice", "Alicia"]}
+
+    for params in ({"prefix": ""}, {"prefix": "a b"}, {"prefix": "a", "limit": 0}):
+        assert client.get("/api/usernames", params=params).status_code == 422
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_build_script(tmp_path, merge):
+    usernames = tmp_path / "usernames.json"
+    usernames.write_text(json.dumps(["carol", "Bob", "bob"]))
+    output = tmp_path / "idx"
+    write_index(output, ["amy"])
+    argv = ["--usernames", str(usernames), "--output", str(output)]
+    build_username_index.main(argv + (["--merge"] if merge else []))
+    expected = ["Bob", "carol"]
+    assert list(UsernameIndex(output)) == (["amy"] + expected if merge else expected)